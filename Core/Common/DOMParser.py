@@ -7,12 +7,19 @@
 import os
 import sys
 import traceback
+from bisect import bisect_left
 from decimal import *
+from xml.dom.minicompat import NodeList
 from xml.dom.minidom import parse, parseString
 from DOMMatrix import *
 from math import *
 from types import *
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 # define a COLLADA class
 class COLLADAIO:
@@ -48,18 +55,41 @@ class COLLADAIO:
     def Delink(self):
         self.root.unlink()
 
+# Parse a file and return [dom, list of COLLADA elements]. If a documents dictionary is given,
+# the file is parsed only once and kept in the dictionary until UnlinkDocuments is called.
+def ParseDocument(filename, documents = None):
+    if documents != None and documents.has_key(filename):
+        return documents[filename]
+    
+    dom = parse(filename)
+    rootLst = dom.getElementsByTagName("COLLADA")
+    if documents != None:
+        documents[filename] = [dom, rootLst]
+    return [dom, rootLst]
+
+# Unlink the documents parsed by ParseDocument
+def UnlinkDocuments(documents):
+    for each in documents:
+        InvalidateIndex(documents[each][0])
+        documents[each][0].unlink()
+    
+    documents.clear()
+
 # An IO parser class which will provide parsing file to xml node and return root of input and output file.
+# The optional documents_ dictionary is shared between parsers so that each file is parsed only once:
+# its documents are not unlinked by Delink, its owner must do it with UnlinkDocuments.
 class DOMParserIO:
-    def __init__(self, inputFilename_, exportFilenameList_):
+    def __init__(self, inputFilename_, exportFilenameList_, documents_ = None):
         self.inputFilename = inputFilename_
         self.exportFilenameList = exportFilenameList_
         self.dict = {} # dictionary for I/O loading
+        self.documents = documents_
         self.status = 0
     
     def Init(self):        
         # Parse files and construct dictionary:
         try:            
-            domInput = parse(self.inputFilename)            
+            domInput, rootInput = ParseDocument(self.inputFilename, self.documents)
         except Exception, info:            
             print 'Error: in DOM parser I/O: Importing\n'
             print 'Exception is thrown at line %d in DOMParser.py' %sys.exc_traceback.tb_lineno
@@ -67,8 +97,6 @@ class DOMParserIO:
             return False # unsuccessful 
         
         # get the input of root
-        rootInput = domInput.getElementsByTagName("COLLADA")
-        
         if len(rootInput) == 0:
             print "Error: No COLLADA information in imported file.\n"
             return False
@@ -79,8 +107,7 @@ class DOMParserIO:
         try:
             for eachFile in self.exportFilenameList:
                 #print 'File is ' + eachFile
-                domExp = parse(eachFile)
-                rootExp = domExp.getElementsByTagName("COLLADA")
+                domExp, rootExp = ParseDocument(eachFile, self.documents)
                 if rootExp == None or len(rootExp) == 0:
                     print "No COLLADA information in exported file.\n"
                     return False
@@ -108,9 +135,11 @@ class DOMParserIO:
 
     def Delink(self):
         # at the end of code, unlink the dom and DAE files
-        for each in self.dict:
-            self.dict[each][1] = None
-            self.dict[each][0].unlink()
+        if self.documents == None:
+            for each in self.dict:
+                self.dict[each][1] = None
+                InvalidateIndex(self.dict[each][0])
+                self.dict[each][0].unlink()
         
         self.dict.clear()   
     
@@ -118,52 +147,145 @@ class DOMParserIO:
 # GET section
 # ########################################
 
-# define a file list object and root
-# Find a daeElement by id under specified element, it is not an Element list!
-def GetElementByID(daeElement, strId):
+# ########################################
+# INDEX section
+# ########################################
+
+# An index of the elements of a document by id, sid and tag name, built the first time one
+# of them is searched for. Elements are numbered in document order and each one knows the
+# number following its last descendant: the elements found under a given element are those
+# numbered between the two, which a binary search finds without walking the tree.
+# The index only follows the changes made through AddAttribute and GenerateMultiScene;
+# whoever changes the tree otherwise must call InvalidateIndex.
+class DOMIndex:
+    def __init__(self, document):
+        self.ranges = {} # element -> [number, number following its last descendant]
+        self.ids = {} # id -> [[numbers], [elements]]
+        self.sids = {} # sid -> [[numbers], [elements]]
+        self.tags = {} # tag name -> [[numbers], [elements]]
+        self.count = 0
+        
+        for each in document.childNodes:
+            self.AddElement(each)
     
-    # check if current element has id attribute
-    #print daeElement.nodeName
-    #print daeElement.attributes.keys()
+    def AddElement(self, daeElement):
+        if daeElement.nodeType != daeElement.ELEMENT_NODE:
+            return
+        
+        number = self.count
+        self.count = self.count + 1
+        self.AddEntry(self.tags, daeElement.tagName, number, daeElement)
+        if daeElement.hasAttribute('id'):
+            self.AddEntry(self.ids, daeElement.getAttribute('id'), number, daeElement)
+        if daeElement.hasAttribute('sid'):
+            self.AddEntry(self.sids, daeElement.getAttribute('sid'), number, daeElement)
+        
+        for each in daeElement.childNodes:
+            self.AddElement(each)
+        
+        self.ranges[daeElement] = [number, self.count]
     
-    if daeElement.attributes != None: 
-        # if there is attributes, check whether there is an attribute called id
-        if daeElement.attributes.has_key('id'):            
-            # check if current element matches the strId
-            if daeElement.attributes['id'].value == strId:
-                return daeElement
-                
-    # No match for current elements, check its children:
-    for each in daeElement.childNodes:
-        Result = GetElementByID(each, strId)
+    def AddEntry(self, table, key, number, daeElement):
+        if not table.has_key(key):
+            table[key] = [[], []]
+        table[key][0].append(number)
+        table[key][1].append(daeElement)
+    
+    def Contains(self, daeElement):
+        return daeElement.nodeType == daeElement.DOCUMENT_NODE or self.ranges.has_key(daeElement)
+    
+    # Returns the elements with the given key under daeElement, or only the first one
+    def Find(self, table, daeElement, key, isSelfIncluded, isFirstOnly):
+        if not table.has_key(key):
+            return []
         
-        if Result != None:            
-            return  Result        
+        if daeElement.nodeType == daeElement.DOCUMENT_NODE:
+            first, end = 0, self.count
+        else:
+            first, end = self.ranges[daeElement]
+            if not isSelfIncluded:
+                first = first + 1
+        
+        numbers, elements = table[key]
+        start = bisect_left(numbers, first)
+        if isFirstOnly:
+            if start < len(numbers) and numbers[start] < end:
+                return [elements[start]]
+            return []
+        return elements[start:bisect_left(numbers, end, start)]
+
+# Get the index of the document of daeElement, or None if it has no document
+def GetIndex(daeElement):
+    if daeElement.nodeType == daeElement.DOCUMENT_NODE:
+        document = daeElement
+    else:
+        document = daeElement.ownerDocument
+    if document == None:
+        return None
     
-    return None
+    if not hasattr(document, 'domIndex'):
+        document.domIndex = DOMIndex(document)
+    return document.domIndex
+
+# Forget the index of the document of daeElement, after the tree was changed
+def InvalidateIndex(daeElement):
+    if daeElement.nodeType == daeElement.DOCUMENT_NODE:
+        document = daeElement
+    else:
+        document = daeElement.ownerDocument
+    if document != None and hasattr(document, 'domIndex'):
+        del document.domIndex
+
+# define a file list object and root
+# Find a daeElement by id under specified element, it is not an Element list!
+def GetElementByID(daeElement, strId):
+    # elements outside of the tree, such as clones, are not indexed
+    index = GetIndex(daeElement)
+    if index == None or not index.Contains(daeElement):
+        return WalkElementByAttribute(daeElement, 'id', strId)
+    
+    Result = index.Find(index.ids, daeElement, strId, True, True)
+    if len(Result) == 0:
+        return None
+    return Result[0]
 
 def GetElementBySID(daeElement, strSId):
+    index = GetIndex(daeElement)
+    if index == None or not index.Contains(daeElement):
+        return WalkElementByAttribute(daeElement, 'sid', strSId)
     
-    # check if current element has id attribute
-    #print daeElement.nodeName
-    #print daeElement.attributes.keys()
+    Result = index.Find(index.sids, daeElement, strSId, True, True)
+    if len(Result) == 0:
+        return None
+    return Result[0]
+
+# Find the first element with the attribute value under specified element by walking the tree
+def WalkElementByAttribute(daeElement, attrName, value):
     
     if daeElement.attributes != None: 
-        # if there is attributes, check whether there is an attribute called id
-        if daeElement.attributes.has_key('sid'):            
-            # check if current element matches the strId
-            if daeElement.attributes['sid'].value == strSId:
+        # if there is attributes, check whether there is an attribute called attrName
+        if daeElement.attributes.has_key(attrName):            
+            # check if current element matches the value
+            if daeElement.attributes[attrName].value == value:
                 return daeElement
                 
     # No match for current elements, check its children:
     for each in daeElement.childNodes:
-        Result = GetElementBySID(each, strSId)
+        Result = WalkElementByAttribute(each, attrName, value)
         
         if Result != None:            
             return  Result        
     
     return None
 
+# Same as daeElement.getElementsByTagName(tagName), through the index
+def GetElementsByTagName(daeElement, tagName):
+    index = GetIndex(daeElement)
+    if tagName == '*' or index == None or not index.Contains(daeElement):
+        return daeElement.getElementsByTagName(tagName)
+    
+    return NodeList(index.Find(index.tags, daeElement, tagName, False, False))
+
 # define a function which will get elements by list of tags:
 # Pre: all levels elements are unique until last one: user may have to use it by several times if any parent elements is not unique
 def GetElementsByTags(daeElement, tagLst):
@@ -171,13 +293,13 @@ def GetElementsByTags(daeElement, tagLst):
         intermediate = daeElement
         for index in range( len(tagLst)-1 ):
             # get list of each
-            Lst = intermediate.getElementsByTagName(tagLst[index])
+            Lst = GetElementsByTagName(intermediate, tagLst[index])
             if len(Lst) == 1:
                 intermediate = Lst[0]
             else:
                 return []
         
-        Lst = intermediate.getElementsByTagName( tagLst[len(tagLst)-1] )
+        Lst = GetElementsByTagName(intermediate, tagLst[len(tagLst)-1])
         return Lst
     else:
         return []
@@ -198,7 +320,7 @@ def GetElementsByHierTags(daeElement, tagLst):
             else:
                 return []
         
-        Lst = intermediate.getElementsByTagName( tagLst[len(tagLst)-1] )
+        Lst = GetElementsByTagName(intermediate, tagLst[len(tagLst)-1])
         return Lst
     else:
         return []
@@ -210,7 +332,7 @@ def FindElement(daeElement, tagLst):
         for index in range( len(tagLst) ):
             Lst = []
             for x in range( len(intermediate) ):
-                nLst = intermediate[x].getElementsByTagName( tagLst[index] )
+                nLst = GetElementsByTagName(intermediate[x], tagLst[index])
                 for y in range( len(nLst) ):
                     Lst.append( nLst[y] )
 
@@ -343,16 +465,22 @@ def AddAttribute(daeElement, attriName, attriValue, IsOverwriteable=False):
         if daeElement.attributes != None:
             if daeElement.attributes.has_key(attriName):
                 if IsOverwriteable:
-                    daeElement.setAttribute(attriName, attriValue)
+                    SetAttribute(daeElement, attriName, attriValue)
                     return True
                 else:
                     return False
             else:
-                daeElement.setAttribute(attriName, attriValue)
+                SetAttribute(daeElement, attriName, attriValue)
         else:
-            daeElement.setAttribute(attriName, attriValue)
+            SetAttribute(daeElement, attriName, attriValue)
         return True
 
+# Set the attribute, forgetting the index if it is an indexed one
+def SetAttribute(daeElement, attriName, attriValue):
+    daeElement.setAttribute(attriName, attriValue)
+    if attriName == 'id' or attriName == 'sid':
+        InvalidateIndex(daeElement)
+
 # #################################
 # Utility section
 # #################################
@@ -645,6 +773,58 @@ def IsValueEqual(value1, value2, type, epsilon = 1e-6):
         setEpsilon(oldEpsilon)
         return res
 
+# Parse the text of an element, such as a <float_array>, or its list of tokens as an array
+# of floats. The array is a numpy array if numpy is available and a list otherwise.
+def ParseFloatArray(data):
+    if type(data) in StringTypes:
+        data = data.split()
+    if numpy != None:
+        return numpy.array(data, numpy.float64)
+    return map(float, data)
+
+# Compare two arrays of floats as IsValueEqual does for each pair of values.
+# Return [isEqual, index of the first value that differs or -1, maximum absolute error,
+# maximum relative error]. An array longer than the other differs at the length of the shorter.
+def CompareFloatArrays(values1, values2, epsilon = 1e-6):
+    count = min(len(values1), len(values2))
+    if count == 0:
+        maxAbsError = 0.0
+        maxRelError = 0.0
+        firstIndex = -1
+    elif numpy != None:
+        array1 = numpy.asarray(values1, numpy.float64)[:count]
+        array2 = numpy.asarray(values2, numpy.float64)[:count]
+        absErrors = numpy.abs(array1 - array2)
+        scales = numpy.maximum(numpy.abs(array1), numpy.abs(array2))
+        # the absolute error is 0 wherever the scale is 0
+        relErrors = absErrors / numpy.where(scales > 0.0, scales, 1.0)
+        maxAbsError = float(absErrors.max())
+        maxRelError = float(relErrors.max())
+        differences = numpy.flatnonzero(numpy.logical_not(absErrors < epsilon))
+        if len(differences) > 0:
+            firstIndex = int(differences[0])
+        else:
+            firstIndex = -1
+    else:
+        maxAbsError = 0.0
+        maxRelError = 0.0
+        firstIndex = -1
+        for i in range(count):
+            absError = abs(values1[i] - values2[i])
+            if not (absError < epsilon) and firstIndex == -1:
+                firstIndex = i
+            scale = max(abs(values1[i]), abs(values2[i]))
+            if scale > 0.0:
+                relError = absError / scale
+            else:
+                relError = 0.0
+            maxAbsError = max(maxAbsError, absError)
+            maxRelError = max(maxRelError, relError)
+    
+    if firstIndex == -1 and len(values1) != len(values2):
+        firstIndex = count
+    return [firstIndex == -1, firstIndex, maxAbsError, maxRelError]
+
 # Parse node value as string
 def ParseEleAsString(daeElement):
     if len( daeElement.childNodes ) > 1:
@@ -742,7 +922,7 @@ def GenerateMultiScene(daeVisualScene, Index, attriNameLst = ['id', 'name']):
         idValue = GetAttriByEle(daeVisualScene, 'id')
         
         if idValue != None:
-            daeVisualScene.setAttribute('id', idValue+str(Index))
+            SetAttribute(daeVisualScene, 'id', idValue+str(Index))
         else:
             return False
         
@@ -753,7 +933,7 @@ def GenerateMultiScene(daeVisualScene, Index, attriNameLst = ['id', 'name']):
                 for eachAttr in attriNameLst:
                     Value = GetAttriByEle(eachNode, eachAttr)
                     if Value != None:
-                        eachNode.setAttribute(eachAttr, Value+str(Index))
+                        SetAttribute(eachNode, eachAttr, Value+str(Index))
 
     return True
         
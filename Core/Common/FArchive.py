@@ -0,0 +1,161 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import os
+import os.path
+import threading
+import time
+import zipfile
+import zlib
+
+import Core.Common.FUtils as FUtils
+from Core.Common.FConstants import *
+
+def WriteArchive(archiveFilename, filenames,
+                 threadCount = PACKAGE_THREAD_COUNT):
+    """WriteArchive(archiveFilename, filenames, threadCount = PACKAGE_THREAD_COUNT) -> None
+    
+    Writes a zip archive. The files with one of PACKAGE_STORED_EXTENSIONS
+    are already compressed and are stored as they are. The other files are
+    compressed by threadCount threads at once, then written in order.
+    
+    Writing files compressed beforehand needs the internals of the zipfile
+    module of Python 2. If they are not there, the files are compressed one
+    after the other by the zipfile module.
+    
+    arguments:
+        archiveFilename
+            string corresponding to the archive to write.
+        filenames
+            list of str corresponding to the files to put in the archive.
+            Their names in the archive are their paths, as with
+            zipfile.ZipFile.write.
+    
+    """
+    archive = zipfile.ZipFile(archiveFilename, "w", zipfile.ZIP_DEFLATED)
+    try:
+        isPrecompressing = _CanWriteCompressed(archive)
+        
+        # small batches, so only a few compressed files are in memory
+        batchSize = max(threadCount, 1) * 4
+        for first in range(0, len(filenames), batchSize):
+            batch = filenames[first : first + batchSize]
+            
+            compressedFiles = {}
+            if (isPrecompressing):
+                _CompressFiles(batch, compressedFiles, threadCount)
+            
+            for filename in batch:
+                if (FUtils.GetExtension(filename).lower() in
+                        PACKAGE_STORED_EXTENSIONS):
+                    archive.write(filename, None, zipfile.ZIP_STORED)
+                elif (compressedFiles.has_key(filename)):
+                    _WriteCompressed(archive, filename,
+                                     compressedFiles[filename])
+                else:
+                    archive.write(filename)
+    finally:
+        archive.close()
+
+def _CanWriteCompressed(archive):
+    return (hasattr(archive, "fp") and hasattr(archive, "filelist") and
+            hasattr(archive, "NameToInfo") and
+            hasattr(archive, "_didModify") and
+            hasattr(zipfile.ZipInfo, "FileHeader"))
+
+def _CompressFiles(filenames, compressedFiles, threadCount):
+    """_CompressFiles(filenames, compressedFiles, threadCount) -> None
+    
+    Compresses the files which are not stored as they are. zlib releases
+    the interpreter lock while compressing, so the threads do run at once.
+    
+    arguments:
+        filenames
+            list of str corresponding to the files to compress.
+        compressedFiles
+            dictionary to fill with, for each file compressed, the tuple of
+            its CRC, size and compressed data. The files that cannot be read
+            are left out.
+        threadCount
+            int corresponding to the number of files compressed at once.
+    
+    """
+    pendingFilenames = []
+    for filename in filenames:
+        if (not FUtils.GetExtension(filename).lower() in
+                PACKAGE_STORED_EXTENSIONS):
+            pendingFilenames.append(filename)
+    lock = threading.Lock()
+    
+    def CompressFiles():
+        while (True):
+            lock.acquire()
+            try:
+                if (len(pendingFilenames) == 0): return
+                filename = pendingFilenames.pop()
+            finally:
+                lock.release()
+            
+            try:
+                file = open(filename, "rb")
+                try:
+                    data = file.read()
+                finally:
+                    file.close()
+            except IOError, e:
+                continue # zipfile reports it while writing
+            
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION,
+                                          zlib.DEFLATED, -15)
+            compressed = compressor.compress(data) + compressor.flush()
+            crc = zlib.crc32(data) & 0xffffffffL
+            
+            lock.acquire()
+            try:
+                compressedFiles[filename] = (crc, len(data), compressed)
+            finally:
+                lock.release()
+    
+    threads = []
+    for i in range(min(threadCount, len(pendingFilenames))):
+        thread = threading.Thread(target = CompressFiles)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+def _WriteCompressed(archive, filename, compressedFile):
+    """_WriteCompressed(archive, filename, compressedFile) -> None
+    
+    Writes a file compressed by _CompressFiles the way
+    zipfile.ZipFile.write would have.
+    
+    """
+    crc, size, compressed = compressedFile
+    if ((size > zipfile.ZIP64_LIMIT) or
+            (len(compressed) > zipfile.ZIP64_LIMIT)):
+        archive.write(filename)
+        return
+    
+    stat = os.stat(filename)
+    arcname = os.path.normpath(os.path.splitdrive(filename)[1])
+    while (arcname[0] in (os.sep, os.altsep)):
+        arcname = arcname[1:]
+    
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(stat.st_mtime)[0:6])
+    zinfo.external_attr = (stat.st_mode & 0xFFFF) << 16L
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.file_size = size
+    zinfo.compress_size = len(compressed)
+    zinfo.CRC = crc
+    zinfo.header_offset = archive.fp.tell()
+    
+    archive.fp.write(zinfo.FileHeader())
+    archive.fp.write(compressed)
+    archive.filelist.append(zinfo)
+    archive.NameToInfo[zinfo.filename] = zinfo
+    archive._didModify = True
@@ -6,9 +6,11 @@
 # THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
 
 import os.path
-import xml.sax.expatreader as Expat
+import threading
+import xml.parsers.expat as Expat
 import xml.sax.handler as XMLHandler
 import Core.Common.FUtils as FUtils
+from Core.Common.FConstants import *
 
 def IsCOLLADADocument(filename):
     """ IsCOLLADADocument(filename) -> Boolean
@@ -50,32 +52,123 @@ def GetCOLLADAAssetInformation(filename):
         the <keywords> element content.
     
     """
-    keyword = ""
-    title = ""
-    subject = ""
-    reader = Expat.ExpatParser(0, 4*1024)
+    return COLLADAAssetReader().Read(filename)
 
-    try:
-        contentHandler = COLLADAAssetProcessor()
-        reader.setContentHandler(contentHandler)
-        reader.parse(filename)
-        
-        # In theory, you should never get here:
-        # the EarlyExitException should always be triggered.
-        keyword = contentHandler.GetKeyword()
-        title = contentHandler.GetTitle()
-        subject = contentHandler.GetSubject()
-        reader.close()
-    
-    except EarlyExitException, e:
-        keyword = contentHandler.GetKeyword()
-        title = contentHandler.GetTitle()
-        subject = contentHandler.GetSubject()
-        
-    except Exception, e:
-        pass
-        
-    return (title, subject, keyword)
+def GetCOLLADAAssetInformations(filenames, 
+                                threadCount = COLLADA_ASSET_THREAD_COUNT):
+    """GetCOLLADAAssetInformations(filenames, threadCount = COLLADA_ASSET_THREAD_COUNT) -> dict
+    
+    Retrieves the asset information of many COLLADA documents at once, as
+    GetCOLLADAAssetInformation does. Each thread reads its share of the
+    documents with its own COLLADAAssetReader.
+    
+    arguments:
+        filenames
+            list of strings corresponding to COLLADA document filenames.
+        threadCount
+            int corresponding to the number of threads reading documents.
+    
+    returns:
+        dict mapping each filename to its (title, subject, keyword).
+    
+    """
+    informations = {}
+    threadCount = max(1, min(threadCount, len(filenames)))
+    if (threadCount <= 1):
+        reader = COLLADAAssetReader()
+        for filename in filenames:
+            informations[filename] = reader.Read(filename)
+        return informations
+    
+    # the dict is only written to one key at a time
+    threads = []
+    for i in range(threadCount):
+        thread = threading.Thread(target = COLLADAAssetReader().ReadAll, 
+                args = (filenames[i::threadCount], informations))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return informations
+
+class COLLADAAssetReader:
+    
+    """Reads the <asset> information at the start of COLLADA documents.
+    
+    Only the beginning of a document is read, a block at a time, until the
+    top-level <asset> element is closed or readSize bytes were read. The
+    content handler is reused from one document to the next. A reader must
+    not be used by two threads at once.
+    
+    """
+    
+    __BLOCK_SIZE = 4 * 1024
+    
+    def __init__(self, readSize = COLLADA_ASSET_READ_SIZE):
+        """__init__(readSize = COLLADA_ASSET_READ_SIZE) -> COLLADAAssetReader
+        
+        arguments:
+            readSize
+                int corresponding to the maximum number of bytes read from
+                a document.
+        
+        """
+        self.__readSize = readSize
+        self.__contentHandler = COLLADAAssetProcessor()
+    
+    def Read(self, filename):
+        """Read(filename) -> (str, str, str)
+        
+        Implements GetCOLLADAAssetInformation().
+        
+        """
+        contentHandler = self.__contentHandler
+        contentHandler.Reset()
+        
+        # an expat parser cannot parse a second document
+        parser = Expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = contentHandler.startElement
+        parser.EndElementHandler = contentHandler.endElement
+        parser.CharacterDataHandler = contentHandler.characters
+        
+        try:
+            file = open(filename, "rb")
+            try:
+                readSize = 0
+                while (readSize < self.__readSize):
+                    data = file.read(min(COLLADAAssetReader.__BLOCK_SIZE, 
+                                         self.__readSize - readSize))
+                    if (len(data) == 0): break
+                    readSize = readSize + len(data)
+                    parser.Parse(data, 0)
+            finally:
+                file.close()
+        
+        except EarlyExitException, e:
+            pass
+        
+        except Exception, e:
+            return ("", "", "")
+        
+        return (contentHandler.GetTitle(), contentHandler.GetSubject(), 
+                contentHandler.GetKeyword())
+    
+    def ReadAll(self, filenames, informations):
+        """ReadAll(filenames, informations) -> None
+        
+        Reads several documents.
+        
+        arguments:
+            filenames
+                list of strings corresponding to COLLADA document filenames.
+            informations
+                dict in which to map each filename to its 
+                (title, subject, keyword).
+        
+        """
+        for filename in filenames:
+            informations[filename] = self.Read(filename)
 
 class EarlyExitException(Exception):
     """ [INTERNAL] This exception is used to kill the SAX parser
@@ -84,6 +177,9 @@ class EarlyExitException(Exception):
 class COLLADAAssetProcessor(XMLHandler.ContentHandler):
     
     def __init__(self):
+        self.Reset()
+    
+    def Reset(self):
         self.__keyword = ""
         self.__title = ""
         self.__subject = ""
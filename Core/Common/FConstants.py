@@ -13,12 +13,17 @@ OPERATIONS = [IMPORT, EXPORT, RENDER, VALIDATE]
 OPS_NEEDING_APP = [IMPORT, VALIDATE]
 SCHEMA_LOCATION = "COLLADASchema.xsd"
 SCHEMA_NAMESPACE = "http://www.collada.org/2005/11/COLLADASchema"
+SCHEMA_VALIDATE_EXECUTABLE = "SchemaValidate.exe"
+SCHEMA_VALIDATE_INTERNAL = "Internal" # schemaValidatePath to validate in-process
 ABSTRACT_APPLICATION = "FApplication.py"
 SCRIPTS_DIR = "../Scripts"
 IMAGE_COMPARATORS_DIR = "../ImageComparators" # directory where image comparators are stored
 IMAGE_COMPARATORS_LABEL = "imageComparator" # tag in the config file for selected comparator
 ROOT_DIR = "../StandardDataSets" # backward compatibility
 DATA_SET_DIRS = ["../StandardDataSets",] # rel. path
+DATA_SET_CATALOG_FILENAME = "dataSetCatalog.obj"
+COLLADA_ASSET_READ_SIZE = 64 * 1024 # bytes read to find the <asset>
+COLLADA_ASSET_THREAD_COUNT = 4 # threads reading <asset> in bulk
 SETTINGS_DIR = "../ApplicationSettings"
 SETTING_EXT = "txt"
 LOG_EXT = "log"
@@ -26,29 +31,45 @@ RUNS_FOLDER = "../TestProcedures"
 MAIN_FOLDER = ".."
 CSV_POSTFIX = "_Files"
 HTML_POSTFIX = "_Files"
+HTML_TESTS_PER_PAGE = 500 # tests per page of a HTML report
+EXPORT_COPY_THREAD_COUNT = 4 # threads copying the files of a report
+PACKAGE_THREAD_COUNT = 4 # threads compressing the files of a package
+PACKAGE_STORED_EXTENSIONS = ["png", "jpg", "jpeg", "gif", "zip"] # already compressed
 IMAGES_DIR = "images"
 BLESSED_DIR = "Blessed"
 BLESSED_EXECUTIONS = "executions"
 BLESSED_ANIMATIONS = "animations"
 BLESSED_EXECUTIONS_HASH = "executionsManager"
 BLESSED_DEFAULT_FILE = "default.txt"
+BLESSED_INDEX_FILE = "blessedIndex.obj"
 TEST_PROCEDURE_FILENAME = "serializedTestProcedure.obj"
+TEST_PROCEDURE_STORE_FILENAME = "serializedObjects.idx"
 TEST_PROCEDURE_COMMENTS = "comments.txt"
 TEST_GUI_PREFERENCES = "prefs.obj"
 ASSET_FILENAME = "../temp.txt"
 TEST_FILENAME = "serializedTest.obj"
 EXECUTION_FILENAME = "serializedExecution.obj"
 EXECUTION_PREFIX = "Execution_"
+EXECUTION_CACHE_SIZE = 256 # tests with their executions loaded at once
+IMAGE_CACHE_BUDGET = 128 * 1024 * 1024 # bytes of decoded images kept
+THUMBNAIL_CACHE_DIR = "../ThumbnailCache"
+THUMBNAIL_CACHE_SIZE = 1024 # grid thumbnails kept in memory
+THUMBNAIL_CACHE_FILE_COUNT = 16384 # grid thumbnails kept on disk
 STEP_PREFIX = "step"
 TEST_PREFIX = "Test"
 DCC_WORK1 = "WorkingDir"
 DCC_WORK2 = "Execution"
 DCC_WORK3 = "Step"
+DCC_WORKER_PREFIX = "Worker"
+DCC_PROCESS_MARKER = "@CTS" # starts the protocol lines of a DCC worker
+DCC_PROCESS_READY = "READY"
+DCC_PROCESS_OK = "OK"
+DCC_PROCESS_ERROR = "ERROR"
+DCC_PROCESS_STOP_TIMEOUT = 10 # seconds to wait for a DCC worker to quit
 PASS = 1
 FAIL = 0
 CONFIGURATION_FILE = "../config.txt"
 DOCUMENTATION = "..\Documentation\README.doc"
-FILEWATCHER = "FileWatcher.exe"
 KILLER = "ProcessKiller.exe"
 VERSION = 1.0
 PACKAGE_RESULTS_DIR = "../PackagedResults"
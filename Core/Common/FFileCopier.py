@@ -0,0 +1,186 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import os
+import os.path
+import shutil
+import threading
+import Queue
+
+import Core.Common.FUtils as FUtils
+from Core.Common.FConstants import *
+
+class FFileCopier:
+    
+    """Copies files in the background, once per content.
+    
+    It is used to export the files of a report. When a file has the same
+    content as a file already copied, the copy is skipped and the first copy
+    is used instead; files of different sizes are not compared, so only
+    files with the same size as another one are read to be compared. Copies
+    are made by threadCount threads. Where the file system allows, the copy
+    of a file that is never modified afterwards, like the outputs of an
+    execution, is a hard link to the file instead, which costs no space and
+    no I/O.
+    
+    """
+    
+    def __init__(self, threadCount = EXPORT_COPY_THREAD_COUNT,
+                 isLinking = True):
+        """__init__(threadCount = EXPORT_COPY_THREAD_COUNT, isLinking = True) -> FFileCopier
+        
+        arguments:
+            threadCount
+                int corresponding to the number of files copied at once.
+            isLinking
+                bool corresponding to whether to make hard links instead of
+                copies where possible.
+        
+        """
+        self.__threadCount = threadCount
+        self.__isLinking = isLinking and hasattr(os, "link")
+        self.__copies = Queue.Queue()
+        self.__threads = []
+        self.__sizes = {}
+        self.__unreadFiles = {} # size -> (source, destination)
+        self.__destinations = {} # checksum -> destination
+        self.__copyCount = 0
+        self.__skipCount = 0
+    
+    def Copy(self, source, destination, isLinkable = False):
+        """Copy(source, destination, isLinkable = False) -> str
+        
+        Copies a file, unless a file with the same content was already
+        copied. The copy may not be done before Wait returns.
+        
+        arguments:
+            source
+                string corresponding to the file to copy.
+            destination
+                string corresponding to where to copy it.
+            isLinkable
+                bool corresponding to whether the file is never modified, so
+                the copy can be a hard link to it. Modifying the file would
+                modify the copy too.
+        
+        returns:
+            str corresponding to the copy of the file: destination, or the
+            copy of a file with the same content.
+        
+        """
+        size = os.path.getsize(source)
+        if (self.__sizes.has_key(size)):
+            # files are only read when there is something to compare them with
+            if (self.__unreadFiles.has_key(size)):
+                unreadSource, unreadDestination = self.__unreadFiles.pop(size)
+                self.__AddDestination(self.__GetChecksum(unreadSource), 
+                                      unreadDestination)
+            
+            checksum = self.__GetChecksum(source)
+            if ((checksum != None) and 
+                    self.__destinations.has_key(checksum)):
+                self.__skipCount = self.__skipCount + 1
+                return self.__destinations[checksum]
+            self.__AddDestination(checksum, destination)
+        else:
+            self.__sizes[size] = True
+            self.__unreadFiles[size] = (source, destination)
+        
+        if (len(self.__threads) < self.__threadCount):
+            thread = threading.Thread(target = self.__CopyFiles)
+            thread.setDaemon(True)
+            thread.start()
+            self.__threads.append(thread)
+        self.__copies.put((source, destination, isLinkable))
+        self.__copyCount = self.__copyCount + 1
+        return destination
+    
+    def __AddDestination(self, checksum, destination):
+        if ((checksum != None) and (not self.__destinations.has_key(checksum))):
+            self.__destinations[checksum] = destination
+    
+    def __GetChecksum(self, filename):
+        """__GetChecksum(filename) -> str
+        
+        returns:
+            str corresponding to the checksum of the file, or None if it
+            cannot be read.
+        
+        """
+        try:
+            stat = os.stat(filename)
+        except OSError, e:
+            return None
+        key = (os.path.normcase(os.path.abspath(filename)), stat.st_size,
+               stat.st_mtime)
+        
+        # the files exported are often exported again by the next report
+        _checksumsLock.acquire()
+        try:
+            if (_checksums.has_key(key)): return _checksums[key]
+        finally:
+            _checksumsLock.release()
+        
+        file = None
+        try:
+            try:
+                file = open(filename, "rb")
+                checksum = FUtils.CalculateStringChecksum(file.read())
+            except IOError, e:
+                return None
+        finally:
+            if (file != None):
+                file.close()
+        
+        _checksumsLock.acquire()
+        try:
+            _checksums[key] = checksum
+        finally:
+            _checksumsLock.release()
+        return checksum
+    
+    def __CopyFiles(self):
+        while (True):
+            copy = self.__copies.get()
+            if (copy == None): break
+            
+            source, destination, isLinkable = copy
+            if (self.__isLinking and isLinkable):
+                try:
+                    os.link(source, destination)
+                    continue
+                except OSError, e:
+                    pass # another drive or a file system without links
+            
+            try:
+                shutil.copy2(source, destination)
+            except IOError, e:
+                print ("Unable to copy " + source + " to " +
+                        destination + ", " + "probably due to " +
+                        "filename too long. Skipping.")
+    
+    def Wait(self):
+        """Wait() -> None
+        
+        Waits until all the files are copied.
+        
+        """
+        for thread in self.__threads:
+            self.__copies.put(None)
+        for thread in self.__threads:
+            thread.join()
+        self.__threads = []
+    
+    def GetCopyCount(self):
+        return self.__copyCount
+    
+    def GetSkipCount(self):
+        return self.__skipCount
+
+# checksums of the files by path, size and modification time
+_checksums = {}
+_checksumsLock = threading.Lock()
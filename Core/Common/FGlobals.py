@@ -10,3 +10,15 @@ imageComparator = None
 
 # The list of badge levels to judge and consider
 badgeLevels = []
+
+# The number of DCC processes that may run a test procedure concurrently
+workerCount = 1
+
+# The number of tests validated and compiled concurrently after running
+postRunWorkerCount = 1
+
+# The schema validator executable, or "Internal" to validate in-process
+schemaValidatePath = "SchemaValidate.exe"
+
+# Whether test procedures save their tests and executions to a FObjectStore
+useProcedureStore = False
@@ -0,0 +1,144 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import os
+import os.path
+import threading
+import wx
+
+from Core.Common.FConstants import *
+
+class FImageCache:
+    
+    """Keeps the decoded images that were read most recently.
+    
+    The same rendered image is decoded when it is judged, when it is
+    compared against the blessed images and when it is shown in the grid.
+    Images are cached by filename, size and modification time, so an image
+    that is overwritten is decoded again. Once the decoded images take more
+    than budget bytes, the least recently used ones are dropped.
+    
+    """
+    
+    def __init__(self, budget = IMAGE_CACHE_BUDGET):
+        """__init__(budget = IMAGE_CACHE_BUDGET) -> FImageCache
+        
+        arguments:
+            budget
+                int corresponding to the number of bytes the decoded images
+                can take.
+        
+        """
+        self.__budget = budget
+        self.__usedBytes = 0
+        self.__images = {}
+        self.__keys = []
+        self.__hitCount = 0
+        self.__missCount = 0
+        self.__lock = threading.Lock()
+    
+    def GetImage(self, filename):
+        """GetImage(filename) -> wx.Image
+        
+        Gets an image, decoding it only if it is not in the cache.
+        
+        arguments:
+            filename
+                string corresponding to the image file to decode.
+        
+        returns:
+            wx.Image corresponding to a copy of the decoded image which the
+            caller is free to modify, or None if the file cannot be decoded.
+        
+        """
+        try:
+            stat = os.stat(filename)
+        except OSError, e:
+            return None
+        key = (os.path.normcase(os.path.abspath(filename)), stat.st_size,
+               stat.st_mtime)
+        
+        self.__lock.acquire()
+        try:
+            if (self.__images.has_key(key)):
+                self.__hitCount = self.__hitCount + 1
+                self.__keys.remove(key)
+                self.__keys.append(key)
+                return self.__images[key].Copy()
+            self.__missCount = self.__missCount + 1
+        finally:
+            self.__lock.release()
+        
+        image = wx.Image(filename, wx.BITMAP_TYPE_ANY)
+        if (not image.Ok()): return None
+        
+        self.__lock.acquire()
+        try:
+            if (not self.__images.has_key(key)):
+                self.__Add(key, image)
+        finally:
+            self.__lock.release()
+        
+        return image.Copy()
+    
+    def __Add(self, key, image):
+        # forget the older versions of the file
+        for oldKey in self.__keys[:]:
+            if (oldKey[0] == key[0]):
+                self.__Remove(oldKey)
+        
+        self.__images[key] = image
+        self.__keys.append(key)
+        self.__usedBytes = self.__usedBytes + self.__GetByteCount(image)
+        
+        while ((self.__usedBytes > self.__budget) and (len(self.__keys) > 1)):
+            self.__Remove(self.__keys[0])
+    
+    def __Remove(self, key):
+        self.__usedBytes = (self.__usedBytes -
+                            self.__GetByteCount(self.__images[key]))
+        self.__images.pop(key)
+        self.__keys.remove(key)
+    
+    def __GetByteCount(self, image):
+        byteCount = image.GetWidth() * image.GetHeight() * 3
+        if (image.HasAlpha()):
+            byteCount = byteCount + image.GetWidth() * image.GetHeight()
+        return byteCount
+    
+    def Clear(self):
+        """Clear() -> None
+        
+        Drops all the decoded images.
+        
+        """
+        self.__lock.acquire()
+        try:
+            self.__images = {}
+            self.__keys = []
+            self.__usedBytes = 0
+        finally:
+            self.__lock.release()
+    
+    def GetHitCount(self):
+        return self.__hitCount
+    
+    def GetMissCount(self):
+        return self.__missCount
+
+_cache = FImageCache()
+
+def GetImageCache():
+    """GetImageCache() -> FImageCache
+    
+    Gets the decoded image cache shared by the whole process.
+    
+    returns:
+        FImageCache of the process.
+    
+    """
+    return _cache
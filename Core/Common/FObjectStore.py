@@ -0,0 +1,366 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import cPickle
+import os
+import os.path
+import threading
+
+from Core.Common.FConstants import *
+
+class FObjectStore:
+    
+    """A single append-only file holding the serialized objects of a test
+    procedure.
+    
+    The objects are indexed by their path relative to the test procedure
+    directory, so the store still works after the directory is copied or
+    renamed. Each save appends a record to the file and the latest record of
+    a path wins; a removal appends an empty record. The whole file is read
+    once when the store is opened, which replaces one file open per test and
+    per execution. Records left behind by later saves are dropped when the
+    store is compacted.
+    
+    """
+    
+    def __init__(self, rootDir):
+        """__init__(rootDir) -> FObjectStore
+        
+        Opens the store of a test procedure directory, creating an empty one
+        if there is none.
+        
+        arguments:
+            rootDir
+                string corresponding to the path of the test procedure
+                directory.
+        
+        """
+        self.__rootDir = os.path.normcase(os.path.abspath(rootDir))
+        self.__filename = os.path.join(self.__rootDir,
+                                       TEST_PROCEDURE_STORE_FILENAME)
+        self.__lock = threading.Lock()
+        self.__Read()
+    
+    def __Read(self):
+        self.__objects = {}
+        self.__wastedRecords = 0
+        
+        _RestoreCompacted(self.__filename)
+        if (not os.path.isfile(self.__filename)):
+            file = open(self.__filename, "wb")
+            file.close()
+        
+        file = open(self.__filename, "rb")
+        truncated = False
+        try:
+            while (True):
+                try:
+                    key, data = cPickle.load(file)
+                except EOFError, e:
+                    break
+                except Exception, e:
+                    # a save was interrupted while appending its record
+                    print ("<FObjectStore> ignoring the truncated end of " +
+                           self.__filename)
+                    truncated = True
+                    break
+                if (self.__objects.has_key(key)):
+                    self.__wastedRecords = self.__wastedRecords + 1
+                if (data == None):
+                    self.__wastedRecords = self.__wastedRecords + 1
+                    if (self.__objects.has_key(key)):
+                        self.__objects.pop(key)
+                else:
+                    self.__objects[key] = data
+        finally:
+            file.close()
+        
+        if (truncated or (self.__wastedRecords > len(self.__objects))):
+            self.Compact()
+        else:
+            self.__stat = self.__GetStat()
+    
+    def __GetStat(self):
+        stat = os.stat(self.__filename)
+        return (stat.st_size, stat.st_mtime)
+    
+    def __GetKey(self, filename):
+        filename = os.path.normcase(os.path.abspath(filename))
+        if (filename.find(self.__rootDir + os.sep) != 0): return None
+        return filename[len(self.__rootDir) + 1:].replace(os.sep, "/")
+    
+    def __Append(self, key, data):
+        file = open(self.__filename, "ab")
+        try:
+            cPickle.dump((key, data), file, cPickle.HIGHEST_PROTOCOL)
+        finally:
+            file.close()
+        self.__stat = self.__GetStat()
+    
+    def GetRootDir(self):
+        return self.__rootDir
+    
+    def GetFilename(self):
+        return self.__filename
+    
+    def IsOutdated(self):
+        """IsOutdated() -> bool
+        
+        returns:
+            bool corresponding to whether the file was changed or removed by
+            someone else since it was last read or written by this store.
+        
+        """
+        if (not os.path.isfile(self.__filename)): return True
+        return (self.__GetStat() != self.__stat)
+    
+    def Has(self, filename):
+        """Has(filename) -> bool
+        
+        arguments:
+            filename
+                string corresponding to the path the object was saved to.
+        
+        returns:
+            bool corresponding to whether an object is stored for filename.
+        
+        """
+        return self.__objects.has_key(self.__GetKey(filename))
+    
+    def Get(self, filename):
+        """Get(filename) -> str
+        
+        arguments:
+            filename
+                string corresponding to the path the object was saved to.
+        
+        returns:
+            str corresponding to the pickled object stored for filename.
+        
+        """
+        return self.__objects[self.__GetKey(filename)]
+    
+    def Put(self, filename, data):
+        """Put(filename, data) -> None
+        
+        Stores the pickled object for a path, replacing the previous one.
+        
+        arguments:
+            filename
+                string corresponding to the path the object is saved to.
+            data
+                str corresponding to the pickled object.
+        
+        """
+        key = self.__GetKey(filename)
+        if (key == None):
+            raise ValueError, filename + " is not in " + self.__rootDir
+        
+        self.__lock.acquire()
+        try:
+            if (self.__objects.has_key(key)):
+                self.__wastedRecords = self.__wastedRecords + 1
+            self.__Append(key, data)
+            self.__objects[key] = data
+        finally:
+            self.__lock.release()
+    
+    def Remove(self, path):
+        """Remove(path) -> None
+        
+        Removes the object stored for a path and all the objects stored
+        under it if path is a directory.
+        
+        arguments:
+            path
+                string corresponding to the file or directory to remove.
+        
+        """
+        key = self.__GetKey(path)
+        if (key == None): return
+        
+        self.__lock.acquire()
+        try:
+            for storedKey in self.__objects.keys():
+                if ((storedKey == key) or (storedKey.find(key + "/") == 0)):
+                    self.__Append(storedKey, None)
+                    self.__objects.pop(storedKey)
+                    self.__wastedRecords = self.__wastedRecords + 2
+        finally:
+            self.__lock.release()
+    
+    def Import(self, filenames):
+        """Import(filenames) -> None
+        
+        Copies pickle files into the store. This is how a test procedure
+        saved as a tree of pickle files is migrated. The pickle files are
+        left untouched but are not read anymore once imported.
+        
+        arguments:
+            filenames
+                list of strings corresponding to the pickle files to import.
+        
+        """
+        self.__lock.acquire()
+        try:
+            file = open(self.__filename, "ab")
+            try:
+                for filename in filenames:
+                    key = self.__GetKey(filename)
+                    if ((key == None) or self.__objects.has_key(key)): continue
+                    
+                    pickleFile = open(filename, "r")
+                    data = pickleFile.read()
+                    pickleFile.close()
+                    
+                    cPickle.dump((key, data), file, cPickle.HIGHEST_PROTOCOL)
+                    self.__objects[key] = data
+            finally:
+                file.close()
+            self.__stat = self.__GetStat()
+        finally:
+            self.__lock.release()
+    
+    def Compact(self):
+        """Compact() -> None
+        
+        Rewrites the file with only the latest record of each object.
+        
+        """
+        self.__lock.acquire()
+        try:
+            tempFilename = self.__filename + ".tmp"
+            file = open(tempFilename, "wb")
+            try:
+                for key, data in self.__objects.items():
+                    cPickle.dump((key, data), file, cPickle.HIGHEST_PROTOCOL)
+                file.flush()
+                os.fsync(file.fileno())
+            finally:
+                file.close()
+            
+            # os.rename does not replace an existing file on Windows, so the
+            # old file is moved aside first. If the process dies before the
+            # new file is in place, _RestoreCompacted puts one of them back.
+            oldFilename = self.__filename + ".old"
+            if (os.path.isfile(oldFilename)):
+                os.remove(oldFilename)
+            if (os.path.isfile(self.__filename)):
+                os.rename(self.__filename, oldFilename)
+            os.rename(tempFilename, self.__filename)
+            if (os.path.isfile(oldFilename)):
+                os.remove(oldFilename)
+            self.__wastedRecords = 0
+            self.__stat = self.__GetStat()
+        finally:
+            self.__lock.release()
+
+_stores = {}
+_storesLock = threading.Lock()
+
+def _RestoreCompacted(filename):
+    """_RestoreCompacted(filename) -> None
+    
+    Puts back the file of a store whose compaction was interrupted between
+    moving the old file aside and renaming the new one. The new file is
+    complete once the old one is moved aside, so it is preferred.
+    
+    arguments:
+        filename
+            string corresponding to the file of the store.
+    
+    """
+    if (os.path.isfile(filename)): return
+    
+    for leftoverFilename in [filename + ".tmp", filename + ".old"]:
+        if (os.path.isfile(leftoverFilename)):
+            print ("<FObjectStore> restoring " + filename + " from " +
+                   leftoverFilename)
+            os.rename(leftoverFilename, filename)
+            return
+
+def _GetProcedureDir(filename):
+    runsDir = os.path.normcase(os.path.abspath(RUNS_FOLDER))
+    filename = os.path.normcase(os.path.abspath(filename))
+    if (filename.find(runsDir + os.sep) != 0): return None
+    
+    relativePath = filename[len(runsDir) + 1:]
+    if (relativePath.find(os.sep) == -1): return None
+    return os.path.join(runsDir, relativePath[:relativePath.find(os.sep)])
+
+def GetStore(filename):
+    """GetStore(filename) -> FObjectStore
+    
+    Gets the store holding the objects saved to a path. Stores are shared
+    by the whole process and reread when changed by another process. The
+    test procedure itself is always saved to its own file since it is what
+    identifies a test procedure directory.
+    
+    arguments:
+        filename
+            string corresponding to the path of a serialized object.
+    
+    returns:
+        FObjectStore of the test procedure containing filename, or None if
+        it has no store.
+    
+    """
+    if (os.path.basename(filename) == TEST_PROCEDURE_FILENAME): return None
+    
+    procedureDir = _GetProcedureDir(filename)
+    if (procedureDir == None): return None
+    
+    _storesLock.acquire()
+    try:
+        store = _stores.get(procedureDir, None)
+        if ((store != None) and (not store.IsOutdated())): return store
+        
+        if (store != None):
+            _stores.pop(procedureDir)
+        _RestoreCompacted(
+                os.path.join(procedureDir, TEST_PROCEDURE_STORE_FILENAME))
+        if (not os.path.isfile(
+                os.path.join(procedureDir, TEST_PROCEDURE_STORE_FILENAME))):
+            return None
+        
+        store = FObjectStore(procedureDir)
+        _stores[procedureDir] = store
+        return store
+    finally:
+        _storesLock.release()
+
+def CreateStore(procedureDir):
+    """CreateStore(procedureDir) -> FObjectStore
+    
+    Creates the store of a test procedure, importing the objects already
+    saved in its tree of pickle files.
+    
+    arguments:
+        procedureDir
+            string corresponding to the path of the test procedure directory.
+    
+    returns:
+        FObjectStore of the test procedure.
+    
+    """
+    procedureDir = os.path.normcase(os.path.abspath(procedureDir))
+    
+    _storesLock.acquire()
+    try:
+        store = FObjectStore(procedureDir)
+        _stores[procedureDir] = store
+    finally:
+        _storesLock.release()
+    
+    filenames = []
+    for dirpath, dirnames, entries in os.walk(procedureDir):
+        for entry in entries:
+            if ((entry == TEST_FILENAME) or (entry == EXECUTION_FILENAME)):
+                filenames.append(os.path.join(dirpath, entry))
+    store.Import(filenames)
+    
+    return store
@@ -8,11 +8,17 @@
 import cPickle
 import os.path
 
+import Core.Common.FObjectStore as FObjectStore
 from Core.Common.FSerializable import *
 
 class FSerializer:
     
-    """An object that can save and load a FSerializable."""
+    """An object that can save and load a FSerializable.
+    
+    The objects saved under a test procedure directory that has a
+    FObjectStore go to the store instead of their own file.
+    
+    """
     
     def __init__(self):
         """__init() -> FSerializer
@@ -39,12 +45,62 @@ class FSerializer:
                 will not save and return normally.
         
         """
+        store = FObjectStore.GetStore(filename)
+        if (store != None):
+            if (store.Has(filename) and (not overwrite)): return
+            store.Put(filename, cPickle.dumps(object))
+            return
+        
         if (os.path.isfile(filename) and (not overwrite)): return
         
         file = open(filename, "w")
         cPickle.dump(object, file)
         file.close()
     
+    def IsSaved(self, filename):
+        """IsSaved(filename) -> bool
+        
+        Checks if a FSerializable was saved to a file. Use this instead of
+        os.path.isfile since the file does not exist when it was saved to a
+        FObjectStore.
+        
+        arguments:
+            filename
+                string corresponding to the absolute path of the file to check.
+        
+        returns:
+            bool corresponding to whether there is a FSerializable to load.
+        
+        """
+        store = FObjectStore.GetStore(filename)
+        if (store != None): return store.Has(filename)
+        return os.path.isfile(filename)
+    
+    def DiscardSaved(self, path):
+        """DiscardSaved(path) -> None
+        
+        Discards the FSerializables saved to a file or under a directory that 
+        is about to be deleted.
+        
+        arguments:
+            path
+                string corresponding to the file or directory to discard.
+        
+        """
+        store = FObjectStore.GetStore(path)
+        if (store != None):
+            store.Remove(path)
+    
+    def __Read(self, filename):
+        store = FObjectStore.GetStore(filename)
+        if ((store != None) and store.Has(filename)):
+            return cPickle.loads(store.Get(filename))
+        
+        file = open(filename, "r")
+        object = cPickle.load(file)
+        file.close()
+        return object
+    
     def QuickLoad(self, filename):
         """QuickLoad(filename) -> FSerializable
         
@@ -61,11 +117,7 @@ class FSerializer:
             the loaded FSerializable.
         
         """
-        file = open(filename, "r")
-        object = cPickle.load(file)
-        file.close()
-        
-        return object
+        return self.__Read(filename)
     
     def Load(self, filename):
         """Load(filename) -> FSerializable
@@ -80,9 +132,7 @@ class FSerializer:
             the loaded FSerializable.
         
         """
-        file = open(filename, "r")
-        object = cPickle.load(file)
-        file.close()
+        object = self.__Read(filename)
         
         if (not isinstance(object, FSerializable)):
             print ("<FSerializer> loaded object is not FSerializable: " + 
@@ -0,0 +1,201 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import os
+import os.path
+import threading
+import wx
+
+import Core.Common.FUtils as FUtils
+from Core.Common.FConstants import *
+from Core.Common.FImageCache import *
+
+class FThumbnailCache:
+    
+    """Keeps the thumbnails shown in the grid, in memory and on disk.
+    
+    A thumbnail is the image scaled down to fit in the thumbnail size,
+    keeping its proportions. Thumbnails are cached by filename, size and
+    modification time of the image and by thumbnail size. They are saved as
+    PNG files in the cache directory, so reopening a test procedure does not
+    decode the full images again. Only the thumbnails used most recently are
+    kept in memory and on disk: once the cache directory holds more than
+    fileCount files, the files used least recently are removed.
+    
+    """
+    
+    def __init__(self, cacheDir = THUMBNAIL_CACHE_DIR,
+                 size = THUMBNAIL_CACHE_SIZE,
+                 fileCount = THUMBNAIL_CACHE_FILE_COUNT):
+        """__init__(cacheDir = THUMBNAIL_CACHE_DIR, size = THUMBNAIL_CACHE_SIZE, fileCount = THUMBNAIL_CACHE_FILE_COUNT) -> FThumbnailCache
+        
+        arguments:
+            cacheDir
+                string corresponding to the directory to save thumbnails in.
+            size
+                int corresponding to the number of thumbnails kept in memory.
+            fileCount
+                int corresponding to the number of thumbnails kept on disk.
+        
+        """
+        self.__cacheDir = cacheDir
+        self.__size = size
+        self.__fileCount = fileCount
+        self.__thumbnails = {}
+        self.__keys = []
+        self.__lock = threading.Lock()
+        self.__savesBeforePrune = 0 # prune on the first save
+    
+    def GetThumbnail(self, filename, width, height):
+        """GetThumbnail(filename, width, height) -> wx.Image
+        
+        Gets the thumbnail of an image, decoding the image only if the
+        thumbnail is neither in memory nor on disk.
+        
+        arguments:
+            filename
+                string corresponding to the image file.
+            width
+                int corresponding to the maximum width of the thumbnail.
+            height
+                int corresponding to the maximum height of the thumbnail.
+        
+        returns:
+            wx.Image corresponding to a copy of the thumbnail which the
+            caller is free to modify, or None if the file cannot be decoded.
+        
+        """
+        try:
+            stat = os.stat(filename)
+        except OSError, e:
+            return None
+        key = (os.path.normcase(os.path.abspath(filename)), stat.st_size,
+               stat.st_mtime, width, height)
+        
+        self.__lock.acquire()
+        try:
+            if (self.__thumbnails.has_key(key)):
+                self.__keys.remove(key)
+                self.__keys.append(key)
+                return self.__thumbnails[key].Copy()
+        finally:
+            self.__lock.release()
+        
+        thumbnailFilename = os.path.join(self.__cacheDir,
+                FUtils.CalculateStringChecksum(repr(key)) + ".png")
+        thumbnail = None
+        if (os.path.isfile(thumbnailFilename)):
+            thumbnail = wx.Image(thumbnailFilename, wx.BITMAP_TYPE_PNG)
+            if (thumbnail.Ok()):
+                # the modification time tells __Prune it was used recently
+                try:
+                    os.utime(thumbnailFilename, None)
+                except OSError, e:
+                    pass
+            else:
+                thumbnail = None
+        
+        if (thumbnail == None):
+            thumbnail = self.__CreateThumbnail(filename, width, height)
+            if (thumbnail == None): return None
+            self.__SaveThumbnail(thumbnail, thumbnailFilename)
+        
+        self.__lock.acquire()
+        try:
+            if (not self.__thumbnails.has_key(key)):
+                self.__thumbnails[key] = thumbnail
+                self.__keys.append(key)
+                while (len(self.__keys) > self.__size):
+                    self.__thumbnails.pop(self.__keys.pop(0))
+        finally:
+            self.__lock.release()
+        
+        return thumbnail.Copy()
+    
+    def __CreateThumbnail(self, filename, width, height):
+        image = GetImageCache().GetImage(filename)
+        if (image == None): return None
+        
+        dx = image.GetWidth() - width
+        dy = image.GetHeight() - height
+        if ((dx > 0) or (dy > 0)):
+            if (dx > dy):
+                newWidth = float(width)
+                ratio = newWidth / image.GetWidth()
+                newHeight = ratio * image.GetHeight()
+            else:
+                newHeight = float(height)
+                ratio = newHeight / image.GetHeight()
+                newWidth = ratio * image.GetWidth()
+            image.Rescale(max(int(newWidth), 1), max(int(newHeight), 1))
+        return image
+    
+    def __SaveThumbnail(self, thumbnail, thumbnailFilename):
+        # the disk cache is only an optimization
+        try:
+            if (not os.path.isdir(self.__cacheDir)):
+                os.makedirs(self.__cacheDir)
+        except OSError, e:
+            return
+        
+        logNull = wx.LogNull()
+        thumbnail.SaveFile(thumbnailFilename, wx.BITMAP_TYPE_PNG)
+        del logNull
+        
+        # listing the directory on every save would cost more than the save
+        self.__lock.acquire()
+        try:
+            isPruning = (self.__savesBeforePrune <= 0)
+            if (isPruning):
+                self.__savesBeforePrune = max(self.__fileCount / 8, 1)
+            else:
+                self.__savesBeforePrune = self.__savesBeforePrune - 1
+        finally:
+            self.__lock.release()
+        if (isPruning):
+            self.__Prune()
+    
+    def __Prune(self):
+        """__Prune() -> None
+        
+        Removes the thumbnails used least recently from the cache directory
+        until it holds at most fileCount thumbnails.
+        
+        """
+        try:
+            entries = os.listdir(self.__cacheDir)
+        except OSError, e:
+            return
+        if (len(entries) <= self.__fileCount): return
+        
+        files = []
+        for entry in entries:
+            filename = os.path.join(self.__cacheDir, entry)
+            try:
+                files.append((os.path.getmtime(filename), filename))
+            except OSError, e:
+                pass # removed by another process
+        files.sort()
+        
+        for modificationTime, filename in files[:-self.__fileCount]:
+            try:
+                os.remove(filename)
+            except OSError, e:
+                pass
+
+_cache = FThumbnailCache()
+
+def GetThumbnailCache():
+    """GetThumbnailCache() -> FThumbnailCache
+    
+    Gets the thumbnail cache shared by the whole process.
+    
+    returns:
+        FThumbnailCache of the process.
+    
+    """
+    return _cache
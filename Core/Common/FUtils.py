@@ -403,6 +403,17 @@ def CalculateChecksum(filename):
     except Exception, e:
         return "0000000000000000000000000000000000000000"
     
+def CalculateStringChecksum(string):
+    """ CalculateStringChecksum(string) -> str
+    
+    Calculates the SHA checksum of a string.
+    
+    returns:
+        string of the checksum for the given string.
+    
+    """
+    return SHA1.new(string).hexdigest()
+
 def CalculateSuiteChecksum():
     """ CalculateSuiteChecksum() -> str
     
@@ -436,6 +447,25 @@ def CalculateSuiteChecksum():
 
     return checksum + "----\n"
 
+# the framework does not change while it runs; by working directory since
+# CalculateSuiteChecksum uses relative paths
+_suiteChecksums = {}
+
+def GetSuiteChecksum():
+    """ GetSuiteChecksum() -> str
+    
+    Gets the checksum of CalculateSuiteChecksum, calculating it only the
+    first time.
+    
+    return:
+        string of the checksums for the test framework script files.
+    
+    """
+    key = os.getcwd()
+    if (not _suiteChecksums.has_key(key)):
+        _suiteChecksums[key] = CalculateSuiteChecksum()
+    return _suiteChecksums[key]
+
 def FindXmlChild(node, *childNames):
     """ FindXmlChild(node, *childName) -> xml.dom.Node
 
@@ -0,0 +1,385 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import os
+import os.path
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import ctypes
+except ImportError:
+    ctypes = None
+
+# This module is also imported by the scripts generated for the DCCs, which
+# run in another Python process and without the framework in their path. It
+# must not import anything from the framework.
+
+_TIMES_EXT = "time"
+_CREATE_NEW_PROCESS_GROUP = 0x00000200
+
+class FWatchdog:
+    
+    """Runs commands and kills them when they hang or crash.
+    
+    A command is considered hung when nothing changes in the watched
+    directory for timeout seconds. It is checked timeout / 10 seconds after
+    the command started and as often afterwards, by looking at the sizes and
+    modification times of the files of the watched directory. A command that
+    finishes before is never checked, so fast commands only pay for starting
+    the process. Without a watched directory, the timeout is the time the
+    command can take.
+    
+    A hung command is killed with its whole process group, so the processes
+    started by the command do not keep running.
+    
+    """
+    
+    __SCAN_DIVISOR = 10
+    __MIN_SCAN_INTERVAL = 0.5
+    
+    def __init__(self, watchedDir = None, timeout = None):
+        """__init__(watchedDir = None, timeout = None) -> FWatchdog
+        
+        arguments:
+            watchedDir
+                string corresponding to the directory where the commands
+                write, or None to only watch the time they take.
+            timeout
+                float corresponding to the number of seconds without any
+                change in watchedDir before a command is killed, or None to
+                never kill commands.
+        
+        """
+        self.__watchedDir = watchedDir
+        self.__timeout = timeout
+    
+    def Run(self, command, log = None):
+        """Run(command, log = None) -> (int, float, float)
+        
+        Runs a command and waits until it finishes or hangs.
+        
+        arguments:
+            command
+                string or list of str corresponding to the command to run.
+            log
+                file object to write the output of the command to, or None to
+                dump it to stdout.
+        
+        returns:
+            tuple with the return value of the command, or None if it was
+            killed, the wall time and the CPU time it took in seconds. The
+            CPU time is None if it cannot be measured on this platform.
+        
+        """
+        startCpuTime = GetChildrenCpuTime()
+        startTime = time.time()
+        process = StartProcess(command, stdout = log,
+                               stderr = subprocess.STDOUT)
+        finished = WatchProcess(process)
+        
+        isKilled = False
+        if (self.__timeout == None):
+            finished.wait()
+        else:
+            interval = max(float(self.__timeout) / FWatchdog.__SCAN_DIVISOR,
+                           FWatchdog.__MIN_SCAN_INTERVAL)
+            lastActivity = startTime
+            statistics = None
+            while (not finished.isSet()):
+                finished.wait(interval)
+                if (finished.isSet()): break
+                
+                now = time.time()
+                if (self.__watchedDir != None):
+                    newStatistics, newestTime = self.__GetStatistics()
+                    if ((statistics != None) and
+                            (newStatistics != statistics)):
+                        lastActivity = now
+                    statistics = newStatistics
+                    lastActivity = max(lastActivity, newestTime)
+                
+                if (now - lastActivity > self.__timeout):
+                    KillProcess(process)
+                    finished.wait()
+                    isKilled = True
+        
+        wallTime = time.time() - startTime
+        cpuTime = GetProcessCpuTime(process)
+        if ((cpuTime == None) and (startCpuTime != None)):
+            cpuTime = GetChildrenCpuTime() - startCpuTime
+        
+        if (isKilled):
+            return (None, wallTime, cpuTime)
+        return (process.returncode, wallTime, cpuTime)
+    
+    def __GetStatistics(self):
+        """__GetStatistics() -> ((int, int, int), float)
+        
+        returns:
+            pair with the total size, file count and directory count of the
+            watched directory, and the newest modification time in it.
+        
+        """
+        size = 0
+        fileCount = 0
+        dirCount = 0
+        newestTime = 0
+        for root, dirs, files in os.walk(self.__watchedDir):
+            fileCount = fileCount + len(files)
+            dirCount = dirCount + len(dirs)
+            for file in files:
+                try:
+                    stat = os.stat(os.path.join(root, file))
+                except OSError, e:
+                    continue # deleted while walking
+                size = size + stat.st_size
+                newestTime = max(newestTime, stat.st_mtime)
+        return ((size, fileCount, dirCount), newestTime)
+
+def StartProcess(command, **options):
+    """StartProcess(command, **options) -> subprocess.Popen
+    
+    Starts a command in its own process group, so KillProcess can kill the
+    processes it starts too.
+    
+    arguments:
+        command
+            string or list of str corresponding to the command to run. A
+            string is run by the shell on platforms other than Windows, so
+            the quoting is the same as on Windows.
+        options
+            keyword arguments for subprocess.Popen.
+    
+    returns:
+        subprocess.Popen of the command.
+    
+    """
+    if (sys.platform == "win32"):
+        options["creationflags"] = (options.get("creationflags", 0) |
+                                    _CREATE_NEW_PROCESS_GROUP)
+    else:
+        options["preexec_fn"] = os.setsid
+        if (type(command) == type("")):
+            options["shell"] = True
+    return subprocess.Popen(command, **options)
+
+def WatchProcess(process):
+    """WatchProcess(process) -> threading.Event
+    
+    Waits for a process in another thread.
+    
+    arguments:
+        process
+            subprocess.Popen to wait for.
+    
+    returns:
+        threading.Event which is set when the process has finished. Waiting
+        on it with a timeout returns as soon as the process finishes.
+    
+    """
+    finished = threading.Event()
+    def Wait():
+        process.wait()
+        finished.set()
+    thread = threading.Thread(target = Wait)
+    thread.setDaemon(True)
+    thread.start()
+    return finished
+
+def KillProcess(process):
+    """KillProcess(process) -> None
+    
+    Kills a process and the processes it started. The process should have
+    been started by StartProcess.
+    
+    arguments:
+        process
+            subprocess.Popen to kill.
+    
+    """
+    # the process may be waited for by another thread, do not poll it
+    if (process.returncode != None): return
+    
+    if (sys.platform == "win32"):
+        returnValue = subprocess.call("taskkill /F /T /PID " +
+                str(process.pid), stdout = subprocess.PIPE,
+                stderr = subprocess.STDOUT)
+        if ((returnValue != 0) and (process.returncode == None)):
+            # the process may have been started another way
+            if (hasattr(process, "terminate")):
+                process.terminate()
+            else:
+                import win32api
+                handle = win32api.OpenProcess(1, 0, process.pid)
+                win32api.TerminateProcess(handle, 0)
+                win32api.CloseHandle(handle)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError, e:
+            # not a process group leader
+            try:
+                os.kill(process.pid, signal.SIGKILL)
+            except OSError, e:
+                pass # already finished
+
+def GetChildrenCpuTime():
+    """GetChildrenCpuTime() -> float
+    
+    returns:
+        float corresponding to the CPU time taken by the child processes of
+        this process which have finished, in seconds, or None if it cannot be
+        measured on this platform.
+    
+    """
+    if (resource == None): return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def GetProcessCpuTime(process):
+    """GetProcessCpuTime(process) -> float
+    
+    returns:
+        float corresponding to the CPU time taken by a finished process in
+        seconds, or None if it cannot be measured for one process on this
+        platform. Use GetChildrenCpuTime then.
+    
+    """
+    if ((sys.platform != "win32") or (ctypes == None) or
+            (not hasattr(process, "_handle"))):
+        return None
+    
+    creationTime = ctypes.c_ulonglong()
+    exitTime = ctypes.c_ulonglong()
+    kernelTime = ctypes.c_ulonglong()
+    userTime = ctypes.c_ulonglong()
+    try:
+        if (not ctypes.windll.kernel32.GetProcessTimes(int(process._handle),
+                ctypes.byref(creationTime), ctypes.byref(exitTime),
+                ctypes.byref(kernelTime), ctypes.byref(userTime))):
+            return None
+    except (ValueError, TypeError), e:
+        return None # the handle was closed
+    # in 100 nanoseconds
+    return (kernelTime.value + userTime.value) / 10000000.0
+
+def GetWatchdogDir():
+    """GetWatchdogDir() -> str
+    
+    returns:
+        str corresponding to the directory to add to the path of a Python 
+        process to import this module as FWatchdog, without the framework.
+    
+    """
+    return os.path.dirname(os.path.abspath(__file__))
+
+def GetTimesFilename(logFilename):
+    """GetTimesFilename(logFilename) -> str
+    
+    returns:
+        str corresponding to the file where RunWatched writes the times of
+        the commands which write to logFilename.
+    
+    """
+    return os.path.splitext(logFilename)[0] + "." + _TIMES_EXT
+
+def ReadCommandTimes(logFilename):
+    """ReadCommandTimes(logFilename) -> (float, float)
+    
+    Reads the times written by RunWatched for the commands which wrote to a
+    log.
+    
+    arguments:
+        logFilename
+            string corresponding to the log of the commands.
+    
+    returns:
+        pair with the total wall time and CPU time of the commands in
+        seconds, or None if no time was written. The CPU time is None if it
+        is unknown for one of the commands.
+    
+    """
+    timesFilename = GetTimesFilename(logFilename)
+    if (not os.path.isfile(timesFilename)): return None
+    
+    wallTime = 0.0
+    cpuTime = 0.0
+    try:
+        file = open(timesFilename)
+        try:
+            for line in file.readlines():
+                values = line.split()
+                if (len(values) != 2): continue
+                wallTime = wallTime + float(values[0])
+                if ((cpuTime == None) or (values[1] == "-")):
+                    cpuTime = None
+                else:
+                    cpuTime = cpuTime + float(values[1])
+        finally:
+            file.close()
+    except (IOError, ValueError), e:
+        return None
+    return (wallTime, cpuTime)
+
+def RunWatched(command, logFilename = None, watchedDir = None,
+               timeout = None):
+    """RunWatched(command, logFilename = None, watchedDir = None, timeout = None) -> bool
+    
+    Runs a command with a FWatchdog, appending its output to a log. The wall
+    time and CPU time of the command are appended to the file of
+    GetTimesFilename.
+    
+    arguments:
+        command
+            string or list of str corresponding to the command to run.
+        logFilename
+            string corresponding to the log, or None to dump the output to
+            stdout and not keep the times.
+        watchedDir
+            string corresponding to the directory to watch. See FWatchdog.
+        timeout
+            float corresponding to the number of seconds without any change in
+            watchedDir before the command is killed, or None to never kill it.
+    
+    returns:
+        bool corresponding to whether the command finished without being
+        killed.
+    
+    """
+    if (logFilename == None):
+        log = None
+    else:
+        log = open(logFilename, "a")
+    try:
+        returnValue, wallTime, cpuTime = FWatchdog(watchedDir, timeout).Run(
+                command, log)
+        if ((returnValue == None) and (log != None)):
+            log.write("\nKilled after " + str(timeout) +
+                      " seconds without I/O.\n")
+    finally:
+        if (log != None):
+            log.close()
+    
+    if (logFilename != None):
+        if (cpuTime == None):
+            cpuTimeWritten = "-"
+        else:
+            cpuTimeWritten = "%.3f" % cpuTime
+        timesFile = open(GetTimesFilename(logFilename), "a")
+        timesFile.write(("%.3f" % wallTime) + " " + cpuTimeWritten + "\n")
+        timesFile.close()
+    
+    return (returnValue != None)
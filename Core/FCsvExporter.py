@@ -39,7 +39,7 @@ class FCsvExporter:
                height, keys = None):
         file = open(path, "w")
         checksumFile = open(FUtils.ChangeExtension(path, "sha"), "w")
-        checksumFile.write(FUtils.CalculateSuiteChecksum())
+        checksumFile.write(FUtils.GetSuiteChecksum())
         
         file.write("\nTest Procedure:,%s\n\n" % (testProcedure.GetName()))    
         file.write("Statistics: \n" +
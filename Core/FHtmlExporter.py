@@ -7,87 +7,220 @@
 
 import os
 import os.path
-import shutil
 import types
 import time
 
 import Core.Common.FUtils as FUtils
 import Core.Common.FGlobals as FGlobals
 from Core.Common.FConstants import *
+from Core.Common.FFileCopier import *
 from Core.Logic.FJudgement import *
 from Core.Logic.FJudgementCompiler import *
 
 class FHtmlExporter:
-    __REPLACE_TEST_PROCEDURE_COUNT = "???Replace with test procedure count???"
-    __REPLACE_HTML_COUNT = "???Replace with HTML count???"
-    __REPLACE_PASSED_COUNT = "???Replace with passed count???"
-    __REPLACE_FAILED_COUNT = "???Replace with failed count???"
-    __REPLACE_WARNINGS_COUNT = "???Replace with warnings count???"
-    __REPLACE_ERRORS_COUNT = "???Replace with errors count???"
-    __REPLACE_BADGES_EARNED = "???Replace with badges earned statement???"
     
     def __init__(self):
         self.__mainDir = None
         self.__filesDir = None
-        self.__passedTestsCount = 0
-        self.__failedTestsCount = 0
-        self.__warningCount = 0
-        self.__errorCount = 0
-        self.__judgementCompiler = FJudgementCompiler()
+        self.__copier = None
     
     # path should be absolute
     def ToHtml(self, path, testProcedure, showBlessed, showPrevious, width,
-               height, keys = None):
-        file = open(path, "w")
+               height, keys = None, testsPerPage = HTML_TESTS_PER_PAGE):
+        """ToHtml(path, testProcedure, showBlessed, showPrevious, width, height, keys = None, testsPerPage = HTML_TESTS_PER_PAGE) -> None
+        
+        Exports tests to a HTML report. The statistics are calculated from
+        the summaries of the executions before writing, so the report is 
+        written once, from top to bottom. When
+        there are more than testsPerPage tests, the tests are written in 
+        pages of testsPerPage tests and the report is an index of the pages,
+        so browsers do not have to open one huge page.
+        
+        arguments:
+            path
+                string corresponding to the absolute path of the report.
+            testProcedure
+                FTestProcedure of the tests.
+            showBlessed
+                bool corresponding to whether to show the blessed images next
+                to the outputs.
+            showPrevious
+                bool corresponding to whether to show the previous outputs 
+                next to the outputs.
+            width
+                int corresponding to the width of the images.
+            height
+                int corresponding to the height of the images.
+            keys
+                list of the keys of the tests to export, or None to export
+                all the tests of the test procedure.
+            testsPerPage
+                int corresponding to the number of tests per page, or None to
+                write all the tests in the report.
+        
+        """
+        tests = []
+        if (keys == None):
+            for test in testProcedure.GetTestGenerator():
+                tests.append(test)
+        else:
+            for key in keys:
+                tests.append(testProcedure.GetTest(key))
+        
+        self.__filesDir = FUtils.GetProperFilename(path) + HTML_POSTFIX
+        self.__filesDir = os.path.join(os.path.dirname(path), self.__filesDir)
+        self.__filesDir = self.__GetAvailableDir(self.__filesDir)
+        
+        os.mkdir(self.__filesDir)
+        
+        self.__mainDir = os.path.dirname(path)
+        self.__copier = FFileCopier()
+        
         checksumFilename = FUtils.ChangeExtension(path, "sha")
         checksumFile = open(checksumFilename, "w")
-        checksumFile.write(FUtils.CalculateSuiteChecksum())
+        checksumFile.write(FUtils.GetSuiteChecksum())
+        
+        file = open(path, "w")
+        self.__WriteHeader(file, testProcedure.GetName())
+        self.__WriteStatistics(file, testProcedure, tests)
+        
+        if ((testsPerPage == None) or (len(tests) <= testsPerPage)):
+            self.__WriteTests(file, checksumFile, testProcedure, tests,
+                    showBlessed, showPrevious, width, height)
+        else:
+            file.write("    <b><u>Tests:</b></u>\n" +
+                       "    <ul>\n")
+            for first in range(0, len(tests), testsPerPage):
+                pageTests = tests[first : first + testsPerPage]
+                pageFilename = os.path.join(self.__filesDir, "page" + 
+                        str(first / testsPerPage + 1) + ".html")
+                file.write(
+                        "        <li><a href=\"" + 
+                        FUtils.GetHtmlRelativePath(pageFilename, 
+                                self.__mainDir) + "\">Tests " + 
+                        str(first + 1) + " to " + 
+                        str(first + len(pageTests)) + "</a></li>\n")
+                self.__WritePage(pageFilename, path, checksumFile, 
+                        testProcedure, pageTests, first, showBlessed, 
+                        showPrevious, width, height)
+            file.write("    </ul>\n")
         
+        file.write(
+                "</body>\n" +
+                "</html>\n")
+        file.close()
+        checksumFile.close()
+        
+        self.__copier.Wait()
+        print ("<FHtmlExporter> copied " + 
+                str(self.__copier.GetCopyCount()) + " files, skipped " + 
+                str(self.__copier.GetSkipCount()) + " duplicates")
+    
+    def __WriteHeader(self, file, title):
         file.write(
                 "<html>\n" +
                 "<head>\n" + 
-                "    <title>" + testProcedure.GetName() + "</title>\n" +
+                "    <title>" + title + "</title>\n" +
                 "</head>\n" +
                 "<body>\n" +
-                "    <h1><center>" + testProcedure.GetName() + 
-                        "</center></h1>\n" +
+                "    <h1><center>" + title + "</center></h1>\n")
+    
+    def __WriteStatistics(self, file, testProcedure, tests):
+        """__WriteStatistics(file, testProcedure, tests) -> None
+        
+        Writes the statistics of the tests. They come from the summaries of
+        the current executions, so the executions are not loaded; they are
+        loaded once, later, while writing the tests.
+        
+        """
+        passedTestsCount = 0
+        failedTestsCount = 0
+        warningCount = 0
+        errorCount = 0
+        judgementCompiler = FJudgementCompiler()
+        
+        for test in tests:
+            summary = test.GetCurrentSummary()
+            if (summary == None): continue
+            
+            for step, app, op, settings in testProcedure.GetStepGenerator():
+                errorCount = errorCount + summary.GetErrorCount(step)
+                warningCount = warningCount + summary.GetWarningCount(step)
+            
+            result = summary.GetResult()
+            if (result != None):
+                if (result):
+                    passedTestsCount = passedTestsCount + 1
+                else:
+                    failedTestsCount = failedTestsCount + 1
+            
+            for i in range(len(FGlobals.badgeLevels)):
+                judgementCompiler.ProcessJudgement(i, 
+                        summary.GetJudgementResult(FGlobals.badgeLevels[i]))
+        
+        badgesEarnedStatement = judgementCompiler.GenerateStatement()
+        if (len(badgesEarnedStatement) == 0): badgesEarnedStatement = "None"
+        
+        file.write(
                 "    <b><u>Statistics:</b></u>" +
                 "    <table>\n" +
                 "        <tr>\n" +
                 "            <td># of tests in test procedure:</td>\n" +
-                "            <td>" + 
-                        FHtmlExporter.__REPLACE_TEST_PROCEDURE_COUNT + 
+                "            <td>" + str(testProcedure.GetTestCount()) + 
                         "</td>\n" +
                 "        </tr>\n" +
                 "        <tr>\n" +
                 "            <td># of tests in HTML:</td>\n" +
-                "            <td>" + FHtmlExporter.__REPLACE_HTML_COUNT + 
-                        "</td>\n" +
+                "            <td>" + str(len(tests)) + "</td>\n" +
                 "        </tr>\n" +
                 "        <tr>\n" +
                 "            <td># of tests passed in HTML:</td>\n" +
-                "            <td>" + FHtmlExporter.__REPLACE_PASSED_COUNT + 
-                        "</td>\n" +
+                "            <td>" + str(passedTestsCount) + "</td>\n" +
                 "        </tr>\n" +
                 "        <tr>\n" +
                 "            <td># of tests failed in HTML:</td>\n" +
-                "            <td>" + FHtmlExporter.__REPLACE_FAILED_COUNT + 
-                        "</td>\n" +
+                "            <td>" + str(failedTestsCount) + "</td>\n" +
                 "        </tr>\n" +
                 "            <td># of tests warning in HTML:</td>\n" +
-                "            <td>" + FHtmlExporter.__REPLACE_WARNINGS_COUNT + 
-                        "</td>\n" +
+                "            <td>" + str(warningCount) + "</td>\n" +
                 "        </tr>\n" +
                 "            <td># of tests errors in HTML:</td>\n" +
-                "            <td>" + FHtmlExporter.__REPLACE_ERRORS_COUNT + 
-                        "</td>\n" +
+                "            <td>" + str(errorCount) + "</td>\n" +
                 "        </tr>\n" +
                 "        </tr>\n" +
                 "            <td>Badges earned:</td>\n" +
-                "            <td>" + FHtmlExporter.__REPLACE_BADGES_EARNED + 
-                        "</td>\n" +
-                "        </tr>\n" +                "    </table>\n" +
-                "    <br><br>\n" +
+                "            <td>" + badgesEarnedStatement + "</td>\n" +
+                "        </tr>\n" +
+                "    </table>\n" +
+                "    <br><br>\n")
+    
+    def __WritePage(self, pageFilename, indexFilename, checksumFile, 
+                    testProcedure, tests, first, showBlessed, showPrevious, 
+                    width, height):
+        # the links of the page are relative to the page
+        mainDir = self.__mainDir
+        self.__mainDir = os.path.dirname(pageFilename)
+        try:
+            file = open(pageFilename, "w")
+            self.__WriteHeader(file, testProcedure.GetName() + " - Tests " +
+                    str(first + 1) + " to " + str(first + len(tests)))
+            file.write(
+                    "    <a href=\"" + 
+                    FUtils.GetHtmlRelativePath(indexFilename, self.__mainDir) +
+                    "\">Statistics and other tests</a>\n" +
+                    "    <br><br>\n")
+            self.__WriteTests(file, checksumFile, testProcedure, tests,
+                    showBlessed, showPrevious, width, height)
+            file.write(
+                    "</body>\n" +
+                    "</html>\n")
+            file.close()
+        finally:
+            self.__mainDir = mainDir
+    
+    def __WriteTests(self, file, checksumFile, testProcedure, tests, 
+                     showBlessed, showPrevious, width, height):
+        file.write(
                 # TODO:take with respect to how user positions the columns
                 "    <center><table border=\"1\" cellspacing=\"0\" " +
                         "cellpadding=\"5\" bordercolor=\"gray\">\n" +
@@ -146,67 +279,11 @@ class FHtmlExporter:
                 "            </th>\n" +
                 "        </tr>\n")
         
-        self.__filesDir = FUtils.GetProperFilename(path) + HTML_POSTFIX
-        self.__filesDir = os.path.join(os.path.dirname(path), self.__filesDir)
-        self.__filesDir = self.__GetAvailableDir(self.__filesDir)
+        for test in tests:
+            self.__AddTest(file, checksumFile, testProcedure, test, 
+                           showBlessed, showPrevious, width, height)
         
-        os.mkdir(self.__filesDir)
-        
-        self.__mainDir = os.path.dirname(path)
-        self.__passedTestsCount = 0
-        self.__failedTestsCount = 0
-        self.__warningCount = 0
-        self.__errorCount = 0
-
-        # Prepare the badges earned results.
-        testCount = 0
-        if (keys == None):
-            for test in testProcedure.GetTestGenerator():
-                self.__AddTest(file, checksumFile, testProcedure, test, showBlessed, 
-                              showPrevious, width, height)
-                testCount = testCount + 1
-        else:
-            for key in keys:
-                self.__AddTest(file, checksumFile, testProcedure, testProcedure.GetTest(key), 
-                               showBlessed, showPrevious, width, height)
-                testCount = testCount + 1
-        
-        file.write(
-                "    </table></center>\n" +
-                "</body>\n" +
-                "</html>\n")
-        file.close()
-        checksumFile.close()
-        
-        # Replace the statement tokens by their real values.
-        badgesEarnedStatement = self.__judgementCompiler.GenerateStatement()
-        if (len(badgesEarnedStatement) == 0): badgesEarnedStatement = "None"
-        replaceDict = {
-                FHtmlExporter.__REPLACE_TEST_PROCEDURE_COUNT : str(testProcedure.GetTestCount()),
-                FHtmlExporter.__REPLACE_HTML_COUNT : str(testCount),
-                FHtmlExporter.__REPLACE_PASSED_COUNT : str(self.__passedTestsCount),
-                FHtmlExporter.__REPLACE_FAILED_COUNT : str(self.__failedTestsCount),
-                FHtmlExporter.__REPLACE_WARNINGS_COUNT : str(self.__warningCount),
-                FHtmlExporter.__REPLACE_ERRORS_COUNT : str(self.__errorCount),
-                FHtmlExporter.__REPLACE_BADGES_EARNED : badgesEarnedStatement }
-        
-        tempFilename = FUtils.GetAvailableFilename(path + ".temp")
-        f = open(tempFilename, "w")
-        htmlFile = open(path)
-        line = htmlFile.readline()
-        while (line):
-            for key in replaceDict.keys():
-                if (line.count(key) != 0):
-                    line = line.replace(key, replaceDict[key], 1)
-                    replaceDict.pop(key)
-                    break
-            f.write(line)
-            line = htmlFile.readline()
-        htmlFile.close()
-        f.close()
-        
-        shutil.copy2(tempFilename, path)
-        os.remove(tempFilename)
+        file.write("    </table></center>\n")
     
     def __GetAvailableDir(self, suggestion):
         if (os.path.isdir(suggestion)):
@@ -362,11 +439,6 @@ class FHtmlExporter:
         errorCount = test.GetCurrentErrorCount(step)
         warningCount = test.GetCurrentWarningCount(step)
         
-        if (errorCount != None):
-            self.__errorCount = self.__errorCount + errorCount
-        if (warningCount != None):
-            self.__warningCount = self.__warningCount + warningCount
-        
         # None (not ran) is considered < 0 in python
         if (errorCount > 0):
             tag = "            <td bgcolor=\"#FF0000\">\n"
@@ -384,7 +456,8 @@ class FHtmlExporter:
                     name)
             
             if (os.path.isfile(outputList)):
-                shutil.copy2(outputList, exportedFilename)
+                exportedFilename = self.__copier.Copy(outputList, 
+                        exportedFilename, True)
                 if (errorCount > 0):
                     status = "Failed"
                 else:
@@ -400,12 +473,13 @@ class FHtmlExporter:
         else:
             if (showPrevious):
                 exportedPrevious = self.__ExportImageList(exportedDir,
-                        test.GetPreviousOutputLocation(step), str(step) + "p_")
+                        test.GetPreviousOutputLocation(step), str(step) + "p_",
+                        True)
             else:
                 exportedPrevious = None
             
             exportedFilename = self.__ExportImageList(exportedDir, outputList,
-                    str(step) + "_")
+                    str(step) + "_", True)
             if (exportedFilename == None):
                 tag = tag + "                Missing&nbsp;File<br>\n"
             else:
@@ -418,7 +492,7 @@ class FHtmlExporter:
             name = os.path.basename(logName)
             exportedLog = os.path.join(exportedDir, str(step) + "_" + name)
             if (os.path.isfile(logName)):
-                shutil.copy2(logName, exportedLog)
+                exportedLog = self.__copier.Copy(logName, exportedLog, True)
                 tag = (tag + "                <a href=\"" + 
                         FUtils.GetHtmlRelativePath(exportedLog, 
                                 self.__mainDir) + 
@@ -430,7 +504,9 @@ class FHtmlExporter:
         tag = tag + "            </td>\n"
         return tag
     
-    def __ExportImageList(self, exportedDir, filenameList, prefix):
+    # only the outputs of executions are linkable, see FFileCopier
+    def __ExportImageList(self, exportedDir, filenameList, prefix, 
+                          isLinkable = False):
         exportedList = None
         if ((filenameList != None) and (len(filenameList) != 0)):
             exportedList = []
@@ -438,12 +514,8 @@ class FHtmlExporter:
                 name = os.path.basename(filename)
                 exportedFrame = os.path.join(exportedDir, prefix + name)
                 if (os.path.isfile(filename)):
-                    try:
-                        shutil.copy2(filename, exportedFrame)
-                    except IOError, e:
-                        print ("Unable to copy " + filename + " to " +  
-                                exportedFrame + ", " + "probably due to " +
-                                "filename too long. Skipping.")
+                    exportedFrame = self.__copier.Copy(filename, 
+                            exportedFrame, isLinkable)
                     exportedList.append(exportedFrame)
                 else:
                     exportedList.append(None)
@@ -519,10 +591,8 @@ class FHtmlExporter:
             resultTag = resultTag + "                &nbsp;\n"
         else:
             if (result.GetResult()):
-                self.__passedTestsCount = self.__passedTestsCount + 1
                 resultTag = "            <td bgcolor=\"#00FF00\">\n"
             else:
-                self.__failedTestsCount = self.__failedTestsCount + 1
                 resultTag = "            <td bgcolor=\"#FF0000\">\n"
             
             for entry in result.GetTextArray():
@@ -538,7 +608,6 @@ class FHtmlExporter:
             else:
                 badgeLevel = FGlobals.badgeLevels[i]
                 badgeResult = execution.GetJudgementResult(badgeLevel)
-                self.__judgementCompiler.ProcessJudgement(i, badgeResult)
                 if (badgeResult == FJudgement.PASSED):
                     file.write("            <td>PASSED</td>")
                 elif (badgeResult == FJudgement.FAILED):
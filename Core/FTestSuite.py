@@ -10,8 +10,10 @@ import os.path
 
 import Core.Common.FUtils as FUtils
 import Core.Common.FGlobals as FGlobals
+import Core.Common.FObjectStore as FObjectStore
 from Core.Common.FConstants import *
 from Core.Common.FSerializer import *
+from Core.Logic.FSchemaValidator import *
 from Core.Logic.FTestProcedure import *
 
 class FTestSuite(FSerializer):
@@ -51,6 +53,41 @@ class FTestSuite(FSerializer):
             FGlobals.adoptersPackage = configDict["adoptersPackage"]
             print "IsAdopters %s" % (FGlobals.adoptersPackage)
         
+        # Further parse the number of concurrent DCC workers
+        FGlobals.workerCount = 1
+        if configDict.has_key("workerCount"):
+            try:
+                FGlobals.workerCount = max(1, int(configDict["workerCount"]))
+            except ValueError, e:
+                print ("Warning: Ignoring invalid workerCount: " +
+                       configDict["workerCount"] + ".")
+        
+        # Further parse the number of tests validated and compiled at once
+        FGlobals.postRunWorkerCount = 1
+        if configDict.has_key("postRunWorkerCount"):
+            try:
+                FGlobals.postRunWorkerCount = max(1, 
+                        int(configDict["postRunWorkerCount"]))
+            except ValueError, e:
+                print ("Warning: Ignoring invalid postRunWorkerCount: " +
+                       configDict["postRunWorkerCount"] + ".")
+        
+        # Further parse the schema validator
+        FGlobals.schemaValidatePath = SCHEMA_VALIDATE_EXECUTABLE
+        if configDict.has_key("schemaValidatePath"):
+            FGlobals.schemaValidatePath = configDict["schemaValidatePath"]
+            if ((FGlobals.schemaValidatePath.lower() == 
+                        SCHEMA_VALIDATE_INTERNAL.lower()) and
+                    (not IsSchemaValidatorAvailable())):
+                print ("Warning: lxml is missing, using " + 
+                       SCHEMA_VALIDATE_EXECUTABLE + " to validate.")
+        
+        # Further parse the test procedure storage
+        FGlobals.useProcedureStore = False
+        if configDict.has_key("useProcedureStore"):
+            FGlobals.useProcedureStore = (
+                    configDict["useProcedureStore"] == "True")
+        
         # import the application specific scripts
         self.applicationMap = {}
         if (os.path.isdir(SCRIPTS_DIR)):
@@ -97,6 +134,8 @@ class FTestSuite(FSerializer):
             print "<FTestSuite> could not make the test procedure directory"
             print e
             return None
+        if (FGlobals.useProcedureStore):
+            FObjectStore.CreateStore(testProcedureDir)
         testProcedure = FTestProcedure(procedureTree)
         self.Save(testProcedure, 
                   os.path.join(testProcedureDir, TEST_PROCEDURE_FILENAME))
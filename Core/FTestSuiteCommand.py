@@ -9,6 +9,7 @@ from Core.FCsvExporter import *
 from Core.FHtmlExporter import *
 from Core.FTestSuite import *
 from Core.Common.FConstants import *
+from Core.Common.FImageCache import *
 
 class FTestSuiteCommand(FTestSuite):
     def __init__(self, args):
@@ -27,6 +28,8 @@ class FTestSuiteCommand(FTestSuite):
         self.__addMissingTests = False
         self.__statistics = None
         self.__killErrorReports = False
+        self.__workerCount = None
+        self.__useCache = True
         
         while (len(args) != 0):
             if (args[0] == "-help"):
@@ -42,6 +45,21 @@ class FTestSuiteCommand(FTestSuite):
             elif (args[0] == "-runAll"):
                 self.__runAll = True
                 args = args[1:]
+            elif (args[0] == "-workers"):
+                if (len(args) == 1):
+                    print "<Argument Error>: Missing argument after -workers"
+                    return
+                else:
+                    try:
+                        self.__workerCount = max(1, int(args[1]))
+                    except ValueError, e:
+                        print ("<Argument Error>: Invalid worker count: " + 
+                               args[1])
+                        return
+                    args = args[2:]
+            elif (args[0] == "-noCache"):
+                self.__useCache = False
+                args = args[1:]
             elif (args[0] == "-killErrorReports"):
                 self.__killErrorReports = True
                 args = args[1:]
@@ -147,8 +165,17 @@ class FTestSuiteCommand(FTestSuite):
                 testsToRun.append(test.GetTestId())
             if (len(testsToRun) == 0): return
             
-            testProcedure.RunTests(testsToRun, self.applicationMap)
+            report = testProcedure.RunTests(testsToRun, self.applicationMap, 
+                    workerCount = self.__workerCount, 
+                    useCache = self.__useCache)
             print ">> Ran all tests."
+            print "       - DCC launches: " + str(report.GetLaunchCount())
+            print "       - Cached tests: " + str(report.GetCacheHitCount())
+            print ("       - Decoded images: " + 
+                   str(GetImageCache().GetMissCount()) + " (" + 
+                   str(GetImageCache().GetHitCount()) + " cache hits)")
+            print ("       - Crashed tests: " + 
+                   str(len(report.GetCrashedTestIds())))
         
         if (self.__statistics != None):
             statisticsFile = open(self.__statistics, "w")
@@ -228,6 +255,16 @@ only one of each (it will not check for this). The following tags are valid.
 -runAll
     Runs all the tests in the test procedure
 
+-workers [count]
+    The number of DCC processes that may run the tests concurrently (only has
+    effect if -runAll is listed). Each process uses its own working directory.
+    The default is the workerCount value of the configuration file, or 1.
+
+-noCache
+    Runs every step in the DCC (only has effect if -runAll is listed). By 
+    default, the outputs of the previous execution of a test are reused when
+    the document, the settings and the DCC executable have not changed.
+
 -killErrorReports
     Kills all processes with the process name "dwwin.exe" or "SendDump.exe" 
     which are the process that pops up the error reporting dialog in Windows XP
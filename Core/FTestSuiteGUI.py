@@ -13,6 +13,8 @@ import zipfile
 import glob, os
 import shutil
 
+import Core.Common.FArchive as FArchive
+import Core.Common.FCOLLADAParser as FCOLLADAParser
 import Core.Common.FGlobals as FGlobals
 
 import Core.Common.FUtils as FUtils
@@ -48,7 +50,7 @@ def makeArchive(fileList, archive):
             typeList = [".html", ".csv", ".sha", ".txt", ".py"]
      	 	
      	 print "TypeList: %s" % (typeList)
-         a = zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED)
+         archivedFiles = []
          for f in fileList:
              found = False
              for t in typeList:             
@@ -64,11 +66,11 @@ def makeArchive(fileList, archive):
 		             found = True
              if (found):
   	         print "archiving file %s" % (f)
-	         a.write(f)
+	         archivedFiles.append(f)
 	     else:
 	     	 print "skipping file %s" % (f)
 
-         a.close()
+         FArchive.WriteArchive(archive, archivedFiles)
          
          print "Done making archive"
          return True
@@ -170,23 +172,11 @@ class FSFrame(FTestSuite):
                 for dataSet in dataSets:
                     testProcedure.AddTest(dataSet, settings)
             else:
-                ignored = testProcedure.GetIgnoredRegExList(regExId)
-                if (len(ignored) == 0):
-                    ignored.append("") # len(dataSet) != 0
+                ignored = []
                 for dataSet in dataSets:
-                    displayedFilename = FUtils.GetRelativePath(dataSet, 
-                                                               MAIN_FOLDER)
-                    regExPath = FUtils.NormalizeRegEx(displayedFilename)
-                    newIgnored = ignored[-1]
-                    if (newIgnored != ""):
-                        newIgnored = newIgnored + "|" 
-                    newIgnored = newIgnored + regExPath
-                    if (len(newIgnored) < 30000):
-                        ignored[-1] = newIgnored
-                    else:
-                        ignored.append(regExPath)
-                testProcedure.SetRegEx(regExId, 
-                        testProcedure.GetRegExList(regExId), ignored)
+                    ignored.append(FUtils.GetRelativePath(dataSet, 
+                                                          MAIN_FOLDER))
+                testProcedure.AddIgnoredPaths(regExId, ignored)
         
         busyInfo = wx.BusyInfo("Opening test procedure: Creating grid. " +
                                "Please wait...")
@@ -247,7 +237,7 @@ class RunTable(FSFrame, wx.MDIChildFrame):
         self.__grid.SortColumn(0, True)
         for test in self.__testProcedure.GetTestGenerator():
             id = test.GetTestId()
-            self.__grid.AddExecution(id, test, test.GetCurrentExecution())
+            self.__grid.AddExecution(id, test, None)
             self.__grid.PartialRefreshAdd(test)
         self.__grid.PartialRefreshDone()
     
@@ -363,17 +353,17 @@ class RunTable(FSFrame, wx.MDIChildFrame):
                 if (self.__DisplayDeleteTestMessage(removedTestKeys, message)):
                     for desc in addedTestDesc:
                         test = self.__testProcedure.GetTest(desc[0])
-                        self.__grid.PartialRefreshRemove(desc[0])
+                        self.__grid.PartialRefreshRemove(test)
                         self.__testProcedure.RemoveTest(desc[0])
                         testId = self.__testProcedure.AddTest(desc[1], desc[2])
                         test = self.__testProcedure.GetTest(testId)
                         if (testId == desc[0]):
-                            self.__grid.ReplaceExecution(desc[0], test, test.GetCurrentExecution())
+                            self.__grid.ReplaceExecution(desc[0], test, None)
                         else:
                             print ("<FTestSuiteGUI> inconsistency - should " +
                                    "not happen... recovering")
                             self.__grid.DeleteExecution(desc[0])
-                            self.__grid.AddExecution(testId, test, test.GetCurrentExecution())
+                            self.__grid.AddExecution(testId, test, None)
                         self.__grid.PartialRefreshAdd(test)
                     self.__grid.PartialRefreshDone()
     
@@ -507,12 +497,14 @@ class RunTable(FSFrame, wx.MDIChildFrame):
                 if (test.HasCurrentExecution()):
                     self.__grid.PartialRefreshRemove(test)
                     test.DeleteCurrentExecution()
-                    self.__grid.ReplaceExecution(key, test, test.GetCurrentExecution())
+                    self.__grid.ReplaceExecution(key, test, None)
                     self.__grid.PartialRefreshAdd(test)
             self.__grid.PartialRefreshDone()
     
     def __OnRefreshTable(self, e):
         busyInfo = wx.BusyInfo("Refreshing execution table. Please wait...")
+        self.__ReadAssetInformations(
+                self.__testProcedure.GetTestGenerator())
         for test in self.__testProcedure.GetTestGenerator():
             result = test.GetCurrentResult()
             test.RefreshCOLLADA()
@@ -528,6 +520,10 @@ class RunTable(FSFrame, wx.MDIChildFrame):
         if (len(keys) == 0): return
         
         busyInfo = wx.BusyInfo("Refreshing selected rows. Please wait...")
+        tests = []
+        for key in keys:
+            tests.append(self.__testProcedure.GetTest(key))
+        self.__ReadAssetInformations(tests)
         for key in keys:
             test = self.__testProcedure.GetTest(key)
             self.__grid.PartialRefreshRemove(test)
@@ -538,6 +534,14 @@ class RunTable(FSFrame, wx.MDIChildFrame):
             self.__grid.PartialRefreshAdd(test)
         self.__grid.PartialRefreshDone()
     
+    def __ReadAssetInformations(self, tests):
+        # reads the changed documents at once, before RefreshCOLLADA
+        filenames = []
+        for test in tests:
+            if (FCOLLADAParser.IsCOLLADADocument(test.GetFilename())):
+                filenames.append(test.GetFilename())
+        GetDocumentAssetInformations(filenames)
+    
     def __OnSaveAs(self, e):
         # contains some of the same code as in FRunConfigDialog
         if (not os.path.isdir(RUNS_FOLDER)):
@@ -728,7 +732,7 @@ class RunTable(FSFrame, wx.MDIChildFrame):
     def __AddTest(self, dataSetName, settings):
         testId = self.__testProcedure.AddTest(dataSetName, settings)
         test = self.__testProcedure.GetTest(testId)
-        self.__grid.AddExecution(testId, test, test.GetCurrentExecution())
+        self.__grid.AddExecution(testId, test, None)
         return test
 
     def __OnRunSelected(self, e):
@@ -756,8 +760,14 @@ class RunTable(FSFrame, wx.MDIChildFrame):
     def __Run(self, keys):
         dialog = FProgressDialog(self, 1, "Running Tests. Please wait.")
         dialog.SetCancelFunc(self.__OnCancelRun)
+        
+        # the tests are shown in the grid as soon as they are concluded
+        refreshedKeys = {}
+        dialog.SetTestDoneFunc(self.__GetTestDoneFunc(refreshedKeys))
         myThread = Runner(dialog, self.__testProcedure.RunTests, keys, 
-                self.applicationMap, self.__StandardCallback(dialog), self.__MarkerCallback(dialog))
+                self.applicationMap, self.__StandardCallback(dialog), 
+                self.__MarkerCallback(dialog), None, True, 
+                self.__ConcludeCallback(dialog))
         myThread.start()
         dialog.ShowModal()
         myThread.join()
@@ -765,13 +775,32 @@ class RunTable(FSFrame, wx.MDIChildFrame):
         dialog.Destroy()
         busyInfo = wx.BusyInfo("Updating after running. Please wait...")
         
+        # the tests which were not concluded, such as cancelled ones
         for testId in keys:
-            test = self.__testProcedure.GetTest(testId)
-            self.__grid.PartialRefreshRemove(test)
-            self.__grid.ReplaceExecution(testId, test, test.GetCurrentExecution())
-            self.__grid.PartialRefreshAdd(test)
+            if (refreshedKeys.has_key(testId)): continue
+            self.__RefreshTest(testId)
         self.__grid.PartialRefreshDone()
     
+    def __RefreshTest(self, testId):
+        test = self.__testProcedure.GetTest(testId)
+        self.__grid.PartialRefreshRemove(test)
+        self.__grid.ReplaceExecution(testId, test, None)
+        self.__grid.PartialRefreshAdd(test)
+    
+    def __GetTestDoneFunc(self, refreshedKeys):
+        def __testDone(testId):
+            self.__RefreshTest(testId)
+            self.__grid.PartialRefreshDone()
+            refreshedKeys[testId] = True
+        
+        return __testDone
+    
+    def __ConcludeCallback(self, dialog):
+        def __callBack(testId):
+            wx.PostEvent(dialog, FProgressTestDoneEvent(dialog.GetId(), testId))
+        
+        return __callBack
+    
     def __StandardCallback(self, dialog):
         def __callBack(current, max, message):
             if (max != None):
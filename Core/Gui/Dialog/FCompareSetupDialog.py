@@ -350,8 +350,8 @@ class FCompareSetupDialog(wx.Dialog, FSerializer):
         relTestDir = os.path.join(RUNS_FOLDER, self.__curTestProcedure, test)
         entries = os.listdir(relTestDir)
         for entry in entries:
-            if (os.path.isfile(os.path.join(relTestDir, entry, 
-                                            EXECUTION_FILENAME))):
+            if (self.IsSaved(os.path.join(relTestDir, entry, 
+                                          EXECUTION_FILENAME))):
                 executionList.append(entry)
         executionList.sort()
         self.__curExecution = None
@@ -367,7 +367,7 @@ class FCompareSetupDialog(wx.Dialog, FSerializer):
         entries = os.listdir(relProcedureDir )
         for entry in entries:
             testObject = os.path.join(relProcedureDir, entry, TEST_FILENAME)
-            if (os.path.isfile(testObject)):
+            if (self.IsSaved(testObject)):
                 test = self.Load(testObject)
                 testList.append((test.GetSeparatedFilename(),entry))
         testList.sort()
@@ -13,12 +13,14 @@ EVT_COMMAND_FPROGRESS_MESSAGE = wx.NewEventType()
 EVT_COMMAND_FPROGRESS_DONE = wx.NewEventType()
 EVT_COMMAND_FPROGRESS_MKCLEAR = wx.NewEventType()
 EVT_COMMAND_FPROGRESS_MKADD = wx.NewEventType()
+EVT_COMMAND_FPROGRESS_TESTDONE = wx.NewEventType()
 
 EVT_FPROGRESS_GAUGE = wx.PyEventBinder(EVT_COMMAND_FPROGRESS_GAUGE, 1)
 EVT_FPROGRESS_MESSAGE = wx.PyEventBinder(EVT_COMMAND_FPROGRESS_MESSAGE, 1)
 EVT_FPROGRESS_DONE = wx.PyEventBinder(EVT_COMMAND_FPROGRESS_DONE, 1)
 EVT_FPROGRESS_MKCLEAR = wx.PyEventBinder(EVT_COMMAND_FPROGRESS_MKCLEAR, 1)
 EVT_FPROGRESS_MKADD = wx.PyEventBinder(EVT_COMMAND_FPROGRESS_MKADD, 1)
+EVT_FPROGRESS_TESTDONE = wx.PyEventBinder(EVT_COMMAND_FPROGRESS_TESTDONE, 1)
 
 class FProgressGaugeEvent(wx.PyCommandEvent):
     def __init__(self, id, newGaugeValue):
@@ -52,6 +54,14 @@ class FProgressMarkerAddEvent(wx.PyCommandEvent):
     def GetMarker(self):
         return self.__marker;
 
+class FProgressTestDoneEvent(wx.PyCommandEvent):
+    def __init__(self, id, testId):
+        wx.PyCommandEvent.__init__(self, EVT_COMMAND_FPROGRESS_TESTDONE, id)
+        self.__testId = testId
+    
+    def GetTestId(self):
+        return self.__testId
+
 class FProgressDialog(wx.Dialog):
     def __init__(self, parent, maxGauge, description = ""):
         wx.Dialog.__init__(self, parent, wx.ID_ANY, "Please Wait", style = wx.CAPTION | wx.RESIZE_BORDER)
@@ -85,6 +95,7 @@ class FProgressDialog(wx.Dialog):
         self.Bind(EVT_FPROGRESS_DONE, self.__OnDone)
         self.Bind(EVT_FPROGRESS_MKADD, self.__OnMarkerAdd)
         self.Bind(EVT_FPROGRESS_MKCLEAR, self.__OnMarkerClear)
+        self.Bind(EVT_FPROGRESS_TESTDONE, self.__OnTestDone)
         self.Bind(wx.EVT_CLOSE, self.__OnClose)
         self.Bind(wx.EVT_TIMER, self.__OnTimer)            
     
@@ -94,6 +105,7 @@ class FProgressDialog(wx.Dialog):
         self.__timer.Start(500) # 500ms
 
         self.__cancelFunc = None
+        self.__testDoneFunc = None
         self.__markers = []
         self.__nextMarker = None
 
@@ -102,6 +114,16 @@ class FProgressDialog(wx.Dialog):
     
     def SetCancelFunc(self, func):
         self.__cancelFunc = func
+    
+    def SetTestDoneFunc(self, func):
+        """SetTestDoneFunc(func) -> None
+        
+        Sets the function called with the test id of each 
+        FProgressTestDoneEvent. It is called from the GUI thread, so it can
+        update the windows while the tests are still running.
+        
+        """
+        self.__testDoneFunc = func
         
     def __OnClose(self, e):
         self.__timer.Stop()
@@ -129,6 +151,10 @@ class FProgressDialog(wx.Dialog):
         self.__markers.append(e.GetMarker())
         self.__nextMarker = None
         
+    def __OnTestDone(self, e):
+        if (self.__testDoneFunc != None):
+            self.__testDoneFunc(e.GetTestId())
+    
     def __OnMessage(self, e):
         self.__textCtrl.AppendText(e.GetMessage() + "\n")
         
@@ -9,11 +9,11 @@ import wx
 import wx.wizard
 import os.path
 import re
-import copy
 
 import Core.Common.FUtils as FUtils
 import Core.Common.FCOLLADAParser as FCOLLADAParser
 from Core.Common.FConstants import *
+from Core.Logic.FDataSetCatalog import *
 from Core.Logic.FDataSetParser import *
 
 class FSelectDataSetDialog(wx.wizard.WizardPageSimple, FDataSetParser):
@@ -114,24 +114,27 @@ class FSelectDataSetDialog(wx.wizard.WizardPageSimple, FDataSetParser):
         settings = self.__settingsPage.GetSettings()
         regExId = self.__testProcedure.GetRegExId(settings)
         
-        if (regExId == -1):
-            concatRegEx = []
-        else:
-            concatRegEx = copy.deepcopy(
-                    self.__testProcedure.GetRegExList(regExId))
-            if (concatRegEx[-1] != ""):
-                concatRegEx[-1] = concatRegEx[-1] + "|"
-        
         try:
-            paths, regEx = self.__GetDataSets(concatRegEx)
+            paths, regEx = self.__GetDataSets()
         except re.error, ex:
             FUtils.ShowWarning(self, "Bad regular expression.")
             e.Veto()
             return
         
-        if (regEx == []): return
+        if (self.__mode == FSelectDataSetDialog.__TREE):
+            # the checked data sets are kept as paths, not as a regular 
+            # expression, so that any number of them can be matched quickly
+            relPaths = []
+            for path in paths:
+                relPaths.append(FUtils.GetRelativePath(path, MAIN_FOLDER))
+            if (relPaths == []): return
+            regEx = [""]
+        else:
+            relPaths = []
+            if (regEx == []): return
+        
         if (regExId == -1):
-            self.__testProcedure.AddRegEx(settings, regEx)
+            self.__testProcedure.AddRegEx(settings, regEx, [""], relPaths)
         else:
             if (FUtils.ShowConfirmation(self, "The following regular " +
                     "expression is already assigned to the selected " +
@@ -141,17 +144,26 @@ class FSelectDataSetDialog(wx.wizard.WizardPageSimple, FDataSetParser):
                     "regular expression with the one above.", False)):
                 self.__testProcedure.SetRegEx(regExId, regEx, 
                         self.__testProcedure.GetIgnoredRegExList(regExId))
+                self.__testProcedure.SetPaths(regExId, relPaths)
             else:
+                concatRegEx = []
+                for page in self.__testProcedure.GetRegExList(regExId):
+                    if (page != ""):
+                        concatRegEx.append(page)
+                for page in regEx:
+                    if (page != ""):
+                        concatRegEx.append(page)
+                if (concatRegEx == []):
+                    concatRegEx.append("")
                 self.__testProcedure.SetRegEx(regExId, concatRegEx,
                         self.__testProcedure.GetIgnoredRegExList(regExId))
+                self.__testProcedure.AddPaths(regExId, relPaths)
     
     def GetChecked(self):
         paths, regEx = self.__GetDataSets()
         return paths
     
-    # concatRegEx is a list of strings. The last element should be empty or 
-    # ends with "|" (ready for appending)
-    def __GetDataSets(self, concatRegEx = []):
+    def __GetDataSets(self):
         if (self.__mode == FSelectDataSetDialog.__TREE):
             paths = []
             rootItem =  self.__treeCtrl.GetRootItem()
@@ -160,50 +172,13 @@ class FSelectDataSetDialog(wx.wizard.WizardPageSimple, FDataSetParser):
                     dir = os.path.dirname(os.path.abspath(childDataSetDir))
                     dir = FUtils.GetRelativePath(dir, os.getcwd())
                     self.__GetCheckedRecursive(paths, childItem, dir, False)
-            
             regEx = []
-            if (len(paths) != 0):
-                regEx.append("")
-                if (concatRegEx == []):
-                    concatRegEx.append("")
-                curIndex = 0
-                concatCurIndex = len(concatRegEx) - 1
-                for path in paths:
-                    relPath = FUtils.NormalizeRegEx(
-                            FUtils.GetRelativePath(path, MAIN_FOLDER))
-                    newRegEx = regEx[curIndex] + relPath + "|"
-                    concatNewRegEx = (concatRegEx[concatCurIndex] + relPath + 
-                                      "|")
-                    
-                    if (len(newRegEx) < 30000):
-                        regEx[curIndex] = newRegEx
-                    else:
-                        regEx[curIndex] = regEx[curIndex][:-1]
-                        regEx.append(relPath + "|")
-                        curIndex = curIndex + 1
-                    if (len(concatNewRegEx) < 30000):
-                        concatRegEx[concatCurIndex] = concatNewRegEx
-                    else:
-                        concatRegEx[concatCurIndex] = concatRegEx[concatCurIndex][:-1]
-                        concatRegEx.append(relPath + "|")
-                        concatCurIndex = concatCurIndex + 1
-                regEx[curIndex] = regEx[curIndex][:-1]
-                concatRegEx[concatCurIndex] = concatRegEx[concatCurIndex][:-1]
         else:
             regEx = self.__GetRegEx()
             paths, items = self.__GetPathsAndItems(regEx)
             if (regEx == ""):
                 regEx = []
             else:
-                if (len(concatRegEx) == 0):
-                    concatRegEx.append("")
-                    
-                concatNewRegEx = concatRegEx[-1] + regEx
-                if (len(concatNewRegEx) < 30000):
-                    concatRegEx[-1] = concatNewRegEx
-                else:
-                    # the text control only allows up to 30k characters
-                    concatRegEx.append(regEx)
                 regEx = [regEx]
         
         return (paths, regEx)
@@ -410,7 +385,7 @@ class FSelectDataSetDialog(wx.wizard.WizardPageSimple, FDataSetParser):
             comments = ""
             
             if (os.path.isfile(path) and FCOLLADAParser.IsCOLLADADocument(path)):
-                (title, subject, keyword) = FCOLLADAParser.GetCOLLADAAssetInformation(path)
+                (title, subject, keyword) = GetDocumentAssetInformation(path)
                 comments = "[%s] Keywords: %s\nDescription: %s" % (title, keyword, subject)
             
             self.__commentsCtrl.SetValue(comments)
@@ -65,8 +65,11 @@ class FExecutionGrid(FGrid):
         self.__pythonPath = pythonPath
         self.__allColumns = []
         self.__outputKeys = []
+        # execution is None for the current execution of the test, loaded
+        # only when its row is shown
         self.__executions = [] # [(id, test, execution),]
         self.__executionsKeyMap = {} # {id:position,}
+        self.__countedSummaries = {} # {id:summary,} in the statistics
         
         self.__executionPassed = 0
         self.__executionFailed = 0
@@ -95,6 +98,7 @@ class FExecutionGrid(FGrid):
         self.__timeRenderer = None
         
         self.__Initialize()
+        self.SetRowLoader(self.__LoadRow)
         
         dialog = FPreferenceDialog(self, [], [])
         width, height = dialog.GetThumbnailSize()
@@ -146,6 +150,7 @@ class FExecutionGrid(FGrid):
         for key in keys:
             position = self.__executionsKeyMap[key]
             id, test, execution = self.__executions[position]
+            if (execution == None): execution = test.GetCurrentExecution()
             
             if (execution == None): continue
             
@@ -164,6 +169,10 @@ class FExecutionGrid(FGrid):
         for key in keys:
             position = self.__executionsKeyMap[key]
             id, test, execution = self.__executions[position]
+            if (execution == None): execution = test.GetCurrentExecution()
+            
+            if (execution == None): continue
+            
             self.PartialRefreshRemove(test, id)
             test.UpdateResult(self.__testProcedure, execution)
             self.PartialRefreshAdd(test, execution, id)
@@ -270,6 +279,8 @@ class FExecutionGrid(FGrid):
         self.DeleteRow(id)
         self.__executions.pop(position)
         self.__executionsKeyMap.pop(id)
+        if (self.__countedSummaries.has_key(id)):
+            self.__countedSummaries.pop(id)
         for key in self.__executionsKeyMap.keys():
             pos = self.__executionsKeyMap[key]
             if (pos > position):
@@ -332,6 +343,8 @@ class FExecutionGrid(FGrid):
                 self.__outputKeys.append(FExecutionGrid.__NEXT_KEY + step)
             self.__AddColumn(FExecutionGrid.__NEXT_KEY + step, (title, 150), 
                     outputRenderer)
+            if (op == VALIDATE):
+                self.__SetSortValue(FExecutionGrid.__NEXT_KEY + step)
             
         self.__AddColumn(FExecutionGrid.__RESULT, 
                 FExecutionGrid.__COLUMNS[FExecutionGrid.__RESULT], 
@@ -356,11 +369,61 @@ class FExecutionGrid(FGrid):
         self.__AddColumn(FExecutionGrid.__ENVIRONMENT, 
                 FExecutionGrid.__COLUMNS[FExecutionGrid.__ENVIRONMENT], 
                 self.__environmentRenderer)
+        
+        # the other columns need their rows to be loaded to be sorted
+        for key in [FExecutionGrid.__TEST_ID, FExecutionGrid.__FILENAME,
+                    FExecutionGrid.__COLLADA_ASSET_ID, 
+                    FExecutionGrid.__COLLADA_ASSET_KEYWORD,
+                    FExecutionGrid.__COLLADA_ASSET_SUBJECT,
+                    FExecutionGrid.__RESULT, FExecutionGrid.__DIFFERENT,
+                    FExecutionGrid.__TIME]:
+            self.__SetSortValue(key)
+        for i in range(len(FGlobals.badgeLevels)):
+            self.__SetSortValue(FExecutionGrid.__BADGE_START + i)
     
     def __AddColumn(self, key, columnInfo, renderer = None, editor = None):
         self.AppendColumn(key, columnInfo[0], columnInfo[1], renderer, editor)
         self.__allColumns.append((key, columnInfo[0]))
     
+    def __SetSortValue(self, key):
+        def GetSortValue(id):
+            return self.__GetSortValue(id, key)
+        self.SetSortValueGetter(key, GetSortValue)
+    
+    def __GetSortValue(self, id, key):
+        """__GetSortValue(id, key) -> object
+        
+        Gets the value to sort a row on from its test and the summary of its
+        execution, so the execution is not loaded. The values are in tuples
+        like the data of the cells; see FTable.SafeCmp.
+        
+        """
+        test = self.__executions[self.__executionsKeyMap[id]][1]
+        if (key == FExecutionGrid.__TEST_ID):
+            return test.GetTestId()
+        if (key == FExecutionGrid.__FILENAME):
+            return (test.GetSeparatedFilename(),)
+        if (key == FExecutionGrid.__COLLADA_ASSET_ID):
+            return (test.GetCOLLADAId(),)
+        if (key == FExecutionGrid.__COLLADA_ASSET_KEYWORD):
+            return (test.GetCOLLADAKeyword(),)
+        if (key == FExecutionGrid.__COLLADA_ASSET_SUBJECT):
+            return (test.GetCOLLADASubject(),)
+        
+        summary = self.__countedSummaries.get(id, None)
+        if (summary == None): return (None,)
+        
+        if (key == FExecutionGrid.__RESULT):
+            return (summary.GetResult(),)
+        if (key == FExecutionGrid.__DIFFERENT):
+            return (summary.GetDiffFromPrevious(),)
+        if (key == FExecutionGrid.__TIME):
+            return (summary.GetTimeRan(),)
+        if (key >= FExecutionGrid.__BADGE_START):
+            badgeName = FGlobals.badgeLevels[key - FExecutionGrid.__BADGE_START]
+            return (summary.GetJudgementResult(badgeName),)
+        return (summary.GetErrorCount(key - FExecutionGrid.__NEXT_KEY),)
+    
     def __SavePreferences(self):
         tempDict = {"width" : self.__prefWidth,
                     "height" : self.__prefHeight,
@@ -375,7 +438,9 @@ class FExecutionGrid(FGrid):
         cPickle.dump(tempDict, f)
         f.close()
     
-    # clears the table and repopulates
+    # clears the table and repopulates. The rows are only filled when they
+    # are shown, by __LoadRow; the statistics are gathered from the summaries
+    # of the executions.
     def FullRefresh(self):
         self.ClearGrid()
         
@@ -384,6 +449,7 @@ class FExecutionGrid(FGrid):
         self.__executionPassed = 0
         self.__executionFailed = 0
         self.__judgementCompiler = FJudgementCompiler()
+        self.__countedSummaries = {}
         
         # Iterate over the tests, filling in the table
         # and processing the results.
@@ -394,16 +460,16 @@ class FExecutionGrid(FGrid):
     def PartialRefreshRemove(self, test, id=None):
         self.__executionTotal = self.__executionTotal - 1
 
-        # Retrieve the execution that is currently displayed.
+        # Retrieve the summary that was counted.
         if (id == None): id = test.GetTestId()
-        row = self.__executionsKeyMap[id]
-        (id, test, execution) = self.__executions[row]
+        if (not self.__countedSummaries.has_key(id)): return
+        summary = self.__countedSummaries.pop(id)
         
         # Remove the passed/failed status.
-        if execution != None:
-            result = execution.GetResult()
+        if summary != None:
+            result = summary.GetResult()
             if result != None:
-                if result.GetResult():
+                if result:
                     self.__executionPassed = self.__executionPassed - 1
                 else:
                     self.__executionFailed = self.__executionFailed - 1
@@ -411,16 +477,45 @@ class FExecutionGrid(FGrid):
             # Remove the judgements.
             for i in range(len(FGlobals.badgeLevels)):
                 badgeName = FGlobals.badgeLevels[i]
-                badgeResult = execution.GetJudgementResult(badgeName)
+                badgeResult = summary.GetJudgementResult(badgeName)
                 self.__judgementCompiler.RemoveJudgement(i, badgeResult)
 
     def PartialRefreshAdd(self, test, execution=None, id=None):        
         self.__executionTotal = self.__executionTotal + 1
         
-        # Use defaults values.
+        # Use defaults values. The rows showing the current execution of their
+        # test count its saved summary, so the execution is not loaded; the
+        # other rows were given their execution by AddExecution.
         if (id == None): id = test.GetTestId()
+        execution = self.__executions[self.__executionsKeyMap[id]][2]
+        if (execution == None):
+            summary = test.GetCurrentSummary()
+        else:
+            summary = execution.GetSummary()
+        
+        # Add the passed/failed status and the judgements.
+        if (summary != None):
+            for i in range(len(FGlobals.badgeLevels)):
+                badgeName = FGlobals.badgeLevels[i]
+                badgeResult = summary.GetJudgementResult(badgeName)
+                self.__judgementCompiler.ProcessJudgement(i, badgeResult)
+            
+            result = summary.GetResult()
+            if result != None:
+                if result:
+                    self.__executionPassed = self.__executionPassed + 1
+                else:
+                    self.__executionFailed = self.__executionFailed + 1
+        
+        # The row is filled again by __LoadRow when it is shown.
+        self.__countedSummaries[id] = summary
+        self.InvalidateRow(id)
+    
+    def __LoadRow(self, id):
+        if (not self.__executionsKeyMap.has_key(id)): return
+        id, test, execution = self.__executions[self.__executionsKeyMap[id]]
         if (execution == None): execution = test.GetCurrentExecution()
-
+        
         # Pick-up the main information containers.
         if (execution == None):
             comments = test.GetCurrentComments()
@@ -460,7 +555,6 @@ class FExecutionGrid(FGrid):
                 
                 # Process and render the judgement information
                 self.InsertData(id, FExecutionGrid.__BADGE_START + i, FJudgement(badgeResult, badgeExecutionLog))
-                self.__judgementCompiler.ProcessJudgement(i, badgeResult)
             
             # Display the environment columns
             self.InsertData(id, FExecutionGrid.__DIFFERENT, execution.GetDiffFromPrevious())
@@ -468,17 +562,8 @@ class FExecutionGrid(FGrid):
             self.InsertData(id, FExecutionGrid.__LOGS, logs)
             self.InsertData(id, FExecutionGrid.__TIME, execution.GetTimeRan())
             self.InsertData(id, FExecutionGrid.__ENVIRONMENT, execution.GetEnvironment())
-            
-            result = execution.GetResult()
-            if result != None:
-                if result.GetResult():
-                    self.__executionPassed = self.__executionPassed + 1
-                else:
-                    self.__executionFailed = self.__executionFailed + 1
-        else:
-            self.ClearRow(id)
 
-        # Insert this data afterwards so that ClearRow can do its work.
+        # The row starts cleared, as done by InvalidateRow.
         self.InsertData(id, FExecutionGrid.__TEST_ID, test.GetTestId())
         self.InsertData(id, FExecutionGrid.__FILENAME, (test.GetSeparatedFilename(),))
         self.InsertData(id, FExecutionGrid.__COLLADA_ASSET_ID, (test.GetCOLLADAId(),))
@@ -123,6 +123,27 @@ class FGrid(wx.grid.Grid):
     
     def InsertData(self, rKey, cKey, data):
         self.__table.InsertData(rKey, cKey, data)
+    
+    def SetRowLoader(self, rowLoader):
+        """SetRowLoader(rowLoader) -> None
+        
+        Makes the grid fill its rows on demand, when they are shown. See 
+        FTable.SetRowLoader.
+        
+        """
+        self.__table.SetRowLoader(rowLoader)
+    
+    def SetSortValueGetter(self, cKey, sortValueGetter):
+        """SetSortValueGetter(cKey, sortValueGetter) -> None
+        
+        Sorts a column without filling its rows. See 
+        FTable.SetSortValueGetter.
+        
+        """
+        self.__table.SetSortValueGetter(cKey, sortValueGetter)
+    
+    def InvalidateRow(self, rKey):
+        self.__table.InvalidateRow(rKey)
         
     def ClearRow(self, rKey):
         for col in range(self.__table.GetNumberCols()):
@@ -9,6 +9,8 @@ import os.path
 import wx
 
 import Core.Common.FUtils as FUtils
+from Core.Common.FImageCache import *
+from Core.Common.FThumbnailCache import *
 
 class FImageData:
     __HEIGHT_SPACING = 2
@@ -51,8 +53,10 @@ class FImageData:
         
         if (executionDir != None): self.__executionName = os.path.basename(executionDir)
         else: self.__executionName = None
-        
-        self.__defaultImage = self.GetImage(-1)
+    
+    # The images are only decoded when they are asked for, which is when
+    # their cell is drawn. When size is given, (width, height), the images 
+    # are thumbnails which fit in it.
     
     def GetExecutionName(self):
         return self.__executionName
@@ -61,28 +65,30 @@ class FImageData:
         if (self.__blessedFilenames == None): return [None,]
         else: return self.__blessedFilenames
     
-    def GetBlessedImages(self):
+    def GetBlessedImages(self, size = None):
         if (self.__blessedFilenames == None): 
             return [self.__GetEmptyImage("(No Blessed)"),]
             
         images = []
         for name in self.__blessedFilenames:
-            images.append(self.__GetImage(name))
+            images.append(self.__GetImage(name, size))
         return images
     
     def GetDefaultFilename(self):
         return self.__defaultFilename
     
     def GetDefaultImage(self):
+        if (self.__defaultImage == None):
+            self.__defaultImage = self.GetImage(-1)
         return self.__defaultImage
     
     def GetFilenames(self):
         return self.__filenameList
     
-    def GetImages(self):
+    def GetImages(self, size = None):
         images = []
         for name in self.__filenameList:
-            images.append(self.__GetImage(name))
+            images.append(self.__GetImage(name, size))
         return images
     
     def GetPreviousFilenames(self):
@@ -91,26 +97,26 @@ class FImageData:
         
         return self.__previousFilenameList
     
-    def GetPreviousImages(self):
+    def GetPreviousImages(self, size = None):
         if (self.__previousFilenameList == None): 
             return [self.__GetEmptyImage("(No Previous)"),]
         
         images = []
         for name in self.__previousFilenameList:
-            images.append(self.__GetImage(name))
+            images.append(self.__GetImage(name, size))
         return images
     
     def GetFilename(self, fileNumber): # fileNumber 0 indexing
         return self.__filenameList[fileNumber]
     
-    def GetImage(self, imageNumber): # imageNumber 0 indexing
-        return self.__GetImage(self.__filenameList[imageNumber])
+    def GetImage(self, imageNumber, size = None): # imageNumber 0 indexing
+        return self.__GetImage(self.__filenameList[imageNumber], size)
     
-    def GetBlessedImage(self, imageNumber): # imageNumber 0 indexing
-        return self.__GetImage(self.__blessedFilenames[imageNumber])
+    def GetBlessedImage(self, imageNumber, size = None): # 0 indexing
+        return self.__GetImage(self.__blessedFilenames[imageNumber], size)
     
-    def GetPreviousImage(self, imageNumber): # imageNumber 0 indexing
-        return self.__GetImage(self.__previousFilenameList[imageNumber])
+    def GetPreviousImage(self, imageNumber, size = None): # 0 indexing
+        return self.__GetImage(self.__previousFilenameList[imageNumber], size)
     
     def GetTest(self):
         return self.__test
@@ -163,12 +169,18 @@ class FImageData:
         
         return bitmap.ConvertToImage()
     
-    def __GetImage(self, filename):
+    def __GetImage(self, filename, size = None):
         if (not os.path.isfile(filename)): 
             return wx.ImageFromBitmap(wx.ArtProvider.GetBitmap(
                     wx.ART_MISSING_IMAGE, wx.ART_OTHER, (48, 48)))
         
         if (self.__IsRecognizable(filename)):
+            if (size != None):
+                image = GetThumbnailCache().GetThumbnail(filename, size[0], 
+                                                         size[1])
+            else:
+                image = GetImageCache().GetImage(filename)
+            if (image != None): return image
             return wx.Image(filename, wx.BITMAP_TYPE_ANY)
         
         bitmap = wx.EmptyBitmap(FImageData.__BITMAP_WIDTH, 
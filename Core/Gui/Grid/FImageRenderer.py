@@ -102,11 +102,10 @@ class FImageRenderer(FTextRenderer):
                     rect.x + 1, rect.y + 1, width, height, filename, type))
     
     # lengths of filenames and images could be different if it is an animation 
-    # that only needs to display 1 frame
-    def __TestAndDraw(self, rect, xOffset, yOffset, images, filenames, grid, 
-                      dc, row, col, id, type):
-        length = len(images)
-        
+    # that only needs to display 1 frame. getImages is only called if the 
+    # images are visible, so that images are not decoded for hidden cells.
+    def __TestAndDraw(self, rect, xOffset, yOffset, getImages, filenames, 
+                      grid, dc, row, col, id, type):
         newRectWidth = min(rect.width - xOffset, self.__imageWidth)
         newRectHeight = min(rect.height - yOffset, self.__imageHeight)
         if ((newRectWidth > 0) and (newRectHeight > 0)):
@@ -114,7 +113,8 @@ class FImageRenderer(FTextRenderer):
                               newRectHeight)
             
             if (grid.IsRectVisible(newRect)):
-                if (length == 1):
+                images = getImages()
+                if (len(images) == 1):
                     self.__DrawImage(images[0], filenames, dc, newRect, row, 
                                      col, type)
                 else:
@@ -162,50 +162,51 @@ class FImageRenderer(FTextRenderer):
         
         xOffset = 0
         yOffset = 0
+        size = (self.__imageWidth, self.__imageHeight)
         if (self.__showBlessed):
             filenames = imageData.GetBlessedFilenames()
             if ((len(filenames) == 1) or self.__animateAll or isSelected):
-                images = imageData.GetBlessedImages()
+                getImages = lambda: imageData.GetBlessedImages(size)
                 if (len(filenames) == 1):
                     filenames = filenames[0]
                     type = FImageType.IMAGE
                 else:
                     type = FImageType.ANIMATION
             else:
-                images = [imageData.GetBlessedImage(-1),]
+                getImages = lambda: [imageData.GetBlessedImage(-1, size),]
                 type = FImageType.ANIMATION
             xOffset, dummy = self.__TestAndDraw(rect, xOffset, yOffset, 
-                    images, filenames, grid, dc, row, col,
+                    getImages, filenames, grid, dc, row, col,
                     FImageRenderer.__BLESSED, type)
         
         if (self.__showPrevious):
             filenames = imageData.GetPreviousFilenames()
             if ((len(filenames) == 1) or self.__animateAll or isSelected):
-                images = imageData.GetPreviousImages()
+                getImages = lambda: imageData.GetPreviousImages(size)
                 if (len(filenames) == 1):
                     filenames = filenames[0]
                     type = FImageType.IMAGE
                 else:
                     type = FImageType.ANIMATION
             else:
-                images = [imageData.GetPreviousImage(-1),]
+                getImages = lambda: [imageData.GetPreviousImage(-1, size),]
                 type = FImageType.ANIMATION
             xOffset, dummy = self.__TestAndDraw(rect, xOffset, yOffset, 
-                    images, filenames, grid, dc, row, col,
+                    getImages, filenames, grid, dc, row, col,
                     FImageRenderer.__PREVIOUS, type)
         
         filenames = imageData.GetFilenames()
         if ((len(filenames) == 1) or self.__animateAll or isSelected):
-            images = imageData.GetImages()
+            getImages = lambda: imageData.GetImages(size)
             if (len(filenames) == 1):
                 filenames = filenames[0]
                 type = FImageType.IMAGE
             else:
                 type = FImageType.ANIMATION
         else:
-            images = [imageData.GetImage(-1),]
+            getImages = lambda: [imageData.GetImage(-1, size),]
             type = FImageType.ANIMATION
-        self.__TestAndDraw(rect, xOffset, yOffset, images,
+        self.__TestAndDraw(rect, xOffset, yOffset, getImages,
                 filenames, grid, dc, row, col,
                 FImageRenderer.__CURRENT, type)
         
@@ -59,7 +59,7 @@ class FResultRenderer(FTextRenderer):
         def Toggle(e):
             # Toggle the execution results.
             grid.PartialRefreshRemove(value[1], value[2])
-            value[0].ToggleResult()
+            value[1].ToggleResult(value[0])
             grid.PartialRefreshAdd(value[1], value[0], value[2])
             grid.PartialRefreshDone()
         return Toggle
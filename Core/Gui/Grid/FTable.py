@@ -15,6 +15,7 @@ class FTable(wx.grid.PyGridTableBase):
     __RENDERER = 3
     __EDITOR = 4
     __ATTR = 5
+    __LOADED_ROWS_COUNT = 200 # rows kept by a row loader
     
     def __init__(self, grid):
         wx.grid.PyGridTableBase.__init__(self)
@@ -28,14 +29,72 @@ class FTable(wx.grid.PyGridTableBase):
         self.__data = {}    # form {rkey : {ckey : data}}
         self.__rowsKey = [] # rkeys corresponding to shown value in table
         self.__colsKey = [] # ckeys corresponding to shown value in table
+        
+        self.__rowLoader = None
+        self.__loadedRows = [] # rkeys filled by the row loader, oldest first
+        self.__sortValueGetters = {} # form {ckey : sortValueGetter}
+    
+    def SetRowLoader(self, rowLoader):
+        """SetRowLoader(rowLoader) -> None
+        
+        Makes the table fill its rows on demand. rowLoader is called with the
+        key of a row the first time one of its values is needed; it is
+        expected to fill the row with InsertData. Only the rows which were
+        needed last are kept, the others are cleared and loaded again when
+        they are needed.
+        
+        """
+        self.__rowLoader = rowLoader
+        self.__loadedRows = []
+    
+    def SetSortValueGetter(self, cKey, sortValueGetter):
+        """SetSortValueGetter(cKey, sortValueGetter) -> None
+        
+        Makes the table sort a column on the values returned by 
+        sortValueGetter instead of the values of its cells. sortValueGetter
+        is called with the key of each row. The rows do not have to be 
+        loaded by the row loader to be sorted on such a column.
+        
+        """
+        self.__sortValueGetters[cKey] = sortValueGetter
+    
+    def InvalidateRow(self, rKey):
+        """InvalidateRow(rKey) -> None
+        
+        Clears a row so that the row loader fills it again the next time one
+        of its values is needed.
+        
+        """
+        self.__ClearRow(rKey)
+        if (rKey in self.__loadedRows):
+            self.__loadedRows.remove(rKey)
+    
+    def __LoadRow(self, rKey):
+        if (self.__rowLoader == None): return
+        
+        if (rKey in self.__loadedRows):
+            if (self.__loadedRows[-1] != rKey):
+                self.__loadedRows.remove(rKey)
+                self.__loadedRows.append(rKey)
+            return
+        
+        self.__loadedRows.append(rKey)
+        self.__rowLoader(rKey)
+        
+        while (len(self.__loadedRows) > FTable.__LOADED_ROWS_COUNT):
+            self.__ClearRow(self.__loadedRows.pop(0))
+    
+    def __ClearRow(self, rKey):
+        for col in self.__columns.keys():
+            if (self.__columns[col][FTable.__RENDERER] == None):
+                self.__data[rKey][col] = ""
+            else:
+                self.__data[rKey][col] = None
     
     def Clear(self):
         for row in self.__rows.keys():
-            for col in self.__columns.keys():
-                if (self.__columns[col][FTable.__RENDERER] == None):
-                    self.__data[row][col] = ""
-                else:
-                    self.__data[row][col] = None
+            self.__ClearRow(row)
+        self.__loadedRows = []
     
     def GetNumberRows(self):
         return len(self.__rows)
@@ -99,6 +158,8 @@ class FTable(wx.grid.PyGridTableBase):
             raise KeyError, "Key not in table"
         
         self.__data.pop(key)
+        if (key in self.__loadedRows):
+            self.__loadedRows.remove(key)
         
         for i in range(self.__rows[key], self.GetNumberRows() - 1):
             nextKey = self.__rowsKey[i + 1]
@@ -169,11 +230,15 @@ class FTable(wx.grid.PyGridTableBase):
             self.__data[rKey][cKey] = None
     
     def GetValue(self, row, col):
-        return self.__data[self.__rowsKey[row]][self.__colsKey[col]]
+        rKey = self.__rowsKey[row]
+        self.__LoadRow(rKey)
+        return self.__data[rKey][self.__colsKey[col]]
     
     def IsEmptyCell(self, row, col):
         try:
-            return not self.__data[self.__rowsKey[row]][self.__colsKey[col]]
+            rKey = self.__rowsKey[row]
+            self.__LoadRow(rKey)
+            return not self.__data[rKey][self.__colsKey[col]]
         except IndexError:
             return True
         
@@ -190,7 +255,9 @@ class FTable(wx.grid.PyGridTableBase):
         return self.__colsKey[col]
     
     def SetValue(self, row, col, value):
-        self.__data[self.__rowsKey[row]][self.__colsKey[col]] = value
+        rKey = self.__rowsKey[row]
+        self.__LoadRow(rKey)
+        self.__data[rKey][self.__colsKey[col]] = value
     
     # SafeCmp -- a safe cmp function for sort
     #     Fixes issue in SortColumn when data[0][rKey] is initialized 
@@ -215,9 +282,15 @@ class FTable(wx.grid.PyGridTableBase):
         self.__sortingDirection = ascending
         
         tempList = []
-        for rKey in self.__data.keys():
-            data = self.__data[rKey][cKey]
-            if data != None: tempList.append((data, rKey))
+        if (self.__sortValueGetters.has_key(cKey)):
+            sortValueGetter = self.__sortValueGetters[cKey]
+            for rKey in self.__data.keys():
+                tempList.append((sortValueGetter(rKey), rKey))
+        else:
+            for rKey in self.__data.keys():
+                self.__LoadRow(rKey)
+                data = self.__data[rKey][cKey]
+                if data != None: tempList.append((data, rKey))
         
         if (len(tempList) == 0): return
         
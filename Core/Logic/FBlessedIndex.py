@@ -0,0 +1,266 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import cPickle
+import os
+import os.path
+import threading
+
+import Core.Common.FUtils as FUtils
+from Core.Common.FConstants import *
+from Core.Common.FImageCache import *
+
+class FBlessedIndex:
+    
+    """The index of the blessed images of a data set.
+    
+    For each blessed image, it keeps the dimensions, the checksum of the
+    bytes and a perceptual hash: an 8x8 grayscale thumbnail where each bit
+    tells whether a pixel is brighter than the average. Two renders of the
+    same scene have perceptual hashes a few bits apart. The index is saved in
+    the Blessed directory and entries are recalculated when the size or
+    modification time of an image changes. Use GetBlessedIndex to get the
+    index of a data set, so that the threads of a run share it.
+    
+    """
+    
+    __HASH_SIZE = 8
+    
+    def __init__(self, dataSetPath):
+        """__init__(dataSetPath) -> FBlessedIndex
+        
+        Loads the index of the blessed images of a data set.
+        
+        arguments:
+            dataSetPath
+                string corresponding to the data set directory.
+        
+        """
+        self.__blessedDir = os.path.join(dataSetPath, BLESSED_DIR)
+        self.__filename = os.path.join(self.__blessedDir, BLESSED_INDEX_FILE)
+        self.__entries = {}
+        self.__isDirty = False
+        self.__lock = threading.Lock()
+        
+        if (os.path.isfile(self.__filename)):
+            try:
+                file = open(self.__filename, "rb")
+                try:
+                    self.__entries = cPickle.load(file)
+                finally:
+                    file.close()
+            except Exception, e:
+                print "<FBlessedIndex> rebuilding " + self.__filename
+                self.__entries = {}
+    
+    def Save(self):
+        """Save() -> None
+        
+        Saves the index if it changed since it was loaded.
+        
+        """
+        self.__lock.acquire()
+        try:
+            if ((not self.__isDirty) or 
+                    (not os.path.isdir(self.__blessedDir))):
+                return
+            
+            # write a complete file first so that readers never see half of it
+            tempFilename = self.__filename + ".tmp"
+            try:
+                file = open(tempFilename, "wb")
+                try:
+                    cPickle.dump(self.__entries, file, 
+                                 cPickle.HIGHEST_PROTOCOL)
+                finally:
+                    file.close()
+                try:
+                    os.rename(tempFilename, self.__filename)
+                except OSError, e:
+                    # os.rename does not replace an existing file on Windows
+                    os.remove(self.__filename)
+                    os.rename(tempFilename, self.__filename)
+                self.__isDirty = False
+            except (IOError, OSError), e:
+                # the data sets may be read-only; it is only an optimization
+                print "<FBlessedIndex> could not save " + self.__filename
+                print e
+        finally:
+            self.__lock.release()
+    
+    def GetCandidates(self, filename):
+        """GetCandidates(filename) -> (str, list_of_str)
+        
+        Gets the blessed images that filename should be compared against.
+        
+        arguments:
+            filename
+                string corresponding to the image to find a blessed image for.
+        
+        returns:
+            pair with the blessed image that has exactly the same bytes as
+            filename, or None if there is none, and the list of all the
+            blessed images with the same extension as filename. The list is
+            sorted from the most to the least likely to match: images with
+            the same dimensions first, then by perceptual hash distance.
+        
+        """
+        ext = FUtils.GetExtension(filename)
+        extDir = os.path.join(self.__blessedDir, ext)
+        if (not os.path.isdir(extDir)): return (None, [])
+        
+        imageEntry = self.__CalculateEntry(filename)
+        
+        self.__lock.acquire()
+        try:
+            # forget the images that are not blessed anymore
+            entries = os.listdir(extDir)
+            for key in self.__entries.keys():
+                if ((key.find(ext + "/") == 0) and
+                        (entries.count(key[len(ext) + 1:]) == 0)):
+                    self.__entries.pop(key)
+                    self.__isDirty = True
+            
+            candidates = []
+            for entry in entries:
+                blessedFilename = os.path.join(extDir, entry)
+                if (not os.path.isfile(blessedFilename)): continue
+                
+                blessedEntry = self.__GetEntry(ext + "/" + entry, 
+                                               blessedFilename)
+                if (blessedEntry[4] == imageEntry[4]):
+                    return (blessedFilename, [blessedFilename,])
+                
+                candidates.append((self.__GetDistance(imageEntry,
+                        blessedEntry), entry, blessedFilename))
+            
+            candidates.sort()
+            blessedFilenames = []
+            for distance, entry, blessedFilename in candidates:
+                blessedFilenames.append(blessedFilename)
+            return (None, blessedFilenames)
+        finally:
+            self.__lock.release()
+    
+    def __GetEntry(self, key, filename):
+        stat = os.stat(filename)
+        entry = self.__entries.get(key, None)
+        if ((entry == None) or (entry[0] != stat.st_size) or
+                (entry[1] != stat.st_mtime)):
+            entry = self.__CalculateEntry(filename)
+            self.__entries[key] = entry
+            self.__isDirty = True
+        return entry
+    
+    def __CalculateEntry(self, filename):
+        """__CalculateEntry(filename) -> tuple
+        
+        returns:
+            tuple with the size, modification time, width, height, checksum
+            and perceptual hash of the image. The dimensions and perceptual
+            hash are None if the image cannot be decoded.
+        
+        """
+        stat = os.stat(filename)
+        width = None
+        height = None
+        perceptualHash = None
+        
+        try:
+            image = GetImageCache().GetImage(filename)
+            if (image != None):
+                width = image.GetWidth()
+                height = image.GetHeight()
+                size = FBlessedIndex.__HASH_SIZE
+                data = image.Scale(size, size).GetData()
+                
+                values = []
+                total = 0
+                for i in range(0, len(data), 3):
+                    value = (ord(data[i]) * 299 + ord(data[i + 1]) * 587 +
+                             ord(data[i + 2]) * 114)
+                    values.append(value)
+                    total = total + value
+                
+                average = total / len(values)
+                perceptualHash = 0L
+                for value in values:
+                    perceptualHash = perceptualHash << 1
+                    if (value > average):
+                        perceptualHash = perceptualHash | 1
+        except Exception, e:
+            pass
+        
+        return (stat.st_size, stat.st_mtime, width, height,
+                FUtils.CalculateChecksum(filename), perceptualHash)
+    
+    def __GetDistance(self, entry1, entry2):
+        """__GetDistance(entry1, entry2) -> (int, int)
+        
+        returns:
+            pair which sorts the closest images first: 0 if the dimensions are
+            the same or 1 otherwise, then the number of different bits of the
+            perceptual hashes, or more bits than there are if unknown.
+        
+        """
+        if ((entry1[2] == entry2[2]) and (entry1[3] == entry2[3])):
+            sizeDistance = 0
+        else:
+            sizeDistance = 1
+        
+        if ((entry1[5] == None) or (entry2[5] == None)):
+            return (sizeDistance, FBlessedIndex.__HASH_SIZE ** 2 + 1)
+        
+        bits = entry1[5] ^ entry2[5]
+        hashDistance = 0
+        while (bits):
+            hashDistance = hashDistance + int(bits & 1)
+            bits = bits >> 1
+        return (sizeDistance, hashDistance)
+
+_indices = {}
+_indicesLock = threading.Lock()
+
+def GetBlessedIndex(dataSetPath):
+    """GetBlessedIndex(dataSetPath) -> FBlessedIndex
+    
+    Gets the index of the blessed images of a data set, shared by the whole
+    process until SaveBlessedIndices is called.
+    
+    arguments:
+        dataSetPath
+            string corresponding to the data set directory.
+    
+    returns:
+        FBlessedIndex of the data set.
+    
+    """
+    _indicesLock.acquire()
+    try:
+        if (not _indices.has_key(dataSetPath)):
+            _indices[dataSetPath] = FBlessedIndex(dataSetPath)
+        return _indices[dataSetPath]
+    finally:
+        _indicesLock.release()
+
+def SaveBlessedIndices():
+    """SaveBlessedIndices() -> None
+    
+    Saves the indices which changed and forgets them all, so that they are
+    loaded again the next time they are needed. It is called at the end of
+    a run.
+    
+    """
+    _indicesLock.acquire()
+    try:
+        indices = _indices.values()
+        _indices.clear()
+    finally:
+        _indicesLock.release()
+    
+    for index in indices:
+        index.Save()
@@ -0,0 +1,388 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import cPickle
+import os
+import os.path
+import threading
+
+import Core.Common.FCOLLADAParser as FCOLLADAParser
+import Core.Common.FUtils as FUtils
+from Core.Common.FConstants import *
+
+class FDataSetCatalog:
+    
+    """The catalog of the documents of a data set directory.
+    
+    A data set document is a file with the same proper name as its
+    directory. The catalog remembers the listing of every directory along
+    with its modification time; a directory is listed again only when its
+    modification time changes, which happens when entries are added to it
+    or removed from it. It also remembers the checksum and the <asset>
+    information of the documents along with their size and modification
+    time. The catalog is saved in the data set directory.
+    
+    """
+    
+    def __init__(self, dataSetDir):
+        """__init__(dataSetDir) -> FDataSetCatalog
+        
+        Loads the catalog of a data set directory.
+        
+        arguments:
+            dataSetDir
+                string corresponding to the data set directory, as in
+                DATA_SET_DIRS.
+        
+        """
+        self.__dataSetDir = dataSetDir
+        self.__rootDir = os.path.normcase(os.path.abspath(dataSetDir))
+        self.__filename = os.path.join(dataSetDir, DATA_SET_CATALOG_FILENAME)
+        self.__dirs = {}
+        self.__checksums = {}
+        self.__assets = {}
+        self.__isDirty = False
+        self.__lock = threading.Lock()
+        
+        if (os.path.isfile(self.__filename)):
+            try:
+                file = open(self.__filename, "rb")
+                try:
+                    (self.__dirs, self.__checksums, 
+                            self.__assets) = cPickle.load(file)
+                finally:
+                    file.close()
+            except Exception, e:
+                print "<FDataSetCatalog> rebuilding " + self.__filename
+                self.__dirs = {}
+                self.__checksums = {}
+                self.__assets = {}
+    
+    def Save(self):
+        """Save() -> None
+        
+        Saves the catalog if it changed since it was loaded.
+        
+        """
+        self.__lock.acquire()
+        try:
+            if (not self.__isDirty): return
+            
+            try:
+                file = open(self.__filename, "wb")
+                try:
+                    cPickle.dump((self.__dirs, self.__checksums, 
+                                  self.__assets), file, 
+                                 cPickle.HIGHEST_PROTOCOL)
+                finally:
+                    file.close()
+                self.__isDirty = False
+            except IOError, e:
+                # the data sets may be read-only; it is only an optimization
+                print "<FDataSetCatalog> could not save " + self.__filename
+                print e
+        finally:
+            self.__lock.release()
+    
+    def GetDocuments(self):
+        """GetDocuments() -> list_of_str
+        
+        Gets the documents of the data set directory, refreshing the
+        directories which changed since they were last listed.
+        
+        returns:
+            list of str corresponding to the paths of the documents, in the
+            same order and form as a recursion with
+            FDataSetParser.GetValidFileAndDirs from the data set directory.
+        
+        """
+        self.__lock.acquire()
+        try:
+            documents = []
+            visitedDirs = {}
+            self.__GetDocumentsRecurse("", documents, visitedDirs)
+            
+            # forget the directories which do not exist anymore
+            for relativeDir in self.__dirs.keys():
+                if (not visitedDirs.has_key(relativeDir)):
+                    self.__dirs.pop(relativeDir)
+                    self.__isDirty = True
+            
+            return documents
+        finally:
+            self.__lock.release()
+    
+    def __GetDocumentsRecurse(self, relativeDir, documents, visitedDirs):
+        path = self.__GetPath(relativeDir)
+        visitedDirs[relativeDir] = True
+        
+        mtime = os.stat(path).st_mtime
+        entry = self.__dirs.get(relativeDir, None)
+        if ((entry == None) or (entry[0] != mtime)):
+            entry = (mtime,) + self.__ListDir(path)
+            self.__dirs[relativeDir] = entry
+            self.__isDirty = True
+        
+        mtime, fileEntry, dirEntries = entry
+        if (fileEntry != None):
+            documents.append(os.path.join(path, fileEntry))
+            return
+        
+        for dirEntry in dirEntries:
+            self.__GetDocumentsRecurse(self.__Join(relativeDir, dirEntry),
+                                       documents, visitedDirs)
+    
+    def __ListDir(self, path):
+        """__ListDir(path) -> (str, list_of_str)
+        
+        returns:
+            pair with the name of the document of the directory, or None if
+            there is none, and the sorted names of its sub-directories. This
+            matches FDataSetParser.GetValidFileAndDirs.
+        
+        """
+        basePath = os.path.basename(path)
+        fileEntry = None
+        dirEntries = []
+        for entry in os.listdir(path):
+            fullPath = os.path.join(path, entry)
+            if (os.path.isdir(fullPath) and (entry[0] != ".")):
+                dirEntries.append(entry)
+            elif ((fileEntry == None) and os.path.isfile(fullPath) and
+                    (FUtils.GetProperFilename(entry) == basePath)):
+                fileEntry = entry
+        dirEntries.sort()
+        return (fileEntry, dirEntries)
+    
+    def __GetPath(self, relativeDir):
+        if (relativeDir == ""): return self.__dataSetDir
+        return os.path.join(self.__dataSetDir,
+                            relativeDir.replace("/", os.sep))
+    
+    def __Join(self, relativeDir, entry):
+        if (relativeDir == ""): return entry
+        return relativeDir + "/" + entry
+    
+    def Contains(self, filename):
+        """Contains(filename) -> bool
+        
+        returns:
+            bool corresponding to whether filename is in the data set
+            directory.
+        
+        """
+        return (self.__GetKey(filename) != None)
+    
+    def __GetKey(self, filename):
+        filename = os.path.normcase(os.path.abspath(filename))
+        if (filename.find(self.__rootDir + os.sep) != 0): return None
+        return filename[len(self.__rootDir) + 1:].replace(os.sep, "/")
+    
+    def GetChecksum(self, filename):
+        """GetChecksum(filename) -> str
+        
+        Gets the checksum of a file of the data set directory, calculating
+        it only if the file changed since it was last calculated.
+        
+        arguments:
+            filename
+                string corresponding to the file of the data set directory.
+        
+        returns:
+            str corresponding to the checksum of the file, as given by
+            FUtils.CalculateChecksum.
+        
+        """
+        key = self.__GetKey(filename)
+        try:
+            stat = os.stat(filename)
+        except OSError, e:
+            # a missing file gets the checksum FUtils gives it, uncached
+            return FUtils.CalculateChecksum(filename)
+        
+        self.__lock.acquire()
+        try:
+            entry = self.__checksums.get(key, None)
+            if ((entry != None) and (entry[0] == stat.st_size) and
+                    (entry[1] == stat.st_mtime)):
+                return entry[2]
+        finally:
+            self.__lock.release()
+        
+        checksum = FUtils.CalculateChecksum(filename)
+        
+        self.__lock.acquire()
+        try:
+            self.__checksums[key] = (stat.st_size, stat.st_mtime, checksum)
+            self.__isDirty = True
+        finally:
+            self.__lock.release()
+        
+        return checksum
+    
+    def GetAssetInformations(self, filenames):
+        """GetAssetInformations(filenames) -> dict
+        
+        Gets the <asset> information of COLLADA documents of the data set
+        directory, reading only the documents which changed since they were
+        last read.
+        
+        arguments:
+            filenames
+                list of strings corresponding to COLLADA documents of the
+                data set directory.
+        
+        returns:
+            dict mapping each filename to its (title, subject, keyword), as
+            given by FCOLLADAParser.GetCOLLADAAssetInformation.
+        
+        """
+        informations = {}
+        stats = {}
+        changedFilenames = []
+        
+        self.__lock.acquire()
+        try:
+            for filename in filenames:
+                try:
+                    stat = os.stat(filename)
+                except OSError, e:
+                    informations[filename] = ("", "", "")
+                    continue
+                
+                entry = self.__assets.get(self.__GetKey(filename), None)
+                if ((entry != None) and (entry[0] == stat.st_size) and
+                        (entry[1] == stat.st_mtime)):
+                    informations[filename] = entry[2]
+                else:
+                    stats[filename] = stat
+                    changedFilenames.append(filename)
+        finally:
+            self.__lock.release()
+        
+        if (len(changedFilenames) == 0): return informations
+        
+        changedInformations = FCOLLADAParser.GetCOLLADAAssetInformations(
+                changedFilenames)
+        
+        self.__lock.acquire()
+        try:
+            for filename in changedFilenames:
+                stat = stats[filename]
+                self.__assets[self.__GetKey(filename)] = (stat.st_size, 
+                        stat.st_mtime, changedInformations[filename])
+                informations[filename] = changedInformations[filename]
+            self.__isDirty = True
+        finally:
+            self.__lock.release()
+        
+        return informations
+
+_catalogs = {}
+_catalogsLock = threading.Lock()
+
+def GetDataSetCatalog(dataSetDir):
+    """GetDataSetCatalog(dataSetDir) -> FDataSetCatalog
+    
+    Gets the catalog of a data set directory, shared by the whole process.
+    
+    arguments:
+        dataSetDir
+            string corresponding to the data set directory, as in
+            DATA_SET_DIRS.
+    
+    returns:
+        FDataSetCatalog of the data set directory.
+    
+    """
+    _catalogsLock.acquire()
+    try:
+        if (not _catalogs.has_key(dataSetDir)):
+            _catalogs[dataSetDir] = FDataSetCatalog(dataSetDir)
+        return _catalogs[dataSetDir]
+    finally:
+        _catalogsLock.release()
+
+def CalculateDocumentChecksum(filename):
+    """CalculateDocumentChecksum(filename) -> str
+    
+    Calculates the checksum of a file, reusing the one remembered by the
+    catalog of its data set directory if it did not change.
+    
+    arguments:
+        filename
+            string corresponding to the file to calculate the checksum of.
+    
+    returns:
+        str corresponding to the checksum of the file.
+    
+    """
+    for dataSetDir in DATA_SET_DIRS:
+        catalog = GetDataSetCatalog(dataSetDir)
+        if (catalog.Contains(filename)):
+            return catalog.GetChecksum(filename)
+    return FUtils.CalculateChecksum(filename)
+
+def GetDocumentAssetInformations(filenames):
+    """GetDocumentAssetInformations(filenames) -> dict
+    
+    Gets the <asset> information of COLLADA documents, reusing the one
+    remembered by the catalogs of their data set directories for the
+    documents which did not change. The catalogs that changed are saved.
+    
+    arguments:
+        filenames
+            list of strings corresponding to COLLADA documents.
+    
+    returns:
+        dict mapping each filename to its (title, subject, keyword), as
+        given by FCOLLADAParser.GetCOLLADAAssetInformation.
+    
+    """
+    informations = {}
+    remainingFilenames = filenames
+    for dataSetDir in DATA_SET_DIRS:
+        catalog = GetDataSetCatalog(dataSetDir)
+        catalogFilenames = []
+        otherFilenames = []
+        for filename in remainingFilenames:
+            if (catalog.Contains(filename)):
+                catalogFilenames.append(filename)
+            else:
+                otherFilenames.append(filename)
+        remainingFilenames = otherFilenames
+        
+        if (len(catalogFilenames) == 0): continue
+        informations.update(catalog.GetAssetInformations(catalogFilenames))
+        catalog.Save()
+    
+    if (len(remainingFilenames) > 0):
+        informations.update(FCOLLADAParser.GetCOLLADAAssetInformations(
+                remainingFilenames))
+    return informations
+
+def GetDocumentAssetInformation(filename):
+    """GetDocumentAssetInformation(filename) -> (str, str, str)
+    
+    Gets the <asset> information of a COLLADA document, reusing the one
+    remembered by the catalog of its data set directory if it did not
+    change.
+    
+    arguments:
+        filename
+            string corresponding to a COLLADA document.
+    
+    returns:
+        (title, subject, keyword) of the document, as given by
+        FCOLLADAParser.GetCOLLADAAssetInformation.
+    
+    """
+    for dataSetDir in DATA_SET_DIRS:
+        catalog = GetDataSetCatalog(dataSetDir)
+        if (catalog.Contains(filename)):
+            return catalog.GetAssetInformations([filename,])[filename]
+    return FCOLLADAParser.GetCOLLADAAssetInformation(filename)
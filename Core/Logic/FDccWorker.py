@@ -0,0 +1,310 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import atexit
+import subprocess
+import sys
+import threading
+import Queue
+
+from Core.Common.FConstants import *
+from Core.Common.FWatchdog import *
+
+class FDccWorker:
+    
+    """A long-lived DCC process that runs the operations of many tests.
+    
+    The process is started once and kept running between tests, instead of
+    starting the DCC once for each operation. It talks with the framework
+    through its standard input and output, one line per message:
+        
+        - once it is ready to take jobs, the process writes "@CTS READY".
+        - the framework writes one line per job, with the fields separated by
+          tabs: the operation, the input file, the output directory, then one
+          "output=<file>" field for each file the job must write and one
+          "<command>=<value>" field for each setting. Tabs, newlines and
+          backslashes in the fields are escaped as \\t, \\n and \\\\.
+        - the process answers "@CTS OK" once the job is done, or
+          "@CTS ERROR <message>" if it failed.
+        - the framework writes an empty line, or closes the standard input,
+          to stop the process.
+    
+    Every other line written by the process is copied to the log of the
+    current job. If detectCrash is "True" in the configuration file, the
+    process is considered crashed and killed when it writes nothing for
+    ioTimeoutMilli milliseconds. It is also considered crashed when it exits
+    before answering.
+    
+    """
+    
+    def __init__(self, command, timeout = None):
+        """__init__(command, timeout = None) -> FDccWorker
+        
+        arguments:
+            command
+                list of str corresponding to the command line of the worker.
+            timeout
+                float corresponding to the number of seconds the worker can
+                stay silent before being considered crashed, or None to wait
+                forever.
+        
+        """
+        self.__command = command
+        self.__timeout = timeout
+        self.__process = None
+        self.__lines = None
+    
+    def Start(self, log = None):
+        """Start(log = None) -> bool
+        
+        Starts the process, if it is not running, and waits until it is
+        ready to take jobs.
+        
+        arguments:
+            log
+                file object to copy the output of the process to, or None to
+                dump it to stdout.
+        
+        returns:
+            bool corresponding to whether the process is ready.
+        
+        """
+        if (self.IsRunning()): return True
+        
+        try:
+            self.__process = StartProcess(self.__command,
+                    stdin = subprocess.PIPE, stdout = subprocess.PIPE,
+                    stderr = subprocess.STDOUT, universal_newlines = True)
+        except OSError, e:
+            self.__Write(log, "Cannot start the DCC worker: " + str(e) + "\n")
+            self.__process = None
+            return False
+        
+        self.__lines = Queue.Queue()
+        thread = threading.Thread(target = self.__ReadLines,
+                args = (self.__process.stdout, self.__lines))
+        thread.setDaemon(True)
+        thread.start()
+        _AddWorker(self)
+        
+        return (self.__WaitForReply(log, DCC_PROCESS_READY) == True)
+    
+    def IsRunning(self):
+        """IsRunning() -> bool
+        
+        returns:
+            bool corresponding to whether the process is running.
+        
+        """
+        return ((self.__process != None) and (self.__process.poll() == None))
+    
+    def Run(self, operation, inputFilename, outputDir, outputs, settings,
+            log = None):
+        """Run(operation, inputFilename, outputDir, outputs, settings, log = None) -> bool
+        
+        Sends a job to the process, starting it if needed, and waits for it
+        to be done. The process is killed if it crashes.
+        
+        arguments:
+            operation
+                string corresponding to the operation. It is one of the
+                operations from Core.Common.FConstants.
+            inputFilename
+                string corresponding to the file the operation works on.
+            outputDir
+                string corresponding to the directory to write the outputs in.
+            outputs
+                list of str corresponding to the files the job must write.
+            settings
+                list of FSettingEntry for the operation.
+            log
+                file object to copy the output of the process to, or None to
+                dump it to stdout.
+        
+        returns:
+            bool corresponding to whether the process survived the job. It is
+            True even if the job failed, as long as the process answered.
+        
+        """
+        if (not self.Start(log)):
+            self.Kill()
+            return False
+        
+        fields = [operation, inputFilename, outputDir]
+        for output in outputs:
+            fields.append("output=" + output)
+        for setting in settings:
+            fields.append(setting.GetCommand() + "=" + setting.GetValue())
+        
+        line = "\t".join(map(EscapeField, fields)) + "\n"
+        try:
+            self.__process.stdin.write(line)
+            self.__process.stdin.flush()
+        except (IOError, OSError), e:
+            self.__Write(log, "Cannot send the job to the DCC worker: " +
+                    str(e) + "\n")
+            self.Kill()
+            return False
+        
+        reply = self.__WaitForReply(log, DCC_PROCESS_OK)
+        if (reply == None):
+            self.Kill()
+            return False
+        if (reply != True):
+            self.__Write(log, "The DCC worker failed: " + reply + "\n")
+        return True
+    
+    def __WaitForReply(self, log, expected):
+        """__WaitForReply(log, expected) -> object
+        
+        returns:
+            True if the process answered expected, str with the message if it
+            answered an error, or None if it crashed or timed out.
+        
+        """
+        marker = DCC_PROCESS_MARKER + " "
+        while (True):
+            try:
+                if (self.__timeout == None):
+                    line = self.__lines.get()
+                else:
+                    line = self.__lines.get(True, self.__timeout)
+            except Queue.Empty:
+                self.__Write(log, "The DCC worker timed out.\n")
+                return None
+            
+            if (line == None):
+                self.__Write(log, "The DCC worker exited unexpectedly.\n")
+                return None
+            
+            if (line.startswith(marker)):
+                reply = line[len(marker):].rstrip("\r\n")
+                if (reply == expected):
+                    return True
+                if (reply.startswith(DCC_PROCESS_ERROR)):
+                    return reply[len(DCC_PROCESS_ERROR):].strip()
+            self.__Write(log, line)
+    
+    def __ReadLines(self, stdout, lines):
+        while (True):
+            line = stdout.readline()
+            if (line == ""): break
+            lines.put(line)
+        lines.put(None)
+    
+    def __Write(self, log, text):
+        if (log == None):
+            sys.stdout.write(text)
+        else:
+            log.write(text)
+    
+    def Stop(self):
+        """Stop() -> None
+        
+        Asks the process to quit and kills it if it does not.
+        
+        """
+        if (self.IsRunning()):
+            try:
+                self.__process.stdin.write("\n")
+                self.__process.stdin.close()
+            except (IOError, OSError), e:
+                pass
+            
+            finished = WatchProcess(self.__process)
+            finished.wait(DCC_PROCESS_STOP_TIMEOUT)
+            if (not finished.isSet()):
+                KillProcess(self.__process)
+                finished.wait()
+        self.Kill()
+    
+    def Kill(self):
+        """Kill() -> None
+        
+        Kills the process if it is running.
+        
+        """
+        if (self.__process == None): return
+        
+        if (self.__process.poll() == None):
+            KillProcess(self.__process)
+            self.__process.wait()
+        
+        self.__process = None
+        self.__lines = None
+        _RemoveWorker(self)
+
+def EscapeField(field):
+    """EscapeField(field) -> str
+    
+    Escapes a field of a DCC worker job.
+    
+    arguments:
+        field
+            string corresponding to the field to escape.
+    
+    returns:
+        str corresponding to the field without tab nor newline.
+    
+    """
+    return field.replace("\\", "\\\\").replace("\t", "\\t").replace("\n",
+            "\\n")
+
+def UnescapeField(field):
+    """UnescapeField(field) -> str
+    
+    Reverts EscapeField.
+    
+    arguments:
+        field
+            string corresponding to a field of a DCC worker job.
+    
+    returns:
+        str corresponding to the field as given to EscapeField.
+    
+    """
+    result = ""
+    i = 0
+    while (i < len(field)):
+        if ((field[i] == "\\") and (i + 1 < len(field))):
+            i = i + 1
+            if (field[i] == "t"):
+                result = result + "\t"
+            elif (field[i] == "n"):
+                result = result + "\n"
+            else:
+                result = result + field[i]
+        else:
+            result = result + field[i]
+        i = i + 1
+    return result
+
+# the workers still running when the framework quits
+_workers = []
+_workersLock = threading.Lock()
+
+def _AddWorker(worker):
+    _workersLock.acquire()
+    try:
+        if (_workers.count(worker) == 0):
+            _workers.append(worker)
+    finally:
+        _workersLock.release()
+
+def _RemoveWorker(worker):
+    _workersLock.acquire()
+    try:
+        if (_workers.count(worker) != 0):
+            _workers.remove(worker)
+    finally:
+        _workersLock.release()
+
+def _StopWorkers():
+    for worker in _workers[:]:
+        worker.Stop()
+
+atexit.register(_StopWorkers)
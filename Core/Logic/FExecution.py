@@ -11,6 +11,7 @@ import os
 import os.path
 import shutil
 import sys
+import threading
 import traceback
 import time
 import types
@@ -20,11 +21,17 @@ import Core.Common.FGlobals as FGlobals
 from Core.Common.FConstants import *
 from Core.Common.FSerializable import *
 from Core.Common.FSerializer import *
+from Core.Common.FWatchdog import *
+from Core.Logic.FDataSetCatalog import *
+from Core.Logic.FExecutionSummary import *
 from Core.Logic.FJudgement import *
 from Core.Logic.FJudgementContext import *
 from Core.Logic.FResult import *
+from Core.Logic.FSchemaValidator import *
 
 class FExecution(FSerializable, FSerializer):
+    __glutLock = threading.Lock()
+    
     def __init__(self, executionDir = None):
         """Creates the FExecution."""
         FSerializable.__init__(self)
@@ -48,6 +55,8 @@ class FExecution(FSerializable, FSerializer):
         self.__judgingResults = {}
         self.__judgingLogs = {}
         self.__checksum = ""
+        self.__stepKeys = {}
+        self.__stepTimes = []
 
     # executionDir must be absolute path and it should be empty!
     def Clone(self, executionDir):
@@ -63,6 +72,8 @@ class FExecution(FSerializable, FSerializer):
         newExecution.__judgingResults = self.__judgingResults
         newExecution.__judgingLogs = self.__judgingLogs
         newExecution.__checksum = self.__checksum
+        newExecution.__stepKeys = self.__stepKeys
+        newExecution.__stepTimes = self.__stepTimes
         newExecution.__ResetOutputLocations()
         newExecution.__ResetLogLocations()
         
@@ -87,6 +98,7 @@ class FExecution(FSerializable, FSerializer):
         
         # Do not compare judging logs.
         # Do not compare time ran.
+        # Do not compare step times.
         
         if (len(self.__errorCounts) != len(other.__errorCounts)): return False
         for i in range(len(self.__errorCounts)):
@@ -164,6 +176,8 @@ class FExecution(FSerializable, FSerializer):
         if not self.__dict__.has_key("_FExecution__judgingResults"): self.__judgingResults = {}
         if not self.__dict__.has_key("_FExecution__judgingLogs"): self.__judgingLogs = {}
         if not self.__dict__.has_key("_FExecution__checksum"): self.__checksum = ""
+        if not self.__dict__.has_key("_FExecution__stepKeys"): self.__stepKeys = {}
+        if not self.__dict__.has_key("_FExecution__stepTimes"): self.__stepTimes = []
         
         if (self.__executionDir == os.path.dirname(filename)): return
         
@@ -197,6 +211,59 @@ class FExecution(FSerializable, FSerializer):
         
         return self.__outputLocations[opNumber]
     
+    def GetStepKey(self, step):
+        """GetStepKey(step) -> str
+        
+        returns:
+            string corresponding to the key of everything the outputs of the
+            step depend on, or None if the step did not record one.
+        
+        """
+        return self.__stepKeys.get(step, None)
+    
+    def SetStepKey(self, step, key):
+        self.__stepKeys[step] = key
+    
+    def HasCrashed(self, step):
+        return ((self.__crashIndices != None) and 
+                (self.__crashIndices.count(step) > 0))
+    
+    def Reuse(self, step, execution):
+        """Reuse(step, execution) -> None
+        
+        Uses the outputs and log of a step of another execution instead of 
+        running the step. They are copied in this execution.
+        
+        arguments:
+            step
+                int corresponding to the step to reuse.
+            execution
+                FExecution that ran the step with the same key.
+        
+        """
+        if (len(self.__checksum) == 0):
+            self.__checksum = execution.__checksum
+        
+        stepName = STEP_PREFIX + str(step)
+        outDir = os.path.abspath(os.path.join(self.__executionDir, stepName))
+        shutil.copytree(os.path.join(execution.__executionDir, stepName), 
+                        outDir)
+        
+        self.__timeRan = time.localtime()
+        self.__environment.update(execution.__environment)
+        self.__AddOutputLocation(step, execution.__outputFilenames[step], 
+                                 execution.__logFilenames[step])
+        
+        # the step did not run, so it has no time: Compile gives it None
+        logLocation = self.__logLocations[-1]
+        if (logLocation != None):
+            timesFilename = GetTimesFilename(logLocation)
+            if (os.path.isfile(timesFilename)):
+                os.remove(timesFilename)
+        
+        self.__initializedSteps.append(step)
+        self.__stepKeys[step] = execution.__stepKeys[step]
+    
     def IsOutputGood(self, opNumber):
         for outputLocation in self.__outputLocations[opNumber]:
             if (not os.path.isfile(outputLocation)):
@@ -211,6 +278,17 @@ class FExecution(FSerializable, FSerializer):
     def GetResult(self):
         return self.__result
     
+    def GetSummary(self):
+        """GetSummary() -> FExecutionSummary
+        
+        returns:
+            FExecutionSummary of this execution as it is now.
+        
+        """
+        return FExecutionSummary(self.__executionDir, self.__result, 
+                self.__judgingResults, self.__errorCounts, 
+                self.__warningCounts, self.__timeRan, self.__diffFromPrevious)
+    
     def SetResult(self, result):
         self.__result = result
         for indices in self.__crashIndices:
@@ -250,7 +328,19 @@ class FExecution(FSerializable, FSerializer):
         self.Save(self, executionDir)
     
     def GetEnvironment(self):
-        return self.__environment
+        if (len(self.__stepTimes) == 0): return self.__environment
+        
+        # the step times change every run; they are kept out of 
+        # __environment so that they do not make executions different
+        environment = self.__environment.copy()
+        for step in range(len(self.__stepTimes)):
+            if (self.__stepTimes[step] == None): continue
+            wallTime, cpuTime = self.__stepTimes[step]
+            stepName = "Step " + str(step)
+            environment[stepName + " wall time: "] = "%.2f s" % wallTime
+            if (cpuTime != None):
+                environment[stepName + " CPU time: "] = "%.2f s" % cpuTime
+        return environment
         
     def GetJudgementResult(self, badge):
         if (self.__judgingResults.has_key(badge)):
@@ -288,16 +378,21 @@ class FExecution(FSerializable, FSerializer):
         
         self.__timeRan = time.localtime()
         
-        # need to do this before glGetString will return something
-        if (OpenGL.GLUT.glutGet(OpenGL.GLUT.GLUT_ELAPSED_TIME) == 0):
-            OpenGL.GLUT.glutInit(sys.argv)
-        
-        winId = OpenGL.GLUT.glutCreateWindow("")
-        self.__environment["GL_VENDOR: "] = OpenGL.GL.glGetString(
+        # GLUT is not thread-safe and tests may be run by concurrent workers.
+        FExecution.__glutLock.acquire()
+        try:
+            # need to do this before glGetString will return something
+            if (OpenGL.GLUT.glutGet(OpenGL.GLUT.GLUT_ELAPSED_TIME) == 0):
+                OpenGL.GLUT.glutInit(sys.argv)
+            
+            winId = OpenGL.GLUT.glutCreateWindow("")
+            self.__environment["GL_VENDOR: "] = OpenGL.GL.glGetString(
                                                         OpenGL.GL.GL_VENDOR)
-        self.__environment["GL_RENDERER: "] = OpenGL.GL.glGetString(
+            self.__environment["GL_RENDERER: "] = OpenGL.GL.glGetString(
                                                         OpenGL.GL.GL_RENDERER)
-        OpenGL.GLUT.glutDestroyWindow(winId)
+            OpenGL.GLUT.glutDestroyWindow(winId)
+        finally:
+            FExecution.__glutLock.release()
         
         if ((inStep == 0) or (self.__outputLocations[inStep] == None)):
             curInputFile = os.path.abspath(filename)
@@ -317,7 +412,7 @@ class FExecution(FSerializable, FSerializer):
     def Run(self, appPython, step, op, inStep, filename, settings, isAnimated, cameraRig, lightingRig, markerCallBack):
         # First run: calculate the check-sum.
         if (len(self.__checksum) == 0):
-            self.__checksum = FUtils.CalculateChecksum(filename)
+            self.__checksum = CalculateDocumentChecksum(filename)
         
         # Run the test steps.
         if (self.__initializedSteps.count(step) == 0):
@@ -371,11 +466,10 @@ class FExecution(FSerializable, FSerializer):
                 print "<FExecution> could not make the step directory"
                 print e
             
+            counts = None
             if ((documentFilename != None) and 
                     (FUtils.GetExtension(documentFilename).lower() == "dae")):
-                os.system("SchemaValidate.exe \"" + documentFilename + "\" \"" + 
-                        SCHEMA_LOCATION + "\" \"" + SCHEMA_NAMESPACE + 
-                        "\" \"" + logAbsFilename + "\"")
+                counts = ValidateDocument(documentFilename, logAbsFilename)
             else:
                 logFile = open(logAbsFilename, "w")
                 logFile.write("Error: Not a Collada file.\n")
@@ -383,7 +477,10 @@ class FExecution(FSerializable, FSerializer):
             self.__outputFilenames[step] = logFilename
             self.__outputLocations[step] = logAbsFilename
             
-            errors, warnings = self.__ParseValidation(logAbsFilename)
+            # the in-process validator counts them while writing the log
+            if (counts == None):
+                counts = self.__ParseValidation(logAbsFilename)
+            errors, warnings = counts
             self.__errorCounts[step] = errors
             self.__warningCounts[step] = warnings
 
@@ -394,10 +491,17 @@ class FExecution(FSerializable, FSerializer):
             errors, warnings = self.__ParseLog(logLocation)
             self.__errorCounts.append(errors)
             self.__warningCounts.append(warnings)
+            
+            # written by FWatchdog.RunWatched next to the log
+            if (logLocation == None):
+                self.__stepTimes.append(None)
+            else:
+                self.__stepTimes.append(ReadCommandTimes(logLocation))
     
     def Judge(self, filename, testProcedure, testId):
         # Look for a judging script
         scriptFilename = FUtils.ChangeExtension(filename, "py")
+        context = None
         try:
             # Set-up the judging script context.
             context = FJudgementContext(testProcedure, testId)
@@ -460,6 +564,9 @@ class FExecution(FSerializable, FSerializer):
             print 'Trace back stack is:\n'
             traceback.print_exc()
         
+        # The parsed documents are only shared within a judging.
+        if (context != None): context.ReleaseDocuments()
+        
 
     def __ParseValidation(self, logLocation):
         if (logLocation == None): return (0, 0)
@@ -0,0 +1,110 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import os.path
+import threading
+
+from Core.Common.FConstants import *
+
+class FExecutionCache:
+    
+    """Keeps track of the tests of a test procedure that have their
+    executions loaded.
+    
+    A FTest loads its executions the first time they are needed. Once more
+    than size tests have them loaded, the executions of the least recently
+    used tests are unloaded; they are loaded again if needed.
+    
+    """
+    
+    def __init__(self, size = EXECUTION_CACHE_SIZE):
+        """__init__(size = EXECUTION_CACHE_SIZE) -> FExecutionCache
+        
+        arguments:
+            size
+                int corresponding to the number of tests that can have their
+                executions loaded at once.
+        
+        """
+        self.__size = size
+        self.__tests = []
+        self.__lock = threading.Lock()
+    
+    def Touch(self, test):
+        """Touch(test) -> None
+        
+        Marks a test as the most recently used one and unloads the
+        executions of the least recently used ones if there are too many.
+        
+        arguments:
+            test
+                FTest that just used its executions.
+        
+        """
+        self.__lock.acquire()
+        try:
+            if ((len(self.__tests) > 0) and (self.__tests[-1] is test)):
+                return
+            
+            if (test in self.__tests):
+                self.__tests.remove(test)
+            self.__tests.append(test)
+            
+            i = 0
+            while ((len(self.__tests) > self.__size) and
+                    (i < len(self.__tests) - 1)):
+                # tests being ran cannot be unloaded
+                if (self.__tests[i].UnloadExecutions()):
+                    self.__tests.pop(i)
+                else:
+                    i = i + 1
+        finally:
+            self.__lock.release()
+    
+    def Remove(self, test):
+        """Remove(test) -> None
+        
+        Forgets about a test that does not have its executions loaded
+        anymore.
+        
+        arguments:
+            test
+                FTest to forget about.
+        
+        """
+        self.__lock.acquire()
+        try:
+            if (test in self.__tests):
+                self.__tests.remove(test)
+        finally:
+            self.__lock.release()
+
+_caches = {}
+_cachesLock = threading.Lock()
+
+def GetExecutionCache(procedureDir):
+    """GetExecutionCache(procedureDir) -> FExecutionCache
+    
+    Gets the execution cache shared by the tests of a test procedure.
+    
+    arguments:
+        procedureDir
+            string corresponding to the path of the test procedure directory.
+    
+    returns:
+        FExecutionCache of the test procedure.
+    
+    """
+    procedureDir = os.path.normcase(os.path.abspath(procedureDir))
+    
+    _cachesLock.acquire()
+    try:
+        if (not _caches.has_key(procedureDir)):
+            _caches[procedureDir] = FExecutionCache()
+        return _caches[procedureDir]
+    finally:
+        _cachesLock.release()
@@ -0,0 +1,93 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import os.path
+
+from Core.Logic.FJudgement import *
+
+class FExecutionSummary:
+    
+    """The values of an execution that the grid and the reports of a whole
+    test procedure need.
+    
+    A FTest keeps the summary of its current execution with itself, so they
+    are read without loading the execution. See FTest.GetCurrentSummary.
+    
+    """
+    
+    def __init__(self, executionDir, result, judgementResults, errorCounts,
+                 warningCounts, timeRan, diffFromPrevious):
+        """__init__(executionDir, result, judgementResults, errorCounts, warningCounts, timeRan, diffFromPrevious) -> FExecutionSummary
+        
+        arguments:
+            executionDir
+                string corresponding to the directory of the execution.
+            result
+                FResult of the execution, or None if it has none.
+            judgementResults
+                dict of the judgement result of each badge level judged.
+            errorCounts
+                list of the error count of each step.
+            warningCounts
+                list of the warning count of each step.
+            timeRan
+                time.struct_time corresponding to when the execution ran.
+            diffFromPrevious
+                string corresponding to whether the execution is different
+                from the previous one.
+        
+        """
+        self.__executionDir = os.path.normcase(os.path.abspath(executionDir))
+        if (result == None):
+            self.__result = None
+        else:
+            self.__result = result.GetResult()
+        self.__judgementResults = judgementResults.copy()
+        self.__errorCounts = errorCounts[:]
+        self.__warningCounts = warningCounts[:]
+        self.__timeRan = timeRan
+        self.__diffFromPrevious = diffFromPrevious
+    
+    def IsOf(self, executionDir):
+        """IsOf(executionDir) -> bool
+        
+        returns:
+            bool corresponding to whether this is the summary of the execution
+            in executionDir.
+        
+        """
+        return (self.__executionDir == 
+                os.path.normcase(os.path.abspath(executionDir)))
+    
+    def GetResult(self):
+        """GetResult() -> bool
+        
+        returns:
+            bool corresponding to whether the execution passed, or None if it
+            has no result.
+        
+        """
+        return self.__result
+    
+    def GetJudgementResult(self, badge):
+        if (self.__judgementResults.has_key(badge)):
+            return self.__judgementResults[badge]
+        else:
+            # as FExecution.GetJudgementResult
+            return FJudgement.MISSING_DATA
+    
+    def GetErrorCount(self, opNumber):
+        return self.__errorCounts[opNumber]
+    
+    def GetWarningCount(self, opNumber):
+        return self.__warningCounts[opNumber]
+    
+    def GetTimeRan(self):
+        return self.__timeRan
+    
+    def GetDiffFromPrevious(self):
+        return self.__diffFromPrevious
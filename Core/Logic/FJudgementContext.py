@@ -7,6 +7,7 @@
 
 import Core.Common.FGlobals as FGlobals
 
+from Core.Common.DOMParser import ParseDocument, UnlinkDocuments
 from Core.Logic.FResult import *
 
 class FJudgementContext:
@@ -28,6 +29,7 @@ class FJudgementContext:
         
         # Create the tokens for some run-time caches
         self.__renderSteps = None
+        self.__documents = {}
         
     def GetCurrentTestId(self):
         """ Retrieves the identifier of the test case that is currently
@@ -115,8 +117,9 @@ class FJudgementContext:
             @param filename1 The filename of the first image.
             @param filename2 The filename of the second image.
             @return An integer indicating how close the two images are. """
-        compareResult = FGlobals.imageComparator.CompareImages(filename1, filename2)
-        return compareResult.GetExtra()
+        index, allCompareResults = FGlobals.imageComparator.CompareImageSets(
+                [filename1], [[filename2]])
+        return allCompareResults[0][0].GetExtra()
         
     def GetStepResults(self, filterType=None, testId=None):
         """ This function retrieves the standard steps results.
@@ -206,6 +209,41 @@ class FJudgementContext:
                     out.append(location[0])
         return out
         
+    def GetInputDocument(self, testId=None):
+        """ Retrieves the parsed input COLLADA document for a test case.
+            The document is parsed only once per judging: do not modify it
+            or unlink it.
+            @param testId Optional parameter used to identify which
+                test input document to retrieve. If this parameter is not
+                provided, the input document for the current test case
+                is returned.
+            @return The <COLLADA> element of the input document, or None
+                if it cannot be parsed. """
+        return self.__GetDocument(self.GetAbsInputFilename(testId))
+        
+    def GetOutputDocument(self, index=0, testId=None):
+        """ Retrieves a parsed exported COLLADA document for a test case.
+            The document is parsed only once per judging: do not modify it
+            or unlink it.
+            @param index The index of the export step, in the order of the
+                export steps. The first export step is used by default.
+            @param testId Optional parameter used to identify which
+                test output document to retrieve. If this parameter is not
+                provided, the output document for the current test case
+                is returned.
+            @return The <COLLADA> element of the exported document, or None
+                if there is no such export or it cannot be parsed. """
+        filenames = self.GetStepOutputFilenames("Export", testId)
+        if (index >= len(filenames)): return None
+        return self.__GetDocument(filenames[index])
+        
+    def GetDocuments(self):
+        """ Retrieves the dictionary of the documents parsed during this
+            judging. Pass it to DOMParserIO so that the judging checks
+            share the parsed documents instead of parsing them each time.
+            @return The dictionary of the parsed documents. """
+        return self.__documents
+        
     def HasStepCrashed(self, testId=None):
         """ This function retrieves whether any of the standard steps
             of the given test case resulted in a crash.
@@ -306,12 +344,30 @@ class FJudgementContext:
             This is useful to avoid re-creating the context between judgements. """
         self.__log = ""
         
+    def ReleaseDocuments(self):
+        """ This function is considered INTERNAL.
+            It is called by the execution once the judging is done to free
+            the documents parsed by the judging script. """
+        UnlinkDocuments(self.__documents)
+        
+    def __GetDocument(self, filename):
+        """ This function is considered PRIVATE.
+            Use this function to parse a document only once. """
+        try:
+            dom, rootLst = ParseDocument(filename, self.__documents)
+        except Exception, info:
+            print "<FJudgementContext> could not parse: '" + filename + "'."
+            return None
+        if (len(rootLst) == 0): return None
+        return rootLst[0]
+        
     def __GetTest(self, testId):
         """ This function is considered PRIVATE.
             Use this function to correctly support null test identifiers. """
         if (testId == None):
             return self.__currentTest
         else:
+            self.__testProcedure.WaitForCompiledTest(testId)
             return self.__testProcedure.GetTest(testId)
 
     def __GetExecution(self, testId):
@@ -320,6 +376,7 @@ class FJudgementContext:
         if (testId == None):
             return self.__currentExecution
         else:
+            self.__testProcedure.WaitForCompiledTest(testId)
             test = self.__testProcedure.GetTest(testId)
             if not test.HasCurrentExecution():
                 return None
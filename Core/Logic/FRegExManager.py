@@ -6,15 +6,25 @@
 # THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
 
 import copy
+import re
 import types
 import os
 import os.path
 
+import Core.Common.FUtils as FUtils
 from Core.Common.FConstants import *
 
 class FRegExManager:
+    # characters escaped by FUtils.NormalizeRegEx
+    __ESCAPED_CHARACTERS = "\\.^$[]()"
+    __SPECIAL_CHARACTERS = "\\.^$[]()*+?{}|"
+    
     def __init__(self):
-        #[[setting, [regEx1, regEx2,], [ignoredRegEx1, ignoredRegEx1,]], ]
+        #[[setting, [regEx1, regEx2,], [ignoredRegEx1, ignoredRegEx1,],
+        #  {path1 : True,}, {ignoredPath1 : True,}], ]
+        # The paths are literal paths relative to MAIN_FOLDER. They are kept 
+        # apart from the regular expressions so that matching them does not
+        # need to go through huge alternations.
         self.__regExs = []
     
     # this method is called to fix backward compatibility issues
@@ -41,9 +51,92 @@ class FRegExManager:
                     message = True
                     print "<FRegExManager> backward compatibility fix"
                 self.__regExs[i][2] = [self.__regExs[i][2]]
+            
+            # in older versions, literal paths are in the regular expressions
+            if (len(self.__regExs[i]) == 3):
+                if (not message):
+                    message = True
+                    print "<FRegExManager> backward compatibility fix"
+                self.__regExs[i].append({})
+                self.__regExs[i].append({})
+                self.__regExs[i][1] = self.__ExtractPaths(
+                        self.__regExs[i][1], self.__regExs[i][3])
+                self.__regExs[i][2] = self.__ExtractPaths(
+                        self.__regExs[i][2], self.__regExs[i][4])
         return message
     
+    def __ExtractPaths(self, regExList, paths):
+        """__ExtractPaths(regExList, paths) -> list_of_str
+        
+        Moves the pages which are only alternations of escaped literal paths 
+        to paths.
+        
+        returns:
+            list of str corresponding to the pages which are left.
+        
+        """
+        newRegExList = []
+        for regEx in regExList:
+            literals = self.__GetLiterals(regEx)
+            if (literals == None):
+                newRegExList.append(regEx)
+            else:
+                for literal in literals:
+                    paths[self.__GetPathKey(literal)] = True
+        
+        if (len(newRegExList) == 0): 
+            newRegExList.append("")
+        return newRegExList
+    
+    def __GetLiterals(self, regEx):
+        """__GetLiterals(regEx) -> list_of_str
+        
+        returns:
+            list of str corresponding to the unescaped alternatives of regEx, 
+            or None if regEx is empty or is not only made of literals.
+        
+        """
+        if (regEx == ""): return None
+        
+        literals = []
+        literal = ""
+        i = 0
+        while (i < len(regEx)):
+            character = regEx[i]
+            if (character == "\\"):
+                if ((i + 1 == len(regEx)) or 
+                        (FRegExManager.__ESCAPED_CHARACTERS.find(
+                                regEx[i + 1]) == -1)):
+                    return None
+                literal = literal + regEx[i + 1]
+                i = i + 2
+                continue
+            
+            if (character == "|"):
+                if (literal == ""): return None
+                literals.append(literal)
+                literal = ""
+            elif (FRegExManager.__SPECIAL_CHARACTERS.find(character) != -1):
+                return None
+            else:
+                literal = literal + character
+            i = i + 1
+        
+        if (literal == ""): return None
+        literals.append(literal)
+        return literals
+    
+    def __GetPathKey(self, path):
+        return os.path.normcase(os.path.normpath(path)).replace("\\", "/")
+    
     def BackwardCompatibilityPath(self):
+        rootDir = os.path.basename(ROOT_DIR)
+        for regEx in self.__regExs:
+            for i in range(3, 5):
+                paths = {}
+                for path in regEx[i].keys():
+                    paths[self.__GetPathKey(os.path.join(rootDir, path))] = True
+                regEx[i] = paths
         for regEx in self.__regExs:
             for i in range(len(regEx[1])):
                 if (regEx[1][i] != ""):
@@ -56,9 +149,10 @@ class FRegExManager:
                             os.sep.replace("\\", "\\\\") + ")(" + regEx[2][i] + 
                             ")")
     
-    def AddRegEx(self, settings, regEx, ignoredRegEx):
+    def AddRegEx(self, settings, regEx, ignoredRegEx, paths = []):
         self.__regExs.append(
-                [copy.deepcopy(settings), regEx, ignoredRegEx])
+                [copy.deepcopy(settings), regEx, ignoredRegEx, {}, {}])
+        self.AddPaths(len(self.__regExs) - 1, paths)
     
     def DeleteRegEx(self, index):
         if (index < 0): raise IndexError, "list index out of range"
@@ -100,6 +194,122 @@ class FRegExManager:
         
         self.__regExs[index][2] = IgnoredRegEx
     
+    def GetPathList(self, index):
+        if (index < 0): raise IndexError, "list index out of range"
+        
+        paths = self.__regExs[index][3].keys()
+        paths.sort()
+        return paths
+    
+    def GetIgnoredPathList(self, index):
+        if (index < 0): raise IndexError, "list index out of range"
+        
+        paths = self.__regExs[index][4].keys()
+        paths.sort()
+        return paths
+    
+    def AddPaths(self, index, paths):
+        """AddPaths(index, paths) -> None
+        
+        Adds literal paths to the paths matched by a regular expression.
+        
+        arguments:
+            index
+                int corresponding to the id of the regular expression.
+            paths
+                list of str corresponding to data set directories or files 
+                relative to MAIN_FOLDER.
+        
+        """
+        if (index < 0): raise IndexError, "list index out of range"
+        
+        for path in paths:
+            self.__regExs[index][3][self.__GetPathKey(path)] = True
+    
+    def SetPaths(self, index, paths):
+        if (index < 0): raise IndexError, "list index out of range"
+        
+        self.__regExs[index][3] = {}
+        self.AddPaths(index, paths)
+    
+    def AddIgnoredPaths(self, index, paths):
+        """AddIgnoredPaths(index, paths) -> None
+        
+        Adds literal paths to the paths ignored by a regular expression.
+        
+        arguments:
+            index
+                int corresponding to the id of the regular expression.
+            paths
+                list of str corresponding to data set directories or files 
+                relative to MAIN_FOLDER.
+        
+        """
+        if (index < 0): raise IndexError, "list index out of range"
+        
+        for path in paths:
+            self.__regExs[index][4][self.__GetPathKey(path)] = True
+    
+    def GetMatchingFilenames(self, index, filenames):
+        """GetMatchingFilenames(index, filenames) -> list_of_str
+        
+        Gets the files matched by a regular expression and not ignored by 
+        it. A literal path matches a data set document if it is the path of
+        the document, with or without its extension, or of its directory.
+        
+        arguments:
+            index
+                int corresponding to the id of the regular expression.
+            filenames
+                list of str corresponding to the normalized paths of the data 
+                set documents, starting with MAIN_FOLDER.
+        
+        returns:
+            list of str corresponding to the matching filenames, in order.
+        
+        """
+        if (index < 0): raise IndexError, "list index out of range"
+        
+        settings, regExList, ignoredRegExList, paths, ignoredPaths = (
+                self.__regExs[index])
+        patterns = self.__CompilePatterns(regExList)
+        ignoredPatterns = self.__CompilePatterns(ignoredRegExList)
+        mainFolder = os.path.normpath(MAIN_FOLDER)
+        
+        matchingFilenames = []
+        for filename in filenames:
+            keys = []
+            if (filename.find(mainFolder + os.sep) == 0):
+                key = self.__GetPathKey(filename[len(mainFolder) + 1:])
+                keys = [key, os.path.splitext(key)[0], os.path.dirname(key)]
+            
+            if ((not self.__IsMatching(filename, keys, patterns, paths)) or
+                    self.__IsMatching(filename, keys, ignoredPatterns, 
+                                      ignoredPaths)):
+                continue
+            matchingFilenames.append(filename)
+        return matchingFilenames
+    
+    def __CompilePatterns(self, regExList):
+        dir = FUtils.NormalizeRegEx(os.path.normpath(MAIN_FOLDER))
+        
+        patterns = []
+        for regEx in regExList:
+            if (regEx == ""): continue # matches nothing
+            patterns.append(re.compile("(" + dir + ")(/|\\\\)(" + regEx + 
+                                       ")$"))
+        return patterns
+    
+    def __IsMatching(self, filename, keys, patterns, paths):
+        for key in keys:
+            if (paths.has_key(key)): return True
+        
+        for pattern in patterns:
+            match = pattern.match(filename)
+            if ((match != None) and (match.group() == filename)):
+                return True
+        return False
+    
     def GetRegExId(self, settings):
         """GetRegExId(settings) --> int
         
@@ -108,7 +318,7 @@ class FRegExManager:
         
         """
         for j in range(len(self.__regExs)):
-            savedSettings, regEx, ignoredRegEx = self.__regExs[j]
+            savedSettings = self.__regExs[j][0]
             if (len(savedSettings) != len(settings)): continue
             same = True
             for i in range(len(savedSettings)):
@@ -138,7 +348,13 @@ class FRegExManager:
         if (index < 0): raise IndexError, "list index out of range"
         
         message = ""
+        pathsCount = len(self.__regExs[index][3])
+        if (pathsCount > 0):
+            message = (message + "Selected data sets: " + str(pathsCount) + 
+                       "\n")
         pagesCount = len(self.__regExs[index][1]) 
+        if ((pagesCount == 1) and (self.GetRegEx(index, 0) == "")):
+            pagesCount = 0
         if (pagesCount > 0):
             message = message + "Page 0:\n" + self.GetRegEx(index, 0) + "\n"
         if (pagesCount > 1):
@@ -0,0 +1,146 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import threading
+
+from Core.Common.FConstants import *
+
+class FRunReport:
+    """Summary of what it took to run a set of tests.
+    
+    It is returned by FTestProcedure.RunTests. Workers running concurrently
+    share the same report, so all the methods are thread-safe. It is not
+    meant to be serialized.
+    
+    """
+    
+    def __init__(self):
+        """__init__() -> FRunReport"""
+        self.__lock = threading.Lock()
+        self.__launches = {}
+        self.__crashedTestIds = {}
+        self.__cacheHits = {}
+    
+    def AddLaunch(self, app):
+        """AddLaunch(app) -> None
+        
+        Records that the DCC was launched to run a batch of tests.
+        
+        arguments:
+            app
+                str representing the pretty name of the application.
+        
+        """
+        self.__lock.acquire()
+        try:
+            self.__launches[app] = self.__launches.get(app, 0) + 1
+        finally:
+            self.__lock.release()
+    
+    def AddCrash(self, app, testId):
+        """AddCrash(app, testId) -> None
+        
+        Records that a test was isolated as crashing the DCC.
+        
+        arguments:
+            app
+                str representing the pretty name of the application.
+            testId
+                int representing the test that crashed.
+        
+        """
+        self.__lock.acquire()
+        try:
+            self.__crashedTestIds.setdefault(app, []).append(testId)
+        finally:
+            self.__lock.release()
+    
+    def AddCacheHit(self, app):
+        """AddCacheHit(app) -> None
+        
+        Records that the outputs of a previous execution were reused instead 
+        of running the steps of an application for a test.
+        
+        arguments:
+            app
+                str representing the pretty name of the application.
+        
+        """
+        self.__lock.acquire()
+        try:
+            self.__cacheHits[app] = self.__cacheHits.get(app, 0) + 1
+        finally:
+            self.__lock.release()
+    
+    def GetLaunchCount(self, app = None):
+        """GetLaunchCount(app = None) -> int
+        
+        returns:
+            int representing how many times the given application was
+            launched, or all the applications if app is None.
+        
+        """
+        if (app != None): return self.__launches.get(app, 0)
+        
+        count = 0
+        for value in self.__launches.values():
+            count = count + value
+        return count
+    
+    def GetCacheHitCount(self, app = None):
+        """GetCacheHitCount(app = None) -> int
+        
+        returns:
+            int representing for how many tests the outputs of the given
+            application were reused, or of all the applications if app is 
+            None.
+        
+        """
+        if (app != None): return self.__cacheHits.get(app, 0)
+        
+        count = 0
+        for value in self.__cacheHits.values():
+            count = count + value
+        return count
+    
+    def GetCrashedTestIds(self, app = None):
+        """GetCrashedTestIds(app = None) -> list_of_int
+        
+        returns:
+            list of int representing the tests that crashed the given
+            application, or any application if app is None.
+        
+        """
+        if (app != None):
+            testIds = self.__crashedTestIds.get(app, [])[:]
+        else:
+            testIds = []
+            for value in self.__crashedTestIds.values():
+                testIds = testIds + value
+        testIds.sort()
+        return testIds
+    
+    def __str__(self):
+        string = ""
+        apps = self.__launches.keys()
+        for app in self.__cacheHits.keys():
+            if (not self.__launches.has_key(app)):
+                apps.append(app)
+        apps.sort()
+        for app in apps:
+            crashed = self.GetCrashedTestIds(app)
+            string = (string + app + ": " + str(self.GetLaunchCount(app)) +
+                      " DCC launches, " + str(self.GetCacheHitCount(app)) +
+                      " cached tests, " + str(len(crashed)) +
+                      " crashed tests")
+            if (len(crashed) > 0):
+                testNames = []
+                for testId in crashed:
+                    testNames.append(TEST_PREFIX + str(testId))
+                string = string + " (" + ", ".join(testNames) + ")"
+            string = string + "\n"
+        return string
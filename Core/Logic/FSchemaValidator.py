@@ -0,0 +1,183 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+import os.path
+import subprocess
+import threading
+
+import Core.Common.FGlobals as FGlobals
+from Core.Common.FConstants import *
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+class FSchemaValidator:
+    
+    """Validates documents against the COLLADA schema in-process.
+    
+    The schema is compiled once and reused for every document, instead of
+    launching SchemaValidate.exe, which loads the schema again for each
+    document. The log has the same format as the one of SchemaValidate.exe:
+    a PASSED or FAILED line followed by one line per problem, starting with
+    "Error" or "Warning". A compiled schema cannot validate two documents at
+    once, so one is compiled for each thread validating at the same time.
+    
+    lxml is needed to validate in-process.
+    
+    """
+    
+    def __init__(self, schemaFilename = SCHEMA_LOCATION):
+        """__init__(schemaFilename = SCHEMA_LOCATION) -> FSchemaValidator
+        
+        arguments:
+            schemaFilename
+                string corresponding to the XML schema file.
+        
+        """
+        self.__schemaFilename = schemaFilename
+        self.__schemaDocument = None
+        self.__schemas = [] # compiled schemas not in use
+        self.__lock = threading.Lock()
+    
+    def Validate(self, documentFilename, logFilename):
+        """Validate(documentFilename, logFilename) -> (int, int)
+        
+        Validates a document and writes the log.
+        
+        arguments:
+            documentFilename
+                string corresponding to the document to validate.
+            logFilename
+                string corresponding to the log file to write.
+        
+        returns:
+            pair with the number of errors and of warnings written in the log.
+        
+        """
+        schema = self.__AcquireSchema()
+        try:
+            entries = []
+            fatalError = None
+            try:
+                document = etree.parse(documentFilename)
+                schema.validate(document)
+                for error in schema.error_log:
+                    if (error.level_name == "WARNING"):
+                        severity = "Warning"
+                    else:
+                        severity = "Error"
+                    entries.append(severity + ": " + error.message +
+                                   " Line " + str(error.line) + ", position " +
+                                   str(error.column) + ".")
+            except (etree.XMLSyntaxError, IOError), e:
+                fatalError = e
+        finally:
+            self.__ReleaseSchema(schema)
+        
+        errors = 0
+        warnings = 0
+        for entry in entries:
+            if (entry[:5] == "Error"):
+                errors = errors + 1
+            else:
+                warnings = warnings + 1
+        
+        log = open(logFilename, "w")
+        if ((errors == 0) and (fatalError == None)):
+            log.write("PASSED: Document is valid\n")
+        else:
+            log.write("FAILED: Document is invalid\n")
+        for entry in entries:
+            log.write(entry + "\n")
+        if (fatalError != None):
+            log.write("Error: a FATAL error has occured while reading the " +
+                      "file.\n" + str(fatalError) + "\n")
+            errors = errors + 1
+        log.close()
+        
+        return (errors, warnings)
+    
+    def __AcquireSchema(self):
+        self.__lock.acquire()
+        try:
+            if (len(self.__schemas) > 0):
+                return self.__schemas.pop()
+            if (self.__schemaDocument == None):
+                self.__schemaDocument = etree.parse(self.__schemaFilename)
+            return etree.XMLSchema(self.__schemaDocument)
+        finally:
+            self.__lock.release()
+    
+    def __ReleaseSchema(self, schema):
+        self.__lock.acquire()
+        try:
+            self.__schemas.append(schema)
+        finally:
+            self.__lock.release()
+
+_validator = FSchemaValidator()
+
+def IsSchemaValidatorAvailable():
+    """IsSchemaValidatorAvailable() -> bool
+    
+    returns:
+        bool corresponding to whether documents can be validated in-process.
+    
+    """
+    return (etree != None)
+
+def GetSchemaValidator():
+    """GetSchemaValidator() -> FSchemaValidator
+    
+    Gets the in-process schema validator shared by the whole process, if
+    the schemaValidatePath of the configuration file selects it.
+    
+    returns:
+        FSchemaValidator of the process, or None if SchemaValidate.exe is to
+        be used: when another validator is configured or when lxml is
+        missing.
+    
+    """
+    if ((FGlobals.schemaValidatePath.lower() !=
+            SCHEMA_VALIDATE_INTERNAL.lower()) or (etree == None)):
+        return None
+    return _validator
+
+def ValidateDocument(documentFilename, logFilename):
+    """ValidateDocument(documentFilename, logFilename) -> (int, int)
+    
+    Validates a document against the COLLADA schema with the validator
+    selected by the schemaValidatePath of the configuration file, and writes
+    the log.
+    
+    arguments:
+        documentFilename
+            string corresponding to the document to validate.
+        logFilename
+            string corresponding to the log file to write.
+    
+    returns:
+        pair with the number of errors and of warnings, or None if they have
+        to be read from the log.
+    
+    """
+    validator = GetSchemaValidator()
+    if (validator != None):
+        try:
+            return validator.Validate(documentFilename, logFilename)
+        except etree.LxmlError, e:
+            print ("Warning: could not validate in-process, using " +
+                   SCHEMA_VALIDATE_EXECUTABLE + ": " + str(e))
+    
+    executable = FGlobals.schemaValidatePath
+    if (not os.path.isfile(executable)):
+        executable = SCHEMA_VALIDATE_EXECUTABLE
+    subprocess.call([executable, documentFilename, SCHEMA_LOCATION,
+                     SCHEMA_NAMESPACE, logFilename])
+    return None
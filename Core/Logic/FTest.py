@@ -17,7 +17,10 @@ import Core.Common.FCOLLADAParser as FCOLLADAParser
 from Core.Common.FConstants import *
 from Core.Common.FSerializable import *
 from Core.Common.FSerializer import *
+from Core.Logic.FBlessedIndex import *
+from Core.Logic.FDataSetCatalog import *
 from Core.Logic.FExecution import *
+from Core.Logic.FExecutionCache import *
 from Core.Logic.FResult import *
 
 class FTest(FSerializable, FSerializer):
@@ -88,6 +91,7 @@ class FTest(FSerializable, FSerializer):
         self.__previousExecution = None
         self.__currentExecution = None
         self.__currentExecutionDir = ""
+        self.__currentSummary = None # saved with the test
         self.__defaultComments = ""
         self.__settings = settings
         self.__dataSetPath = dataSetPath
@@ -99,6 +103,12 @@ class FTest(FSerializable, FSerializer):
         self.__beforePreviousExecution = None 
         self.__crashIndices = None
         self.__isRecovered = False
+        self.__isRunning = False
+        
+        # executions are found and loaded when first needed
+        self.__previousExecutionDir = None
+        self.__areExecutionsFound = True
+        self.__areExecutionsLoaded = True
 
     def SetTestDirectory(self, testDir):
         """Sets the directory for the test and creates all the necessary
@@ -119,40 +129,121 @@ class FTest(FSerializable, FSerializer):
     def InitializeFromLoad(self, filename):
         self.__testDir = os.path.dirname(filename)
         self.__isRecovered = False
-        self.__UpdateExecution()
+        self.__isRunning = False
+        self.__beforePreviousExecution = None
+        self.__crashIndices = None
+        self.__previousExecution = None
+        self.__currentExecution = None
+        self.__currentExecutionDir = ""
+        self.__previousExecutionDir = None
+        self.__areExecutionsFound = False
+        self.__areExecutionsLoaded = False
         
         # Backward compatibility: if they are missing, read in the keyword/comment from the DAE document.
         if (not self.__dict__.has_key("_FTest__colladaKeyword")
             or not self.__dict__.has_key("_FTest__colladaSubject")
             or not self.__dict__.has_key("_FTest__colladaId")):
             self.RefreshCOLLADA()
+        
+        # Backward compatibility: the summary is made when first needed.
+        if (not self.__dict__.has_key("_FTest__currentSummary")):
+            self.__currentSummary = None
     
     def __UpdateExecution(self):
         self.__previousExecution = None
         self.__currentExecution = None
         self.__currentExecutionDir = ""
+        self.__previousExecutionDir = None
+        self.__areExecutionsFound = False
+        self.__areExecutionsLoaded = False
+        
+        self.__LoadExecutions()
+    
+    def __FindExecutions(self):
+        """__FindExecutions() -> None
         
-        self.__currentExecutionDir, previousDir = (self.
+        Finds the directories of the current and previous executions without
+        loading them, deleting the current one if it was not saved.
+        
+        """
+        if (self.__areExecutionsFound): return
+        
+        self.__currentExecutionDir, self.__previousExecutionDir = (self.
                                                     __FindLatestExecutionDir())
         if (self.__currentExecutionDir == None):
             self.__currentExecutionDir = ""
+            self.__areExecutionsFound = True
             return
         
         executionPath = os.path.join(self.__currentExecutionDir, 
                                      EXECUTION_FILENAME)
-        if (os.path.isfile(executionPath)):
-            self.__currentExecution = self.Load(os.path.abspath(executionPath))
-        else:
+        if (not self.IsSaved(executionPath)):
             self.__isRecovered = True
+            self.DiscardSaved(self.__currentExecutionDir)
             shutil.rmtree(self.__currentExecutionDir)
-            self.__UpdateExecution()
+            self.__FindExecutions()
             return
         
-        if (previousDir != None):
-            executionPath = os.path.join(previousDir, EXECUTION_FILENAME)
-            self.__previousExecution = self.Load(os.path.abspath(executionPath))
+        self.__areExecutionsFound = True
+    
+    def __LoadExecutions(self):
+        """__LoadExecutions() -> None
+        
+        Loads the current and previous executions if they are not loaded 
+        already and marks this test as recently used in the execution cache of
+        its test procedure.
+        
+        """
+        if (self.__testDir == None): return
+        
+        if (not self.__areExecutionsLoaded):
+            self.__FindExecutions()
+            if (self.__currentExecutionDir != ""):
+                executionPath = os.path.join(self.__currentExecutionDir, 
+                                             EXECUTION_FILENAME)
+                self.__currentExecution = self.Load(
+                        os.path.abspath(executionPath))
+            if (self.__previousExecutionDir != None):
+                executionPath = os.path.join(self.__previousExecutionDir, 
+                                             EXECUTION_FILENAME)
+                self.__previousExecution = self.Load(
+                        os.path.abspath(executionPath))
+            self.__areExecutionsLoaded = True
+        
+        GetExecutionCache(os.path.dirname(self.__testDir)).Touch(self)
+    
+    def UnloadExecutions(self):
+        """UnloadExecutions() -> bool
+        
+        Releases the loaded executions. They are loaded again when needed.
+        
+        returns:
+            bool corresponding to whether the executions were released. They 
+            are kept while the test is running.
+        
+        """
+        if (self.__isRunning): return False
+        
+        self.__previousExecution = None
+        self.__currentExecution = None
+        self.__areExecutionsLoaded = False
+        return True
+    
+    def __Save(self):
+        # the executions are saved on their own; don't save them with the test
+        # or loading the test would load them too.
+        executions = (self.__currentExecution, self.__previousExecution, 
+                      self.__beforePreviousExecution)
+        self.__currentExecution = None
+        self.__previousExecution = None
+        self.__beforePreviousExecution = None
+        self.Save(self, 
+                  os.path.abspath(os.path.join(self.__testDir, TEST_FILENAME)))
+        (self.__currentExecution, self.__previousExecution, 
+         self.__beforePreviousExecution) = executions
     
     def IsRecovered(self):
+        self.__FindExecutions()
         return self.__isRecovered
     
     def __FindLatestExecutionDir(self):
@@ -222,6 +313,7 @@ class FTest(FSerializable, FSerializer):
         return (final, second)
     
     def GetHistory(self):
+        self.__LoadExecutions()
         sortedExecutionFilenames = self.__GetHistoryFilenames()
         
         executions = []
@@ -282,9 +374,11 @@ class FTest(FSerializable, FSerializer):
         return self.__testDir
     
     def GetCurrentExecution(self):
+        self.__LoadExecutions()
         return self.__currentExecution
     
     def GetCurrentExecutionDir(self):
+        self.__FindExecutions()
         return self.__currentExecutionDir;
     
     def GetBlessed(self):
@@ -343,6 +437,7 @@ class FTest(FSerializable, FSerializer):
             os.mkdir(blessedDir)
         
         blessedFilename, compareResults = self.__HasBlessed(filename)
+        GetBlessedIndex(self.__dataSetPath).Save()
         if ((blessedFilename != None) and (blessedFilename != "")):
             f.write(os.path.join(ext, os.path.basename(blessedFilename)) + 
                     "\n")
@@ -366,6 +461,7 @@ class FTest(FSerializable, FSerializer):
                 os.mkdir(blessedDir)
             
             blessed, compareResults = self.__HasBlessed(filename)
+            GetBlessedIndex(self.__dataSetPath).Save()
             if ((blessed != None) and (blessed != "")): return
             
             copiedFilename = FUtils.GetAvailableFilename(
@@ -593,12 +689,11 @@ class FTest(FSerializable, FSerializer):
         blessedDir = os.path.join(self.__dataSetPath, BLESSED_DIR, BLESSED_ANIMATIONS)
         baseFilename = self.GetBaseFilename()
         if (os.path.isdir(blessedDir)):
-            allCompareResults = []
+            references = []
             for directory in os.listdir(blessedDir):
                 if directory == ".svn": continue
 
                 # Retrieve the absolute filename and verify that this is a folder.
-                blessedArray = []
                 fullDirectory = os.path.join(blessedDir, directory)
                 if not os.path.isdir(fullDirectory): continue
                 
@@ -613,23 +708,13 @@ class FTest(FSerializable, FSerializer):
                 storedFilenames.sort()
                 
                 if (len(filenames) != len(storedFilenames)): continue
-                
-                # Compare the two lists of files.
-                compareResults = []
-                foundFalse = False
-                for i in range(len(filenames)):
-                    compareResult = FGlobals.imageComparator.CompareImages(
-                            filenames[i], storedFilenames[i])
-                    compareResults.append(compareResult)
-                    if (not compareResult.GetResult()):
-                        foundFalse = True
-                    else:
-                        blessedArray.append(storedFilenames[i])
-                if (foundFalse): 
-                    allCompareResults.append(compareResults)
-                    continue
-                
-                return (blessedArray, [compareResults])
+                references.append(storedFilenames)
+            
+            # Compare the files against all the blessed animations at once.
+            index, allCompareResults = (FGlobals.imageComparator.
+                    CompareImageSets(filenames, references))
+            if (index != -1):
+                return (references[index], [allCompareResults[-1]])
             return ("", allCompareResults)
         return (None, None)
         
@@ -667,44 +752,99 @@ class FTest(FSerializable, FSerializer):
                 (str, [FCompareResult,]) if there are blessed images and at 
                     least one of them matches the given file.The FCompareResult
                     returned is the one for the matching blessed image. It
-                    takes the first matching blessed image it finds.
+                    takes the first matching blessed image it finds, trying 
+                    the most similar blessed images first.
         
         """
         ext = FUtils.GetExtension(filename)
         blessedDir = os.path.join(self.__dataSetPath, BLESSED_DIR, ext)
         if (os.path.isdir(blessedDir)):
+            # the index is saved at the end of the run or by the caller
+            blessedIndex = GetBlessedIndex(self.__dataSetPath)
+            identicalFilename, candidates = blessedIndex.GetCandidates(filename)
+            
+            if (identicalFilename != None):
+                compareResult = (FGlobals.imageComparator.
+                        CompareIdenticalImages(filename, identicalFilename))
+                return (identicalFilename, [compareResult,])
+            
+            references = []
+            for fullFilename in candidates:
+                references.append([fullFilename,])
+            
+            index, allCompareResults = (FGlobals.imageComparator.
+                    CompareImageSets([filename,], references))
+            if (index != -1):
+                return (candidates[index], allCompareResults[-1])
+            
             compareResults = []
-            for filename1 in os.listdir(blessedDir):
-                fullFilename = os.path.join(blessedDir, filename1)
-                if (not os.path.isfile(fullFilename)): 
-                    continue
-                compareResult = FGlobals.imageComparator.CompareImages(
-                        filename, fullFilename)
-                if (compareResult.GetResult()):
-                    return (os.path.join(blessedDir, filename1), 
-                            [compareResult,])
-                compareResults.append(compareResult)
+            for compareResultList in allCompareResults:
+                compareResults.append(compareResultList[0])
             return ("", compareResults)
         return (None, None)
     
     def HasCurrentExecution(self):
-        return (self.__currentExecution != None)
+        self.__FindExecutions()
+        return (self.__currentExecutionDir != "")
     
     def DeleteCurrentExecution(self):
+        self.__FindExecutions()
         dirToDelete = self.__currentExecutionDir
         
         if (dirToDelete == ""):
             raise ValueError, "No current execution."
         #TODO: try, catch this and all other shutil
+        self.DiscardSaved(dirToDelete)
         shutil.rmtree(dirToDelete)
         self.__isRecovered = False
         self.__UpdateExecution()
     
     def GetCurrentResult(self):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): return None
         
         return self.__currentExecution.GetResult()
     
+    def GetCurrentSummary(self):
+        """GetCurrentSummary() -> FExecutionSummary
+        
+        Gets the summary of the current execution. It is saved with the test
+        when the test concludes or its result changes, so the current 
+        execution is not loaded, except the first time for the tests that
+        were ran before there were summaries.
+        
+        returns:
+            FExecutionSummary of the current execution, or None if there is
+            no current execution.
+        
+        """
+        self.__FindExecutions()
+        if (not self.__HasCurrentSummary()):
+            self.__LoadExecutions()
+            self.__UpdateSummary(self.__currentExecution)
+            if (not self.__HasCurrentSummary()): return None
+        return self.__currentSummary
+    
+    def __HasCurrentSummary(self):
+        return ((self.__currentSummary != None) and 
+                (self.__currentExecutionDir != "") and
+                self.__currentSummary.IsOf(self.__currentExecutionDir))
+    
+    def __UpdateSummary(self, execution):
+        """__UpdateSummary(execution) -> None
+        
+        Saves the summary of an execution with the test if it is the current
+        execution.
+        
+        """
+        if ((execution == None) or (self.__currentExecutionDir == "")): return
+        
+        summary = execution.GetSummary()
+        if (not summary.IsOf(self.__currentExecutionDir)): return
+        
+        self.__currentSummary = summary
+        self.__Save()
+    
     def __CompileResult(self, testProcedure, execution):
         if (execution == None): return
         
@@ -795,6 +935,13 @@ class FTest(FSerializable, FSerializer):
         self.__CompileResult(testProcedure, execution)
         self.Save(execution, os.path.abspath(
                 os.path.join(execution.GetExecutionDir(), EXECUTION_FILENAME)))
+        self.__FindExecutions()
+        self.__UpdateSummary(execution)
+    
+    def ToggleResult(self, execution):
+        execution.ToggleResult()
+        self.__FindExecutions()
+        self.__UpdateSummary(execution)
         
     def GetDataSetPath(self):
         return self.__dataSetPath
@@ -830,60 +977,71 @@ class FTest(FSerializable, FSerializer):
                 (self.__filename.find("animation") != -1))
     
     def GetPreviousOutputLocation(self, opNumber):
+        self.__LoadExecutions()
         if (self.__previousExecution == None): return None
         
         return self.__previousExecution.GetOutputLocation(opNumber)
     
     def GetCurrentComments(self):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): return self.__defaultComments
         
         return self.__currentExecution.GetComments()
     
     def SetDefaultComments(self, value):
         self.__defaultComments = value
-        self.Save(self, os.path.abspath(os.path.join(self.__testDir, TEST_FILENAME)))
+        self.__Save()
     
     def GetCurrentOutputLocation(self, opNumber):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): return None
         
         return self.__currentExecution.GetOutputLocation(opNumber)
     
     def IsCurrentOutputGood(self, opNumber):
+        self.__LoadExecutions()
         return self.__currentExecution.IsOutputGood(opNumber)
     
     def GetCurrentErrorCount(self, opNumber):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): return None
         
         return self.__currentExecution.GetErrorCount(opNumber)
     
     def GetCurrentWarningCount(self, opNumber):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): return None
         
         return self.__currentExecution.GetWarningCount(opNumber)
     
     def GetCurrentTimeRan(self):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): 
             return FExecution().GetTimeRan()
         
         return self.__currentExecution.GetTimeRan()
     
     def GetCurrentLogs(self):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): return None
         
         return self.__currentExecution.GetLogs()
     
     def GetCurrentLog(self, opNumber):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): return None
         
         return self.__currentExecution.GetLog(opNumber)
     
     def GetCurrentDiffFromPrevious(self):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): 
             return FExecution().GetDiffFromPrevious()
         
         return self.__currentExecution.GetDiffFromPrevious()
     
     def GetCurrentEnvironment(self):
+        self.__LoadExecutions()
         if (self.__currentExecution == None): return {}
         
         return self.__currentExecution.GetEnvironment()
@@ -891,13 +1049,13 @@ class FTest(FSerializable, FSerializer):
     def RefreshCOLLADA(self):
         # If the given file is a COLLADA document, parse in the keywords and comments.
         if FCOLLADAParser.IsCOLLADADocument(self.__filename):
-            (self.__colladaId, self.__colladaSubject, self.__colladaKeyword) = FCOLLADAParser.GetCOLLADAAssetInformation(self.__filename)
+            (self.__colladaId, self.__colladaSubject, self.__colladaKeyword) = GetDocumentAssetInformation(self.__filename)
         else:
             (self.__colladaId, self.__colladaSubject, self.__colladaKeyword) = ("", "<Not COLLADA>", "<Not COLLADA>")
 
         # On RefreshTable/Row in the UI: force the re-serialization of the test.
         if self.__testDir != None:
-            self.Save(self, os.path.abspath(os.path.join(self.__testDir, TEST_FILENAME)))        
+            self.__Save()
 
     def GetCOLLADAKeyword(self):
         return self.__colladaKeyword
@@ -909,8 +1067,13 @@ class FTest(FSerializable, FSerializer):
         return self.__colladaId
 
     def Prepare(self):
+        self.__LoadExecutions()
+        self.__isRunning = True
         self.__beforePreviousExecution = self.__previousExecution
         self.__previousExecution = self.__currentExecution
+        self.__previousExecutionDir = None
+        if (self.__previousExecution != None):
+            self.__previousExecutionDir = self.__currentExecutionDir
         self.__crashIndices = []
         
         postfix = "%0.4d_%0.2d_%0.2d_(" %(time.localtime()[0:3])
@@ -930,6 +1093,86 @@ class FTest(FSerializable, FSerializer):
     def Validate(self, step):
         self.__currentExecution.Validate(step)
     
+    def GetStepsKey(self, appPython, applicationChecksum, steps):
+        """GetStepsKey(appPython, applicationChecksum, steps) -> str
+        
+        Calculates the key of everything the outputs of the steps of one 
+        application depend on: the application and its executable, the
+        operations and their settings, and the input documents. The steps
+        must be prepared and the previous steps ran.
+        
+        arguments:
+            appPython
+                FApplication running the steps.
+            applicationChecksum
+                string corresponding to the checksum of the DCC executable.
+            steps
+                list of (step, operation, inputStep) for the steps of the
+                application.
+        
+        returns:
+            string corresponding to the key.
+        
+        """
+        firstStep = steps[0][0]
+        keyParts = [appPython.GetPrettyName(), applicationChecksum, 
+                    str(self.IsAnimated()), str(self.__cameraRig), 
+                    str(self.__lightingRig)]
+        for step, op, inStep in steps:
+            keyParts.append(op)
+            if (self.__settings[step] != None):
+                for entry in self.__settings[step].GetSettings():
+                    keyParts.append(str(entry))
+            
+            # inputs from steps of the same application are covered already
+            if (inStep < firstStep):
+                location = None
+                if (inStep != 0):
+                    location = self.__currentExecution.GetOutputLocation(inStep)
+                if (location == None):
+                    inputFilename = self.__filename
+                else:
+                    inputFilename = location[-1]
+                keyParts.append(CalculateDocumentChecksum(inputFilename))
+        
+        return FUtils.CalculateStringChecksum("\n".join(keyParts))
+    
+    def SetStepsKey(self, steps, key):
+        for step, op, inStep in steps:
+            self.__currentExecution.SetStepKey(step, key)
+    
+    def ReuseSteps(self, steps, key):
+        """ReuseSteps(steps, key) -> bool
+        
+        Reuses the outputs of the steps from the previous execution if they
+        were produced from the same key without crashing.
+        
+        arguments:
+            steps
+                list of (step, operation, inputStep) for the steps of the
+                application.
+            key
+                string corresponding to the key from GetStepsKey.
+        
+        returns:
+            bool corresponding to whether the outputs were reused. The steps
+            need to be ran otherwise.
+        
+        """
+        previous = self.__previousExecution
+        if (previous == None): return False
+        
+        for step, op, inStep in steps:
+            if ((previous.GetStepKey(step) != key) or 
+                    previous.HasCrashed(step) or 
+                    (previous.GetOutputLocation(step) == None) or
+                    (not previous.IsOutputGood(step))):
+                return False
+        
+        for step, op, inStep in steps:
+            self.__currentExecution.Reuse(step, previous)
+        return True
+    
     def Run(self, appPython, step, op, inStep, markerCallBack):
         self.__currentExecution.Run(appPython, step, op, inStep, 
                 self.__filename, self.__settings[step].GetSettings(), 
@@ -940,6 +1183,8 @@ class FTest(FSerializable, FSerializer):
         self.__previousExecution = self.__beforePreviousExecution
         self.__beforePreviousExecution = None
         self.__crashIndices = None
+        self.__isRunning = False
+        self.DiscardSaved(self.__currentExecutionDir)
         try:
             shutil.rmtree(self.__currentExecutionDir)
         except OSError, e:
@@ -957,7 +1202,11 @@ class FTest(FSerializable, FSerializer):
             self.__currentExecutionDir = (self.__currentExecution.
                                                             GetExecutionDir())
         else:
-            self.__currentExecutionDir = None
+            self.__currentExecutionDir = ""
+        self.__previousExecutionDir = None
+        if (self.__previousExecution != None):
+            self.__previousExecutionDir = (self.__previousExecution.
+                                                            GetExecutionDir())
     
     def Crash(self, step):
         self.__crashIndices.append(step)
@@ -997,3 +1246,5 @@ class FTest(FSerializable, FSerializer):
         # update requires DiffFromPrevious to be set; update saves also
         self.Save(self.__currentExecution, os.path.abspath(
                 os.path.join(self.__currentExecution.GetExecutionDir(), EXECUTION_FILENAME)))
+        self.__UpdateSummary(self.__currentExecution)
+        self.__isRunning = False
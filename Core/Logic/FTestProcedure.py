@@ -8,16 +8,23 @@
 import copy
 import os
 import os.path
-import re
 import shutil
+import sys
+import threading
 
+import Core.Common.FCOLLADAParser as FCOLLADAParser
 import Core.Common.FUtils as FUtils
+import Core.Common.FGlobals as FGlobals
+import Core.Common.FObjectStore as FObjectStore
 from Core.Common.FConstants import *
 from Core.Common.FSerializable import *
 from Core.Common.FSerializer import *
+from Core.Logic.FBlessedIndex import *
+from Core.Logic.FDataSetCatalog import *
 from Core.Logic.FDataSetParser import *
 from Core.Logic.FKeySupplier import *
 from Core.Logic.FRegExManager import *
+from Core.Logic.FRunReport import *
 from Core.Logic.FSetting import *
 from Core.Logic.FSettingManager import *
 from Core.Logic.FTest import *
@@ -87,8 +94,8 @@ class FTestProcedure(FSerializable, FSerializer, FRegExManager,
                 message = message + "Test" + str(test.GetTestId()) + "\n"
         return message[:-1]
     
-    def AddRegEx(self, settings, regEx, ignoredRegEx = [""]):
-        FRegExManager.AddRegEx(self, settings, regEx, ignoredRegEx)
+    def AddRegEx(self, settings, regEx, ignoredRegEx = [""], paths = []):
+        FRegExManager.AddRegEx(self, settings, regEx, ignoredRegEx, paths)
         self.Save(self, 
                   os.path.join(self.__procedureDir, TEST_PROCEDURE_FILENAME))
     
@@ -103,58 +110,57 @@ class FTestProcedure(FSerializable, FSerializer, FRegExManager,
         self.Save(self, 
                   os.path.join(self.__procedureDir, TEST_PROCEDURE_FILENAME))
     
+    def SetPaths(self, index, paths):
+        FRegExManager.SetPaths(self, index, paths)
+        self.Save(self, 
+                  os.path.join(self.__procedureDir, TEST_PROCEDURE_FILENAME))
+    
+    def AddPaths(self, index, paths):
+        FRegExManager.AddPaths(self, index, paths)
+        self.Save(self, 
+                  os.path.join(self.__procedureDir, TEST_PROCEDURE_FILENAME))
+    
+    def AddIgnoredPaths(self, index, paths):
+        FRegExManager.AddIgnoredPaths(self, index, paths)
+        self.Save(self, 
+                  os.path.join(self.__procedureDir, TEST_PROCEDURE_FILENAME))
+    
     def CheckForNewTests(self, regExId):
+        # the documents are listed once for all the regular expressions
+        documents = []
+        for dataSetDir in DATA_SET_DIRS:
+            catalog = GetDataSetCatalog(dataSetDir)
+            for document in catalog.GetDocuments():
+                documents.append(os.path.normpath(document))
+            catalog.Save()
+        
+        # existing tests by data set path, to only compare their settings
+        testSettings = {}
+        for test in self.GetTestGenerator():
+            dataSetPath = test.GetDataSetPath()
+            if (not testSettings.has_key(dataSetPath)):
+                testSettings[dataSetPath] = []
+            testSettings[dataSetPath].append(test.GetSettings())
+        
         newDataSets = []
-        dir = FUtils.NormalizeRegEx(os.path.normpath(MAIN_FOLDER))
-        
-        ignoredPatterns = []
-        for i in self.GetIgnoredRegExPageGenerator(regExId):
-            ignoredPatterns.append(re.compile("(" + dir + ")(/|\\\\)(" + 
-                    self.GetIgnoredRegEx(regExId, i) + ")$"))
-        
-        for regExPage in self.GetRegExPageGenerator(regExId):
-            pattern = re.compile("(" + dir + ")(/|\\\\)(" + 
-                    self.GetRegEx(regExId, regExPage) + ")$")
-            tempDataSets = []
-            for dataSetDir in DATA_SET_DIRS:
-                self.__CheckForNewTestsRecurse(dataSetDir, pattern, 
-                        self.GetRegExSettings(regExId), tempDataSets, 
-                        ignoredPatterns)
-            newDataSets = newDataSets + tempDataSets
+        newDocuments = []
+        settings = self.GetRegExSettings(regExId)
+        for daeFile in self.GetMatchingFilenames(regExId, documents):
+            file = os.path.dirname(daeFile)
+            found = False
+            for testSetting in testSettings.get(file, []):
+                if (testSetting == settings):
+                    found = True
+                    break
+            if (not found):
+                newDataSets.append(file)
+                if (FCOLLADAParser.IsCOLLADADocument(daeFile)):
+                    newDocuments.append(daeFile)
         
-        return newDataSets
-    
-    def __CheckForNewTestsRecurse(self, path, pattern, settings, newDataSets,
-            ignoredPatterns):
-        file, dirs = self.GetValidFileAndDirs(path)
-        
-        if (file != None):
-            daeFile = os.path.normpath(file)
-            file = os.path.normpath(os.path.dirname(file))
-            match = pattern.match(daeFile)
-            if (match != None):
-                if (match.group() == daeFile):
-                    found = False
-                    for test in self.GetTestGenerator():
-                        if ((test.GetDataSetPath() == file) and 
-                                test.GetSettings() == settings):
-                            found = True
-                            break
-                    if (not found):
-                        ignoredMatchFlag = False
-                        for ignoredPattern in ignoredPatterns:
-                            ignoredMatch = ignoredPattern.match(daeFile)
-                            if ((ignoredMatch != None) and 
-                                    (ignoredMatch.group() == daeFile)):
-                                ignoredMatchFlag = True
-                                break
-                        if (not ignoredMatchFlag):
-                            newDataSets.append(file)
-            return
+        # the new tests then find the <asset> of their document in the catalog
+        GetDocumentAssetInformations(newDocuments)
         
-        for dir in dirs:
-            self.__CheckForNewTestsRecurse(dir, pattern, settings, newDataSets,
-                    ignoredPatterns)
+        return newDataSets
     
     def StepEquals(self, other):
         return self.__procedureTree == other.__procedureTree
@@ -195,10 +201,15 @@ class FTestProcedure(FSerializable, FSerializer, FRegExManager,
         self.__Initialize(procedureDir)
         self.__testList = {}
         
+        # migrate the tree of pickle files, all loaded at once below
+        if (FGlobals.useProcedureStore and (not os.path.isfile(os.path.join(
+                self.__procedureDir, TEST_PROCEDURE_STORE_FILENAME)))):
+            FObjectStore.CreateStore(self.__procedureDir)
+        
         testPrefix = os.path.join(self.__procedureDir, TEST_PREFIX)
         for key in self.__supplier.GetKeyGenerator():
             testFilename = os.path.join(testPrefix + str(key), TEST_FILENAME)
-            if (os.path.isfile(testFilename)):
+            if (self.IsSaved(testFilename)):
                 test = self.Load(testFilename)
                 self.__testList[key] = test
             else:
@@ -222,6 +233,7 @@ class FTestProcedure(FSerializable, FSerializer, FRegExManager,
         self.__dccWorkingDir = os.path.join(self.__dccWorkingDir, DCC_WORK2)
         self.__dccWorkingDir = os.path.join(self.__dccWorkingDir, DCC_WORK3)
         print "WorkingDir: %s" % (self.__dccWorkingDir)
+        self.__compiledEvents = {} # {testId : threading.Event} while running
     
     def GetName(self):
         return self.__name
@@ -274,25 +286,14 @@ class FTestProcedure(FSerializable, FSerializer, FRegExManager,
         
         for regExId in self.GetRegExIdGenerator():
             if (deletedSettings == self.GetRegExSettings(regExId)):
-                ignoredRegEx = self.GetIgnoredRegExList(regExId)
-                if (len(ignoredRegEx) == 0):
-                    ignoredRegEx.append("")
-                
                 displayedFilename = FUtils.GetRelativePath(
                         self.__testList[key].GetDataSetPath(), MAIN_FOLDER)
-                regExPath = FUtils.NormalizeRegEx(displayedFilename)
-                newIgnored = ignoredRegEx[-1]
-                if (newIgnored != ""):
-                    newIgnored = newIgnored + "|"
-                newIgnored = newIgnored + regExPath
-                if (len(newIgnored) < 30000):
-                    ignoredRegEx[-1] = newIgnored
-                else:
-                    ignoredRegEx.append(regExPath)
-                self.SetIgnoredRegEx(regExId, ignoredRegEx)
+                FRegExManager.AddIgnoredPaths(self, regExId, 
+                                              [displayedFilename])
         
         try:
             testDir = os.path.join(self.__procedureDir, TEST_PREFIX + str(key))
+            self.DiscardSaved(testDir)
             shutil.rmtree(testDir)
         except Exception, e:
             pass
@@ -365,7 +366,8 @@ class FTestProcedure(FSerializable, FSerializer, FRegExManager,
                 i = i + 1
     
     def __RunTestsAux(self, appPython, appIndex, maxAppIndex, testIds, 
-                      applicationMap, gaugeCallBack, markerCallback):
+                      applicationMap, gaugeCallBack, markerCallback, 
+                      workingDir, report):
         if (self.__cancelRun): return None
         
         steps = []
@@ -377,7 +379,7 @@ class FTestProcedure(FSerializable, FSerializer, FRegExManager,
             gaugeCallBack(appIndex, maxAppIndex, 
                     "Creating script for steps: " + str(steps) + ".")
         try:
-           appPython.BeginScript(os.path.abspath(self.__dccWorkingDir))
+           appPython.BeginScript(os.path.abspath(workingDir))
         except WindowsError:
            return None
            
@@ -405,11 +407,218 @@ class FTestProcedure(FSerializable, FSerializer, FRegExManager,
             gaugeCallBack(appIndex, maxAppIndex, 
                     "Running script for steps: " + str(steps) + ".")
         
+        report.AddLaunch(appPython.GetPrettyName())
         return appPython.RunScript()
     
+    def __RunTestsShard(self, appPython, appIndex, maxAppIndex, testIds, 
+                        applicationMap, gaugeCallBack, markerCallBack, 
+                        workingDir, report):
+        """Runs the steps of one application for the given tests as a batch,
+        isolating the tests that crash the DCC.
+        
+        When the script crashes, the tests up to the last one with a good
+        output are done. The remaining tests are split in two halves which are
+        run again as batches, each half being split again only if it crashes
+        too, until the crashing tests are alone in their batch. Isolating k 
+        crashing tests out of n costs about k * log2(n) DCC launches instead
+        of one launch per test following the first crash.
+        
+        """
+        result = self.__RunTestsAux(appPython, appIndex, maxAppIndex, 
+                                    testIds, applicationMap, gaugeCallBack,
+                                    markerCallBack, workingDir, report)
+        if ((result == None) or (result == True)):
+            return
+        
+        if (len(testIds) == 1):
+            print "test" + str(testIds[0]) + " crashed!!!"
+            report.AddCrash(appPython.GetPrettyName(), testIds[0])
+            for step, op in self.__GetOpGenerator(appIndex):
+                if (op != VALIDATE or op in OPS_NEEDING_APP):
+                    self.__testList[testIds[0]].Crash(step)
+            return
+        
+        # there was a crash: find last correct
+        for i in range(len(testIds) - 1, -2, -1):
+            if (i == -1): break
+            
+            testId = testIds[i]
+            found = False
+            for step, op in self.__GetOpGenerator(appIndex):
+                if (op == VALIDATE):
+                    continue
+                if (self.__testList[testId].IsCurrentOutputGood(step)):
+                    found = True
+                    break
+            if (found):
+                break
+        
+        testIds = testIds[i + 1:]
+        if (len(testIds) == 0): return
+        
+        if (gaugeCallBack != None):
+            gaugeCallBack(appIndex, maxAppIndex, "There was a crash. " + 
+                    "Bisecting the " + str(len(testIds)) + " remaining tests.")
+        
+        half = (len(testIds) + 1) / 2
+        self.__RunTestsShard(appPython, appIndex, maxAppIndex, 
+                testIds[:half], applicationMap, gaugeCallBack, 
+                markerCallBack, workingDir, report)
+        if (half < len(testIds)):
+            self.__RunTestsShard(appPython, appIndex, maxAppIndex, 
+                    testIds[half:], applicationMap, gaugeCallBack, 
+                    markerCallBack, workingDir, report)
+    
+    def __RunTestsShardThread(self, errors, *args):
+        """Runs __RunTestsShard in a worker thread, keeping any exception in
+        errors so that it can be raised again in the calling thread.
+        
+        """
+        try:
+            self.__RunTestsShard(*args)
+        except Exception, e:
+            errors.append(sys.exc_info())
+    
+    def __CompileTestsThread(self, pendingTestIds, lock, errors):
+        """Validates and compiles the pending tests in a worker thread until
+        there are none left. Any exception is kept in errors and the 
+        remaining tests are given up on.
+        
+        """
+        while (True):
+            lock.acquire()
+            try:
+                if (len(pendingTestIds) == 0): return
+                testId = pendingTestIds.pop(0)
+            finally:
+                lock.release()
+            
+            try:
+                try:
+                    self.__testList[testId].Validate(self)
+                    self.__testList[testId].Compile(self)
+                except Exception, e:
+                    errors.append(sys.exc_info())
+                    lock.acquire()
+                    try:
+                        while (len(pendingTestIds) > 0):
+                            self.__compiledEvents[pendingTestIds.pop()].set()
+                    finally:
+                        lock.release()
+            finally:
+                self.__compiledEvents[testId].set()
+    
+    def WaitForCompiledTest(self, testId):
+        """WaitForCompiledTest(testId) -> None
+        
+        Waits until a test being ran is validated and compiled, so that its
+        results are those of the current execution. It returns immediately
+        for the other tests.
+        
+        arguments:
+            testId
+                int corresponding to the id of the test.
+        
+        """
+        event = self.__compiledEvents.get(testId, None)
+        if (event != None):
+            event.wait()
+    
+    def __ReuseSteps(self, appPython, appIndex, testIds, report):
+        """Reuses the outputs of the previous executions for the steps of one
+        application when the key of everything they depend on is unchanged.
+        
+        returns:
+            list of int corresponding to the tests whose steps need to be ran.
+        
+        """
+        applicationPath = appPython.GetApplicationPath()
+        if (applicationPath == None): return testIds
+        applicationChecksum = FUtils.CalculateChecksum(applicationPath)
+        
+        steps = []
+        for step, op in self.__GetOpGenerator(appIndex):
+            steps.append((step, op, self.__GetInputStep(step)))
+        
+        runTestIds = []
+        for testId in testIds:
+            test = self.__testList[testId]
+            key = test.GetStepsKey(appPython, applicationChecksum, steps)
+            if (test.ReuseSteps(steps, key)):
+                report.AddCacheHit(appPython.GetPrettyName())
+            else:
+                test.SetStepsKey(steps, key)
+                runTestIds.append(testId)
+        return runTestIds
+    
+    def __GetWorkerDir(self, worker):
+        """Gets the DCC working directory of a worker. 
+        
+        The first worker uses the working directory of the test procedure; the
+        others each get their own WorkingDir/WorkerN/Execution/Step tree so 
+        that the scripts of concurrent DCC processes do not overwrite each 
+        other.
+        
+        """
+        if (worker == 0): return self.__dccWorkingDir
+        
+        workerDir = os.path.join(self.__procedureDir, DCC_WORK1, 
+                DCC_WORKER_PREFIX + str(worker), DCC_WORK2, DCC_WORK3)
+        if (not os.path.isdir(workerDir)):
+            try:
+                os.makedirs(workerDir)
+            except OSError, e:
+                print ("<FTestProcedure> could not make the working " +
+                       "directory: %s" % (workerDir))
+                print e
+        return workerDir
+    
+    def __GetShards(self, appPython, testIds, workerCount):
+        """Splits the tests between the workers.
+        
+        Tests are dealt in turn to each worker so that the slow categories of
+        the data sets, which are next to each other in testIds, are spread
+        over all the workers. 
+        
+        returns:
+            list of (FApplication, list_of_test_ids) for each worker. There is
+            only one entry if the application cannot be cloned.
+        
+        """
+        workerCount = min(workerCount, len(testIds))
+        if (workerCount <= 1): return [(appPython, testIds)]
+        
+        shards = [(appPython, testIds[0::workerCount])]
+        for worker in range(1, workerCount):
+            clone = appPython.Clone()
+            if (clone == None):
+                print ("<FTestProcedure> " + appPython.GetPrettyName() + 
+                       " cannot run concurrently. Running tests serially.")
+                return [(appPython, testIds)]
+            shards.append((clone, testIds[worker::workerCount]))
+        return shards
+    
     # gaugeCallBack takes 3 parameters: [int] current, [int] max, [str] message
     # markerCallBack takes 2 parameters: [bool] clearList, [str] watchPath
-    def RunTests(self, testIds, applicationMap, gaugeCallBack = None, markerCallBack = None):
+    # workerCount is the number of DCC processes that may run concurrently; 
+    # None uses the workerCount from the configuration file.
+    # useCache is whether to reuse the outputs of the previous executions 
+    # when nothing they depend on changed.
+    # concludeCallBack takes 1 parameter: [int] testId, once it is concluded
+    # postRunWorkerCount is the number of tests validated and compiled 
+    # concurrently; None uses the postRunWorkerCount from the configuration
+    # file.
+    # returns a FRunReport with the DCC launches, cache hits and crashes of the
+    # run.
+    def RunTests(self, testIds, applicationMap, gaugeCallBack = None, 
+                 markerCallBack = None, workerCount = None, useCache = True,
+                 concludeCallBack = None, postRunWorkerCount = None):
+        if (workerCount == None):
+            workerCount = FGlobals.workerCount
+        if (postRunWorkerCount == None):
+            postRunWorkerCount = FGlobals.postRunWorkerCount
+        report = FRunReport()
+        
         maxAppIndex = 0
         for appIndex, stepIndex, app in self.__GetAppGenerator():
             maxAppIndex = maxAppIndex + 1
@@ -441,93 +650,113 @@ class FTestProcedure(FSerializable, FSerializer, FRegExManager,
             appPython.SetApplicationIndex(appIndex)
             appPython.SetTestProcedureDir(self.__procedureDir)
             
-            savedTestIds = testIds
+            runTestIds = testIds
+            if (useCache):
+                runTestIds = self.__ReuseSteps(appPython, appIndex, testIds, 
+                                               report)
+                if (len(runTestIds) == 0): continue
             
-            while (True):
-                result = self.__RunTestsAux(appPython, appIndex, maxAppIndex, 
-                                            testIds, applicationMap, gaugeCallBack, markerCallBack)
-                if ((result == None) or (result == True)):
-                    break
-                
-                # there was a crash: find last correct
-                for i in range(len(testIds) - 1, -2, -1):
-                    if (i == -1): break
-                    
-                    testId = testIds[i]
-                    found = False
-                    for step, op in self.__GetOpGenerator(appIndex):
-                        if (op == VALIDATE):
-                            continue
-                        if (self.__testList[testId].IsCurrentOutputGood(step)):
-                            found = True
-                            break
-                    if (found):
-                        break
-                
-                if (gaugeCallBack != None):
-                    gaugeCallBack(appIndex, maxAppIndex, 
-                            "There was a crash. Checking for which case.")
-                
-                if (len(testIds) > 1):
-                    while (True):
-                        i = i + 1
-                        if (i >= len(testIds)): break
-                        result = self.__RunTestsAux(appPython, appIndex, 
-                                maxAppIndex, [testIds[i],], applicationMap, 
-                                gaugeCallBack, markerCallBack)
-                        if ((result == None) or (result == False)):
-                            break
-                else:
-                    i = i + 1
-                if (i < len(testIds)):
-                    print "test" + str(testIds[i]) + " crashed!!!"
-                    for step, op in self.__GetOpGenerator(appIndex):
-                        if (op != VALIDATE or op in OPS_NEEDING_APP):
-                            self.__testList[testIds[i]].Crash(step)
-                
-                i = i + 1 # skip the broken one
-                if (i >= len(testIds)): break
-                
-                if (gaugeCallBack != None):
-                    gaugeCallBack(appIndex, maxAppIndex, 
-                            "There was a crash. Rerunning.")
-                
-                testIds = testIds[i:]
+            shards = self.__GetShards(appPython, runTestIds, workerCount)
+            if (len(shards) == 1):
+                self.__RunTestsShard(appPython, appIndex, maxAppIndex, 
+                        runTestIds, applicationMap, gaugeCallBack, 
+                        markerCallBack, self.__dccWorkingDir, report)
+                continue
             
-            testIds = savedTestIds
+            if (gaugeCallBack != None):
+                gaugeCallBack(appIndex, maxAppIndex, "Running " + 
+                        str(len(runTestIds)) + " tests on " + str(len(shards)) + 
+                        " workers.")
+            
+            errors = []
+            threads = []
+            for worker in range(len(shards)):
+                shardPython, shardTestIds = shards[worker]
+                thread = threading.Thread(target = self.__RunTestsShardThread,
+                        args = (errors, shardPython, appIndex, maxAppIndex, 
+                                shardTestIds, applicationMap, gaugeCallBack, 
+                                markerCallBack, self.__GetWorkerDir(worker),
+                                report))
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join()
+            
+            if (len(errors) > 0):
+                errorType, errorValue, errorTraceback = errors[0]
+                raise errorType, errorValue, errorTraceback
         
         if (self.__cancelRun):
             gaugeCallBack(None, None, "Cancelling...")
             for testId in testIds:
                 self.__testList[testId].CancelRun()
                 gaugeCallBack(None, None, "Reverted test" + str(testId) + ".")
-            return
+            return report
         
         self.__cancelRun = True
         
         if (gaugeCallBack != None):
-            gaugeCallBack(appIndex + 1, maxAppIndex, "Performing validation steps.")
-
+            gaugeCallBack(appIndex + 1, maxAppIndex, "Performing validation " +
+                    "steps, compiling, badge judging and finalizing " +
+                    "executions.")
+        
+        # The tests are validated and compiled by worker threads while this
+        # thread judges and concludes them in order, as soon as each one is
+        # compiled. A judging script that looks at another test waits for
+        # it to be compiled, through WaitForCompiledTest, so the results are
+        # the same as when all the tests are compiled before judging.
+        self.__compiledEvents = {}
         for testId in testIds:
-            self.__testList[testId].Validate(self)
-
-        if (gaugeCallBack != None):
-            gaugeCallBack(appIndex + 2, maxAppIndex, "Compiling executions.")
+            self.__compiledEvents[testId] = threading.Event()
+        pendingTestIds = testIds[:]
+        lock = threading.Lock()
+        errors = []
+        threads = []
+        for worker in range(max(1, min(postRunWorkerCount, len(testIds)))):
+            thread = threading.Thread(target = self.__CompileTestsThread,
+                    args = (pendingTestIds, lock, errors))
+            thread.start()
+            threads.append(thread)
+        
+        try:
+            for i in range(len(testIds)):
+                testId = testIds[i]
+                self.WaitForCompiledTest(testId)
+                if (len(errors) > 0): break
+                
+                self.__testList[testId].Judge(self)
+                self.__testList[testId].Conclude(self)
+                if (gaugeCallBack != None):
+                    gaugeCallBack(None, None, "Finalized test " + str(testId) + 
+                            " (" + str(i + 1) + "/" + str(len(testIds)) + ").")
+                if (concludeCallBack != None):
+                    concludeCallBack(testId)
+        finally:
+            # give up on the tests not started if judging failed
+            lock.acquire()
+            try:
+                while (len(pendingTestIds) > 0):
+                    self.__compiledEvents[pendingTestIds.pop()].set()
+            finally:
+                lock.release()
+            for thread in threads:
+                thread.join()
+            self.__compiledEvents = {}
+            SaveBlessedIndices()
+        
+        if (len(errors) > 0):
+            errorType, errorValue, errorTraceback = errors[0]
+            raise errorType, errorValue, errorTraceback
         
-        for testId in testIds:
-            self.__testList[testId].Compile(self)
-            
-        if (gaugeCallBack != None):
-            gaugeCallBack(appIndex + 2, maxAppIndex, "Performing badge judging.")
- 
-        for testId in testIds:
-            self.__testList[testId].Judge(self)
-
         if (gaugeCallBack != None):
-            gaugeCallBack(appIndex + 2, maxAppIndex, "Finalizing executions.")
-
-        for testId in testIds:
-            self.__testList[testId].Conclude(self)
+            gaugeCallBack(appIndex + 2, maxAppIndex, "Finalized executions.")
+        
+        # keep the checksums of the documents which were ran
+        for dataSetDir in DATA_SET_DIRS:
+            GetDataSetCatalog(dataSetDir).Save()
+        
+        print "<FTestProcedure> run report:\n" + str(report)
+        return report
 
     def CancelRun(self, gaugeCallBack = None):
         if (gaugeCallBack != None):
@@ -0,0 +1,126 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+# Checks that FPythonPyramidDiff gives the extras of PyramidDiff.exe on
+# blessed images. The pairs and their extras are in
+# PyramidDiffTestCases/pairs.txt. Run it from the Core directory, like the
+# test suite. Whatever cannot be checked here is skipped with a message.
+
+# libraries from python
+import os
+import sys
+import time
+
+sys.path.insert(0, "..")
+
+_PAIRS_FILE = "PyramidDiffTestCases/pairs.txt"
+
+def readPairs():
+    """Returns the (image, reference, extra, checkPython) of the fixture."""
+    pairs = []
+    f = open(_PAIRS_FILE)
+    for line in f.readlines():
+        line = line.strip()
+        if ((line == "") or (line[0] == "#")): continue
+        filename1, filename2, extra, checkPython = line.split("\t")
+        pairs.append((filename1, filename2, int(extra), 
+                      (checkPython == "yes")))
+    f.close()
+    return pairs
+
+def readConfig():
+    configDict = {}
+    if (os.path.isfile(CONFIGURATION_FILE)):
+        f = open(CONFIGURATION_FILE)
+        for line in f.readlines():
+            while (line.count("\t\t") > 0):
+                line = line.replace("\t\t", "\t")
+            if (line.count("\t") == 0): continue
+            key, value = line.split("\t", 1)
+            configDict[key] = value.strip()
+        f.close()
+    return configDict
+
+def testPair(comparator, pairs, index, path):
+    filename1, filename2, expected, checkPython = pairs[index]
+    start = time.time()
+    extra = comparator.CompareImages(filename1, filename2).GetExtra()
+    if (extra == expected):
+        print '%s pair %d: %d is correct (%.1fs)' % (path, index, extra,
+                time.time() - start)
+        return True
+    print '%s pair %d: %d is not correct, expected %d' % (path, index, extra,
+            expected)
+    return False
+
+if __name__ == '__main__':
+    try:
+        import wx
+    except ImportError:
+        print 'wxPython is not installed, skipping: it decodes the images'
+        sys.exit(0)
+    
+    import ImageComparators.FPythonPyramidDiff as FPythonPyramidDiffModule
+    from ImageComparators.FPyramidDiff import *
+    from ImageComparators.FPythonPyramidDiff import *
+    from Core.Common.FConstants import *
+    
+    wx.InitAllImageHandlers()
+    configDict = readConfig()
+    comparator = FPythonPyramidDiff(configDict)
+    failures = 0
+    
+    pairs = readPairs()
+    indices = []
+    for index in range(len(pairs)):
+        filename1, filename2, expected, checkPython = pairs[index]
+        for filename in [filename1, filename2]:
+            if (not os.path.isfile(filename)):
+                print 'pair %d: %s is missing, skipping' % (index, filename)
+                break
+        else:
+            indices.append(index)
+    
+    numpy = FPythonPyramidDiffModule.numpy
+    if (numpy != None):
+        pythonIndices = []
+        for index in indices:
+            if (not testPair(comparator, pairs, index, 'numpy')):
+                failures = failures + 1
+            if (pairs[index][3]):
+                pythonIndices.append(index)
+    else:
+        print 'NumPy is not installed, skipping the NumPy comparison'
+        pythonIndices = indices
+    
+    FPythonPyramidDiffModule.numpy = None
+    try:
+        for index in pythonIndices:
+            if (not testPair(comparator, pairs, index, 'python')):
+                failures = failures + 1
+    finally:
+        FPythonPyramidDiffModule.numpy = numpy
+    
+    # the expected extras follow PyramidDiff.exe, so check them against it
+    # where it runs
+    if ((sys.platform == "win32") and configDict.has_key("pyramidDiffPath") and
+            os.path.isfile(configDict["pyramidDiffPath"])):
+        pyramidDiff = FPyramidDiff(configDict)
+        for index in indices:
+            filename1, filename2, expected, checkPython = pairs[index]
+            extra = pyramidDiff.CompareImages(filename1, filename2).GetExtra()
+            if (extra != expected):
+                print 'PyramidDiff.exe gives %d for pair %d, expected %d' % (
+                        extra, index, expected)
+                failures = failures + 1
+    else:
+        print 'PyramidDiff.exe is missing or cannot run here, skipping it'
+    
+    if (failures != 0):
+        print '%d comparisons are not correct' % failures
+        sys.exit(1)
+    print 'all the comparisons which ran are correct'
@@ -0,0 +1,74 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+# Stand-in DCC worker for the mimic application. It does what mimic.bat and
+# mimic_render.bat do, but stays running between jobs. It is started by the
+# framework when mimicWorkerPath is set in the configuration file and talks
+# with it through the protocol described in Core/Logic/FDccWorker.py.
+
+import os.path
+import shutil
+import sys
+
+MARKER = "@CTS"
+BLACK_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "black.png")
+
+def Reply(message):
+    sys.stdout.write(MARKER + " " + message + "\n")
+    sys.stdout.flush()
+
+def UnescapeField(field):
+    result = ""
+    i = 0
+    while (i < len(field)):
+        if ((field[i] == "\\") and (i + 1 < len(field))):
+            i = i + 1
+            if (field[i] == "t"):
+                result = result + "\t"
+            elif (field[i] == "n"):
+                result = result + "\n"
+            else:
+                result = result + field[i]
+        else:
+            result = result + field[i]
+        i = i + 1
+    return result
+
+def RunJob(fields):
+    operation = fields[0]
+    inputFilename = fields[1]
+    outputs = []
+    for field in fields[3:]:
+        if (field.startswith("output=")):
+            outputs.append(field[len("output="):])
+
+    print("mimic " + operation + " " + " ".join([inputFilename] + outputs))
+    for output in outputs:
+        if (os.path.splitext(output)[1].lower() == ".dae"):
+            if (os.path.abspath(output) != os.path.abspath(inputFilename)):
+                shutil.copyfile(inputFilename, output)
+        else:
+            shutil.copyfile(BLACK_IMAGE, output)
+
+def Main():
+    Reply("READY")
+    while (True):
+        line = sys.stdin.readline()
+        if (line.strip() == ""): break
+
+        fields = [UnescapeField(field)
+                  for field in line.rstrip("\r\n").split("\t")]
+        try:
+            RunJob(fields)
+        except Exception:
+            Reply("ERROR " + str(sys.exc_info()[1]).replace("\n", " "))
+            continue
+        Reply("OK")
+
+if (__name__ == "__main__"):
+    Main()
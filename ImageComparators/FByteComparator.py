@@ -91,6 +91,18 @@ class FByteComparator (FImageComparator):
         
         return compareResult
     
+    def CompareIdenticalImages(self, filename1, filename2):
+        """CompareIdenticalImages(filename1, filename2) -> FCompareResult
+        
+        Implements FImageComparator.CompareIdenticalImages(filename1, 
+        filename2). Identical images pass without being compared.
+        
+        """
+        compareResult = FCompareResult()
+        compareResult.SetResult(True)
+        compareResult.SetExtra(FByteComparator.PASS_EXTRA)
+        return compareResult
+    
     def GetMessage(self, compareResultList):
         """GetMessage(compareResultList)->str
         
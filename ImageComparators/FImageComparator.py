@@ -96,6 +96,65 @@ class FImageComparator:
         """
         raise NotImplementedError, "FImageComparator.CompareImages()"
     
+    def CompareIdenticalImages(self, filename1, filename2):
+        """CompareIdenticalImages(filename1, filename2) -> FCompareResult
+        
+        Compares two images which are known to have exactly the same bytes. 
+        It is used instead of CompareImages when a blessed image is found by 
+        its checksum. (It may be overridden by any implementations of image
+        comparators to skip the comparison.)
+        
+        arguments:
+            filename1
+                str corresponding to a file to compare.
+            filename2
+                str corresponding to another file with the same bytes.
+        
+        returns:
+            FCompareResult representing the result of the comparison.
+        
+        """
+        return self.CompareImages(filename1, filename2)
+    
+    def CompareImageSets(self, candidates, references):
+        """CompareImageSets(candidates, references) -> (int, list_of_list_of_FCompareResult)
+        
+        Compares a set of images against several sets of reference images,
+        stopping at the first set of reference images that fully matches. It
+        is used to compare an image or an animation against all the blessed
+        ones. The default compares each pair of images with CompareImages. 
+        (It may be overridden by any implementations of image comparators to 
+        read each image only once.)
+        
+        arguments:
+            candidates
+                list of str corresponding to the files to compare.
+            references
+                list of list of str corresponding to the sets of reference
+                files. Each set has the same length as candidates and its
+                files are compared with the candidates in order.
+        
+        returns:
+            pair with the index of the matching set of reference files, or -1
+            if none of them match, and a list with a list of FCompareResult 
+            for each set of reference files that was compared. Like in 
+            GetMessage, the last list is for the matching set if there is one.
+        
+        """
+        allCompareResults = []
+        for index in range(len(references)):
+            compareResults = []
+            isMatching = True
+            for i in range(len(candidates)):
+                compareResult = self.CompareImages(candidates[i], 
+                                                   references[index][i])
+                compareResults.append(compareResult)
+                if (not compareResult.GetResult()):
+                    isMatching = False
+            allCompareResults.append(compareResults)
+            if (isMatching): return (index, allCompareResults)
+        return (-1, allCompareResults)
+    
     def GetMessage(self, compareResultList):
         """GetMessage(compareResultList) -> str
         
@@ -83,6 +83,18 @@ class FPyramidDiff (FImageComparator):
         compareResult.SetExtra(retcode)
         return compareResult
     
+    def CompareIdenticalImages(self, filename1, filename2):
+        """CompareIdenticalImages(filename1, filename2) -> FCompareResult
+        
+        Implements FImageComparator.CompareIdenticalImages(filename1, 
+        filename2). Identical images pass without being compared.
+        
+        """
+        compareResult = FCompareResult()
+        compareResult.SetResult(True)
+        compareResult.SetExtra(0)
+        return compareResult
+    
     def GetMessage(self, compareResultList):
         """GetMessage(compareResultList)->str
         
@@ -0,0 +1,446 @@
+# Copyright (c) 2012 The Khronos Group Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and /or associated documentation files (the "Materials "), to deal in the Materials without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Materials, and to permit persons to whom the Materials are furnished to do so, subject to 
+# the following conditions: 
+# The above copyright notice and this permission notice shall be included 
+# in all copies or substantial portions of the Materials. 
+# THE MATERIALS ARE PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE MATERIALS OR THE USE OR OTHER DEALINGS IN THE MATERIALS.
+
+from ImageComparators.FPyramidDiff import *
+import os
+import os.path
+import struct
+
+from Core.Common.FImageCache import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def _ToFloat32(value):
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+class FPythonPyramidDiff (FPyramidDiff):
+    """The class which represents an in-process PyramidDiff to the testing
+    framework.
+    
+    This class compares images like PyramidDiff.exe without launching a
+    process, so it also works where PyramidDiff.exe cannot run. Each image
+    is blurred with a 3x3 kernel and halved PYRAMID_DEPTH times, and only
+    the last level is compared. The difference of each channel is reduced
+    by the contrast of the second image around the pixel, which is the
+    range of its 3x3 neighbourhood halved the same way: a difference along
+    an edge counts less than one in a flat area, so antialiasing and small
+    offsets do not fail a test. The extra is the largest reduced difference,
+    from 0 to 255, which is the value PyramidDiff.exe returns. The tolerance
+    is on the same scale, so FPyramidDiff.DEFAULT_TOLERANCE keeps its
+    meaning. Images that cannot be decoded give 9999 like PyramidDiff.exe.
+    PyramidDiff.exe compares the pixels of the first image only, so when the
+    second image is larger, the rest of it is ignored. When it is smaller,
+    PyramidDiff.exe reads outside of it and this class gives 9999 instead.
+    
+    The steps follow PyramidDiff.exe down to its rounding, including the
+    transparent pixels composited over black, the gamma of the PNG files and
+    the rows being stored from right to left, which matters for the pixels
+    grouped when halving an image of odd width. Core/PyramidDiffTest.py
+    checks that the extras match.
+    
+    NumPy is used when it is installed; otherwise the images are compared
+    in pure Python, which is much slower.
+    
+    """
+    
+    PYRAMID_DEPTH = 3 # default of PyramidDiff.exe
+    BLUR_WEIGHTS = [[_ToFloat32(0.75), _ToFloat32(0.9), _ToFloat32(0.75)],
+                    [_ToFloat32(0.9), 1.0, _ToFloat32(0.9)],
+                    [_ToFloat32(0.75), _ToFloat32(0.9), _ToFloat32(0.75)]]
+    BLUR_DIVISOR = _ToFloat32(7.6) # sum of the weights
+    INVALID_EXTRA = 9999
+    
+    # libpng only corrects the gamma of opaque images if it is not close to 1
+    GAMMA_THRESHOLD = 0.05
+    SRGB_GAMMA = _ToFloat32(0.45455)
+    PNG_SIGNATURE = "\x89PNG\r\n\x1a\n"
+    PNG_ALPHA_MASK = 4
+    PNG_PALETTE_MASK = 1
+    
+    def __init__(self, configDict):
+        """__init__() -> FPythonPyramidDiff
+        
+        arguments:
+            configDict
+                dict of values taken from the config.txt file with  user
+                specified values.
+        
+        """
+        FPyramidDiff.__init__(self, configDict)
+    
+    def CompareImages(self, filename1, filename2,
+                      tolerance = FPyramidDiff.DEFAULT_TOLERANCE):
+        """CompareImages(filename1, filename2, tolerance = DEFAULT_TOLERANCE) -> FCompareResult
+        
+        Implements FImageComparator.CompareImages(filename1, filename2, tolerance).
+        
+        The result is positive only if both files pass, or if both files do
+        not exist. To pass, the difference between the images must not be
+        greater than the value specifed by tolerance.
+        
+        arguments:
+            filename1
+                str corresponding to a file to compare.
+            filename2
+                str corresponding to another file to compare. Its contrast
+                reduces the differences, as with PyramidDiff.exe.
+            tolerance
+                integer corresponding to the acceptable difference
+                between the two images.
+        
+        returns:
+            FCompareResult indicating the images are the same or different.
+            The extra of FComapreResult is set to the difference between the
+            images if both files exist.
+        
+        """
+        return self.__Compare(filename1, filename2, tolerance, {})
+    
+    def CompareImageSets(self, candidates, references):
+        """CompareImageSets(candidates, references) -> (int, list_of_list_of_FCompareResult)
+        
+        Implements FImageComparator.CompareImageSets(candidates, references).
+        
+        Each image is decoded only once, however many sets it is compared in.
+        
+        """
+        images = {}
+        allCompareResults = []
+        for index in range(len(references)):
+            compareResults = []
+            isMatching = True
+            for i in range(len(candidates)):
+                compareResult = self.__Compare(candidates[i], 
+                        references[index][i], FPyramidDiff.DEFAULT_TOLERANCE,
+                        images)
+                compareResults.append(compareResult)
+                if (not compareResult.GetResult()):
+                    isMatching = False
+            allCompareResults.append(compareResults)
+            if (isMatching): return (index, allCompareResults)
+        return (-1, allCompareResults)
+    
+    def __Compare(self, filename1, filename2, tolerance, images):
+        """__Compare(filename1, filename2, tolerance, images) -> FCompareResult
+        
+        arguments:
+            images
+                dict of the images already decoded, indexed by filename. The
+                images decoded by this comparison are added to it.
+        
+        """
+        compareResult = FCompareResult()
+        compareResult.SetResult(False)
+        compareResult.SetExtra(FPyramidDiff.DEFAULT_EXTRA)
+        
+        filename1 = os.path.normpath(os.path.abspath(filename1))
+        filename2 = os.path.normpath(os.path.abspath(filename2))
+        if (os.path.isfile(filename1)):
+            if (not os.path.isfile(filename2)):
+                return compareResult
+        else:
+            if (os.path.isfile(filename2)):
+                return compareResult
+            
+            compareResult.SetResult(True)
+            return compareResult
+        
+        if (not images.has_key(filename1)):
+            images[filename1] = self.__LoadImage(filename1)
+        if (not images.has_key(filename2)):
+            images[filename2] = self.__LoadImage(filename2)
+        image1 = images[filename1]
+        image2 = images[filename2]
+        
+        if ((image1 == None) or (image2 == None) or
+                (image1[0] > image2[0]) or (image1[1] > image2[1])):
+            difference = FPythonPyramidDiff.INVALID_EXTRA
+        elif (numpy != None):
+            difference = self.__GetArrayDifference(image1, image2)
+        else:
+            difference = self.__GetListDifference(image1, image2)
+        
+        compareResult.SetResult(difference <= tolerance)
+        compareResult.SetExtra(difference)
+        return compareResult
+    
+    def __LoadImage(self, filename):
+        """__LoadImage(filename) -> (int, int, list)
+        
+        Decodes an image the way PyramidDiff.exe does: the gamma of the file
+        is corrected and transparent pixels are composited over black.
+        
+        returns:
+            tuple with the width, height and RGB values of the image, as a
+            NumPy array of the rows if NumPy is installed or as a list of
+            bytes otherwise, or None if the image cannot be read.
+        
+        """
+        image = GetImageCache().GetImage(filename)
+        if (image == None):
+            print "<FPythonPyramidDiff> cannot read " + filename
+            return None
+        if (image.HasMask()):
+            image.InitAlpha()
+        
+        width = image.GetWidth()
+        height = image.GetHeight()
+        gammaTable = self.__GetGammaTable(filename)
+        if (image.HasAlpha()):
+            alphaData = image.GetAlphaData()
+        else:
+            alphaData = None
+        
+        if (numpy != None):
+            pixels = numpy.frombuffer(image.GetData(), numpy.uint8).reshape(
+                    (height, width, 3)).astype(numpy.int32)
+            if (gammaTable != None):
+                pixels = numpy.array(gammaTable, numpy.int32)[pixels]
+            if (alphaData != None):
+                alpha = numpy.frombuffer(alphaData, numpy.uint8).reshape(
+                        (height, width, 1)).astype(numpy.int32)
+                composited = (pixels * alpha + 128) & 0xffff
+                pixels = (composited + (composited >> 8)) >> 8
+            return (width, height, pixels)
+        
+        pixels = map(ord, image.GetData())
+        if (gammaTable != None):
+            pixels = [gammaTable[value] for value in pixels]
+        if (alphaData != None):
+            for i in range(len(pixels)):
+                composited = (pixels[i] * ord(alphaData[i / 3]) + 128) & 0xffff
+                pixels[i] = (composited + (composited >> 8)) >> 8
+        return (width, height, pixels)
+    
+    def __GetGammaTable(self, filename):
+        """__GetGammaTable(filename) -> list
+        
+        returns:
+            list of int corresponding to the value of each byte once libpng
+            corrected its gamma as PyramidDiff.exe asks, or None if libpng
+            does not correct it.
+        
+        """
+        colorType, gamma = self.__ReadPngHeader(filename)
+        if ((gamma == None) or 
+                ((not (colorType & FPythonPyramidDiff.PNG_ALPHA_MASK)) and
+                 (not (colorType & FPythonPyramidDiff.PNG_PALETTE_MASK)) and
+                 (abs(gamma - 1.0) <= FPythonPyramidDiff.GAMMA_THRESHOLD))):
+            return None
+        
+        # the display exponent of PyramidDiff.exe is 1
+        exponent = 1.0 / gamma
+        gammaTable = []
+        for value in range(256):
+            gammaTable.append(
+                    int(pow(value / 255.0, exponent) * 255.0 + 0.5) & 0xff)
+        return gammaTable
+    
+    def __ReadPngHeader(self, filename):
+        """__ReadPngHeader(filename) -> (int, float)
+        
+        returns:
+            tuple with the color type and the gamma of a PNG file as libpng
+            reads them, or (0, None) if it is not a PNG file or has no gamma.
+        
+        """
+        colorType = 0
+        gamma = None
+        try:
+            file = open(filename, "rb")
+            try:
+                if (file.read(8) != FPythonPyramidDiff.PNG_SIGNATURE):
+                    return (0, None)
+                while (True):
+                    header = file.read(8)
+                    if (len(header) != 8): break
+                    length, chunkType = struct.unpack(">I4s", header)
+                    if (chunkType == "IDAT"): break
+                    
+                    data = file.read(length)
+                    file.seek(4, 1) # CRC
+                    if ((chunkType == "IHDR") and (len(data) >= 10)):
+                        colorType = ord(data[9])
+                    elif ((chunkType == "gAMA") and (len(data) == 4)):
+                        fileGamma = struct.unpack(">I", data)[0]
+                        if (fileGamma != 0):
+                            gamma = _ToFloat32(fileGamma / 100000.0)
+                    elif (chunkType == "sRGB"):
+                        gamma = FPythonPyramidDiff.SRGB_GAMMA
+            finally:
+                file.close()
+        except (IOError, struct.error), e:
+            return (0, None)
+        return (colorType, gamma)
+    
+    def __GetArrayDifference(self, image1, image2):
+        pixels1 = image1[2]
+        pixels2 = image2[2]
+        
+        # PyramidDiff.exe stores the rows from right to left
+        pixels1 = pixels1[:, ::-1]
+        pixels2 = pixels2[:, ::-1]
+        contrasts = self.__GetArrayContrasts(pixels2)
+        
+        for level in range(FPythonPyramidDiff.PYRAMID_DEPTH):
+            if (pixels1.size == 0): return 0
+            pixels1 = self.__HalveArray(self.__BlurArray(pixels1))
+            pixels2 = self.__HalveArray(self.__BlurArray(pixels2))
+            contrasts = self.__HalveArray(self.__BlurArray(contrasts))
+        if (pixels1.size == 0): return 0
+        
+        height, width = pixels1.shape[0:2]
+        pixels2 = pixels2[:height, :width]
+        # PyramidDiff.exe reduces the differences by 1.5 times the contrast
+        contrasts = numpy.minimum(contrasts[:height, :width] * 3 / 2, 255)
+        differences = (255 - contrasts) * numpy.abs(pixels1 - pixels2) / 255
+        return int(differences.max())
+    
+    def __PadArray(self, pixels):
+        # repeats the edges, like PyramidDiff.exe reading outside an image
+        pixels = numpy.concatenate((pixels[:1], pixels, pixels[-1:]), 0)
+        return numpy.concatenate((pixels[:, :1], pixels, pixels[:, -1:]), 1)
+    
+    def __BlurArray(self, pixels):
+        height, width = pixels.shape[0:2]
+        padded = self.__PadArray(pixels)
+        
+        # the sums are rounded to single precision after each addition
+        sums = numpy.zeros(pixels.shape, numpy.float32)
+        for y in range(3):
+            for x in range(3):
+                sums = (sums.astype(numpy.float64) + 
+                        padded[y : y + height, x : x + width] * 
+                        FPythonPyramidDiff.BLUR_WEIGHTS[y][x]).astype(
+                        numpy.float32)
+        return (sums.astype(numpy.float64) / 
+                FPythonPyramidDiff.BLUR_DIVISOR).astype(numpy.int32)
+    
+    def __HalveArray(self, pixels):
+        height = pixels.shape[0] / 2
+        width = pixels.shape[1] / 2
+        
+        # odd last rows and columns are dropped
+        pixels = pixels[:height * 2, :width * 2]
+        return (pixels[0::2, 0::2] + pixels[0::2, 1::2] +
+                pixels[1::2, 0::2] + pixels[1::2, 1::2]) / 4
+    
+    def __GetArrayContrasts(self, pixels):
+        height, width = pixels.shape[0:2]
+        padded = self.__PadArray(pixels)
+        
+        maximums = pixels.copy()
+        minimums = pixels.copy()
+        for y in range(3):
+            for x in range(3):
+                neighbours = padded[y : y + height, x : x + width]
+                maximums = numpy.maximum(maximums, neighbours)
+                minimums = numpy.minimum(minimums, neighbours)
+        return maximums - minimums
+    
+    def __GetListDifference(self, image1, image2):
+        width1, height1, pixels1 = image1
+        width2, height2, pixels2 = image2
+        
+        difference = 0
+        for channel in range(3):
+            channel1 = self.__GetListChannel(pixels1, width1, height1, channel)
+            channel2 = self.__GetListChannel(pixels2, width2, height2, channel)
+            contrasts = self.__GetListContrasts(channel2, width2, height2)
+            
+            levelWidth1 = width1
+            levelHeight1 = height1
+            levelWidth2 = width2
+            levelHeight2 = height2
+            for level in range(FPythonPyramidDiff.PYRAMID_DEPTH):
+                channel1 = self.__HalveList(self.__BlurList(channel1, 
+                        levelWidth1, levelHeight1), levelWidth1, levelHeight1)
+                channel2 = self.__HalveList(self.__BlurList(channel2, 
+                        levelWidth2, levelHeight2), levelWidth2, levelHeight2)
+                contrasts = self.__HalveList(self.__BlurList(contrasts, 
+                        levelWidth2, levelHeight2), levelWidth2, levelHeight2)
+                levelWidth1 = levelWidth1 / 2
+                levelHeight1 = levelHeight1 / 2
+                levelWidth2 = levelWidth2 / 2
+                levelHeight2 = levelHeight2 / 2
+            
+            for y in range(levelHeight1):
+                for x in range(levelWidth1):
+                    i = y * levelWidth2 + x
+                    # 1.5 times the contrast, as in __GetArrayDifference
+                    contrast = min(contrasts[i] * 3 / 2, 255)
+                    difference = max(difference, (255 - contrast) * 
+                            abs(channel1[y * levelWidth1 + x] - channel2[i]) /
+                            255)
+        return difference
+    
+    def __GetListChannel(self, pixels, width, height, channel):
+        # PyramidDiff.exe stores the rows from right to left
+        values = []
+        for y in range(height):
+            row = y * width * 3 + channel
+            for x in range(width - 1, -1, -1):
+                values.append(pixels[row + x * 3])
+        return values
+    
+    def __Clamp(self, index, size):
+        # repeats the edges, like PyramidDiff.exe reading outside an image
+        return min(max(index, 0), size - 1)
+    
+    def __GetNeighbourhoods(self, width, height):
+        """__GetNeighbourhoods(width, height) -> generator
+        
+        returns:
+            generator of the list of the indices of the 3x3 neighbourhood of
+            each pixel in turn, row by row.
+        
+        """
+        for y in range(height):
+            rows = [self.__Clamp(y - 1, height) * width, y * width,
+                    self.__Clamp(y + 1, height) * width]
+            for x in range(width):
+                columns = [self.__Clamp(x - 1, width), x,
+                           self.__Clamp(x + 1, width)]
+                yield [rows[0] + columns[0], rows[0] + columns[1],
+                       rows[0] + columns[2], rows[1] + columns[0],
+                       rows[1] + columns[1], rows[1] + columns[2],
+                       rows[2] + columns[0], rows[2] + columns[1],
+                       rows[2] + columns[2]]
+    
+    def __BlurList(self, values, width, height):
+        weights = (FPythonPyramidDiff.BLUR_WEIGHTS[0] + 
+                   FPythonPyramidDiff.BLUR_WEIGHTS[1] + 
+                   FPythonPyramidDiff.BLUR_WEIGHTS[2])
+        blurred = []
+        for neighbourhood in self.__GetNeighbourhoods(width, height):
+            # the sums are rounded to single precision after each addition
+            sum = 0.0
+            for i in range(9):
+                sum = _ToFloat32(sum + values[neighbourhood[i]] * weights[i])
+            blurred.append(int(sum / FPythonPyramidDiff.BLUR_DIVISOR))
+        return blurred
+    
+    def __HalveList(self, values, width, height):
+        # odd last rows and columns are dropped
+        halved = []
+        for y in range(height / 2):
+            row = y * 2 * width
+            for x in range(width / 2):
+                i = row + x * 2
+                halved.append((values[i] + values[i + 1] + values[i + width] +
+                               values[i + width + 1]) / 4)
+        return halved
+    
+    def __GetListContrasts(self, values, width, height):
+        contrasts = []
+        for neighbourhood in self.__GetNeighbourhoods(width, height):
+            neighbours = [values[i] for i in neighbourhood]
+            contrasts.append(max(neighbours) - min(neighbours))
+        return contrasts
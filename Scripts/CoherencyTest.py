@@ -49,6 +49,14 @@ class CoherencyTest (FApplication):
         """
         return "Coherency Test 1.1"
     
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+        
+        Implements FApplication.GetApplicationPath()
+        
+        """
+        return self.configDict["coherencyPath"]
+    
     def GetOperationsList(self):
         """GetOperationsList() -> list_of_str
         
@@ -11,6 +11,8 @@ import subprocess
 
 import Core.Common.FUtils as FUtils
 from Core.Common.FConstants import *
+from Core.Common.FWatchdog import *
+from Core.Logic.FDccWorker import *
 
 class FApplication:
     """Abstract class for specific applications for testing framework."""
@@ -29,6 +31,8 @@ class FApplication:
         """
         self.applicationIndex = -1
         self.configDict = configDict
+        self.__worker = None
+        self.__workerJobs = []
     
     def SetApplicationIndex(self, applicationIndex):
         """SetApplicationIndex(applicationIndex) -> None
@@ -58,6 +62,26 @@ class FApplication:
         """
         self.__testProcedureDir = testProcedureDir
     
+    def Clone(self):
+        """Clone() -> FApplication
+        
+        Creates another instance of this application specific script with the
+        same configuration, application index and test procedure directory.
+        It is used to run several DCC processes concurrently, each clone
+        writing its scripts in its own working directory. (It *may* be
+        overriden by any implementations of application specific scripts.)
+        
+        returns:
+            FApplication to use for another worker, or None if the DCC cannot
+            have more than one instance running at the same time (for example
+            if it shares a configuration file between its instances).
+        
+        """
+        application = self.__class__(self.configDict)
+        application.SetApplicationIndex(self.applicationIndex)
+        application.SetTestProcedureDir(self.__testProcedureDir)
+        return application
+    
     def GetPrettyName(self):
         """GetPrettyName() -> str
         
@@ -71,6 +95,21 @@ class FApplication:
         """
         raise NotImplementedError, "Application.GetPrettyName()"
     
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+        
+        Returns the path of the DCC executable. Its checksum is part of the
+        key used to reuse the outputs of a previous execution, so that they
+        are not reused once the DCC is updated. (It *may* be overriden by any
+        implementations of application specific scripts.)
+        
+        returns:
+            string corresponding to the path of the DCC executable, or None if
+            the outputs of this application should never be reused.
+        
+        """
+        return None
+    
     def GetOperationsList(self):
         """GetOperationsList() -> list_of_str
         
@@ -143,6 +182,95 @@ class FApplication:
         """
         raise NotImplementedError, "Application.RunScript()"
     
+    def GetWorkerCommand(self):
+        """GetWorkerCommand() -> list_of_str
+        
+        Gets the command line of a long-lived DCC process which runs the jobs
+        given with AddWorkerJob, so the DCC is started once instead of once
+        for each operation. The protocol is described in FDccWorker. (It 
+        *may* be overriden by any implementations of application specific 
+        scripts.)
+        
+        returns:
+            list of str corresponding to the command line of the worker, or
+            None if the application does not have a worker.
+        
+        """
+        return None
+    
+    def AddWorkerJob(self, operation, inputFilename, outputDir, logFilename,
+                     outputs, settings):
+        """AddWorkerJob(operation, inputFilename, outputDir, logFilename, outputs, settings) -> None
+        
+        Adds a job for the worker of GetWorkerCommand. The jobs are run by
+        RunWorkerJobs. It is meant to be used by the Write methods instead of
+        WriteCrashDetect. (It should *not* be overriden by any 
+        implemenations of application specific scripts)
+        
+        arguments:
+            operation
+                string corresponding to the operation. It is one of the
+                operations from Core.Common.FConstants.
+            inputFilename
+                string corresponding to the file the operation works on.
+            outputDir
+                string corresponding to the directory to write the outputs in.
+            logFilename
+                string representing the file path of the log name. None if no
+                log file should be use. In that case, it will dump it to 
+                stdout.
+            outputs
+                list of str corresponding to the files the job must write.
+            settings
+                list of FSettingEntry for the operation.
+        
+        """
+        self.__workerJobs.append((operation, inputFilename, outputDir, 
+                                  logFilename, outputs, settings))
+    
+    def RunWorkerJobs(self):
+        """RunWorkerJobs() -> bool
+        
+        Runs the jobs added since the last call, in order, with the worker of
+        GetWorkerCommand. The worker is started if it is not running and is
+        kept running afterwards for the next tests. It is meant to be used by
+        RunScript. (It should *not* be overriden by any implemenations of 
+        application specific scripts)
+        
+        If detectCrash is "True" in the configuration file, the worker is
+        killed when it does no I/O for the timeout specified in the 
+        configuration file. A worker that crashes is started again for the
+        next call.
+        
+        returns:
+            bool corresponding to whether all the jobs ran without the worker
+            crashing. As for RunScript, the tests after the crash are not run.
+        
+        """
+        jobs = self.__workerJobs
+        self.__workerJobs = []
+        
+        if (self.__worker == None):
+            self.__worker = FDccWorker(self.GetWorkerCommand(), 
+                                       self.__GetTimeout())
+        
+        for (operation, inputFilename, outputDir, logFilename, outputs, 
+                settings) in jobs:
+            if (logFilename == None):
+                log = None
+            else:
+                log = open(logFilename, "a")
+            try:
+                isAlive = self.__worker.Run(operation, inputFilename, 
+                                            outputDir, outputs, settings, log)
+            finally:
+                if (log != None):
+                    log.close()
+            if (not isAlive):
+                return False
+        
+        return True
+    
     def WriteValidate(self, filename, logname, outputDir, settings, isAnimated, cameraRig, lightingRig):
         """WriteImport(filename, logname, outputDir, settings, isAnimated, cameraRig, lightingRig) -> list_of_str
         
@@ -350,28 +478,29 @@ class FApplication:
             command
                 string representing the command to execute.
             workingDir
-                string corresponding to the directory that the script files 
-                should be placed. This is a temporay directory and files placed
-                in here should not be assumed to remain across different
-                runnings of tests.
+                string corresponding to the working directory of the 
+                application specific script. It is not used anymore, since 
+                the command is watched by FWatchdog in this process.
         
         """
-        dccFilename = os.path.join(workingDir, "temporaryDCCProcess.py")
-        dccFilename = FUtils.GetAvailableFilename(dccFilename)
+        returnValue, wallTime, cpuTime = FWatchdog(self.__testProcedureDir, 
+                self.__GetTimeout()).Run(command)
         
-        file = open(dccFilename, "w")
-        self.WriteCrashDetectBegin(file)
-        self.WriteCrashDetect(file, command)
-        if (self.configDict["detectCrash"] == "True"):
-            file.write("sys.exit(p.poll())\n")
-        file.close()
+        if (self.configDict["detectCrash"] != "True"): return 0
+        if (returnValue == None): return 1
+        return returnValue
+    
+    def __GetTimeout(self):
+        """__GetTimeout() -> float
         
-        returnValue = subprocess.call("\"" + 
-                self.configDict["pythonExecutable"] + "\" \"" + dccFilename + 
-                "\"")
+        returns:
+            float corresponding to the number of seconds without I/O before
+            considering that there is a crash, or None if detectCrash is not 
+            "True" in the configuration file.
         
-        os.remove(dccFilename)
-        return returnValue
+        """
+        if (self.configDict["detectCrash"] != "True"): return None
+        return float(self.configDict["ioTimeoutMilli"]) / 1000
     
     def WriteCrashDetectBegin(self, file):
         """WriteCrashDetectBegin(file) -> None
@@ -385,30 +514,14 @@ class FApplication:
                 file object to write to
         
         """
-        if (self.configDict["detectCrash"] == "True"):
-            file.write(
-                    # XXX: only works for win32
-                    "import win32api\n" +
-                    "import subprocess\n" +
-                    "import time\n" +
-                    "import os\n" +
-                    "import sys\n\n" +
-                    "def GetDirectoryStatistics(path):\n" +
-                    "    fileCount = 0\n" +
-                    "    dirCount = 0\n" +
-                    "    size = 0\n" +
-                    "    for root, dirs, files in os.walk(path):\n" +
-                    "        fileCount = fileCount + len(files)\n" +
-                    "        dirCount = dirCount + len(dirs)\n" +
-                    "        for file in files:\n" +
-                    "            size = size + os.path.getsize(os.path.join" +
-                            "(root, file))\n" +
-                    "    return (size, fileCount, dirCount)\n\n"
-                    )
-        else:
-            file.write(
-                    "import subprocess\n" +
-                    "import os\n\n")
+        file.write(
+                "import os\n" +
+                "import subprocess\n" +
+                "import sys\n" +
+                "sys.path.insert(0, " + repr(GetWatchdogDir()) + ")\n" +
+                "from FWatchdog import *\n\n" +
+                "watchedDir = " + repr(self.__testProcedureDir) + "\n" +
+                "timeout = " + repr(self.__GetTimeout()) + "\n\n")
     
     def WriteCrashDetect(self, file, command, logFilename = None):
         """WriteCrashDetect(file, command, logFilename = None) -> None
@@ -417,15 +530,19 @@ class FApplication:
         *not* be overriden by any implemenations of application specific 
         scripts)
         
-        If detectCrash is "True" in the configuration file, then it will write
-        it in a crash safe way using the timeout also specified in the
-        configuration file. The timeout is the amount of time without I/O that 
-        is allowed before considering that there is a crash and then will kill 
-        the process. 
+        The command is run by FWatchdog. If detectCrash is "True" in the 
+        configuration file, then it will write it in a crash safe way using 
+        the timeout also specified in the configuration file. The timeout is 
+        the amount of time without I/O in the test procedure directory that 
+        is allowed before considering that there is a crash and then will kill
+        the process and stop the script. 
         
         If detectCrash is not "True" in the configuration file, it will write
         it so that it executes the command and waits until it returns.
         
+        In both cases, the wall time and CPU time of the command are written 
+        next to the log, where FExecution reads them.
+        
         arguments:
             file
                 file object to write to
@@ -437,50 +554,10 @@ class FApplication:
                 stdout.
         
         """
-        if (logFilename == None):
-            logWritten = "None"
-        else:
-            logWritten = "\"" + logFilename.replace("\\","\\\\") + "\""
         file.write(
-                "logFilename = " + logWritten + "\n" +
-                "if (logFilename == None):\n" + 
-                "    log = None\n" +
-                "else:\n" +
-                "    log = open(logFilename, \"a\")\n"
-                )
-        
-        if (self.configDict["detectCrash"] == "True"):
-            file.write(
-                    # XXX: only works for win32
-                    "p = subprocess.Popen('" + command.replace("\\", "\\\\") + 
-                            "', stdout = log, stderr = subprocess.STDOUT)\n" +
-                    "watcher = subprocess.Popen('\"" + 
-                            os.path.abspath(FILEWATCHER).replace("\\", "\\\\") + "\" \"" + 
-                            self.__testProcedureDir.replace("\\", "\\\\") + 
-                            "\" " + self.configDict["ioTimeoutMilli"] +
-                            "')\n" +
-                    "while ((p.poll() == None) and " +
-                            "(watcher.poll() == None)):\n" +
-                    "    time.sleep(1)\n" +
-                    "if (watcher.poll() == None):\n" +
-                    "    handle = win32api.OpenProcess(1, 0, watcher.pid)\n" +
-                    "    win32api.TerminateProcess(handle, 0)\n" +
-                    "    win32api.CloseHandle(handle)\n" +
-                    "if (p.poll() == None):\n" +
-                    "    handle = win32api.OpenProcess(1, 0, p.pid)\n" +
-                    "    win32api.TerminateProcess(handle, 0)\n" +
-                    "    win32api.CloseHandle(handle)\n" +
-                    "    if (log != None):\n" +
-                    "        log.close()\n" +
-                    "    sys.exit(1)\n" +
-                    "if (log != None):\n" +
-                    "    log.close()\n\n"
-                    )
-        else:
-            file.write(
-                    "subprocess.call('" + command.replace("\\", "\\\\") + 
-                            "', stdout = log, stderr = subprocess.STDOUT)\n\n"
-                    )
+                "if (not RunWatched(" + repr(command) + ", " + 
+                        repr(logFilename) + ", watchedDir, timeout)):\n" +
+                "    sys.exit(1)\n\n")
     
     def GetSettingValueAs(self, list, setting, typeCast):
         """GetSettingValueAs(list, setting, typeCast) -> typeCast
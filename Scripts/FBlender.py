@@ -10,9 +10,18 @@ from Core.Logic.FSettingEntry import *
 from Scripts.FApplication import *
 
 class FBlender(FApplication):
-    """Presents Blender to the testing framework"""
+    """Presents Blender to the testing framework
+
+    A single Blender process imports, renders and exports each document, so
+    the render and export steps only report the outputs of the process
+    launched for the import step. If blenderWorker is True in the
+    configuration file, the documents of all the tests are instead listed in
+    a job file and processed by one Blender process.
+
+    """
 
     __SCRIPT_EXTENSION = ".py"
+    __JOBS_EXTENSION = ".txt"
 
     def __init__(self, configDict):
         """__init__() -> FBlender"""
@@ -26,6 +35,9 @@ class FBlender(FApplication):
         self.__testRenderCount = 0
         self.__blenderCommandLine = None
         self.__workingDir = None
+        self.__isWorker = (configDict.has_key("blenderWorker") and
+                           configDict["blenderWorker"] == "True")
+        self.__jobs = None
 
     def GetPrettyName(self):
         """GetPrettyName() -> str
@@ -35,6 +47,14 @@ class FBlender(FApplication):
         """
         return "Blender 2.68a"
 
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+
+        Implements FApplication.GetApplicationPath()
+
+        """
+        return self.configDict["blenderPath"]
+
     def GetSettingsForOperation(self, operation):
         """GetSettingsForOperation(operation) -> list_of_FSettingEntry
 
@@ -64,54 +84,78 @@ class FBlender(FApplication):
         self.__blenderScript = open(os.path.join(workingDir, blenderPyFilename), "w")
         self.WriteCrashDetectBegin(self.__script)
 
+        if (self.__isWorker):
+            jobsFilename = ("blenderJobs" + str(self.applicationIndex) +
+                    FBlender.__JOBS_EXTENSION)
+            self.__jobs = open(os.path.join(workingDir, jobsFilename), "w")
+
         self.__blenderScript.write(
             """import bpy
 import bpy.ops
 import sys
 
-import_dae = sys.argv[-1]
-default_dae = sys.argv[-4]
-export_dae = sys.argv[-3]
-
-print("default .dea for testing: {}\\n".format(default_dae))
-
-print("importing: {}\\n".format(import_dae))
-img=sys.argv[-2]
-img=img.replace("\\\\", "\\\\\\\\")
-bpy.ops.wm.collada_import(filepath=import_dae, import_units=True)
-for o in bpy.data.objects:
-    print("\\t{}\\n".format(o.name))
+def run_test(default_dae, export_dae, img, import_dae):
+    print("default .dea for testing: {}\\n".format(default_dae))
 
-if len(bpy.data.cameras)==0:
-    print("no camera found, importing {}".format(default_dae))
-    bpy.ops.wm.collada_import(filepath=default_dae, import_units=True)
+    print("importing: {}\\n".format(import_dae))
+    img=img.replace("\\\\", "\\\\\\\\")
+    bpy.ops.wm.collada_import(filepath=import_dae, import_units=True)
     for o in bpy.data.objects:
-        o.select = True if o.name == 'delete_me' else False
-    print("cleaning after {} import".format(default_dae))
-    bpy.ops.object.delete()
-
-print("making sure we have an active camera... ")
-c = None
-for o in bpy.data.objects:
-    if o.type=='CAMERA' and o.name=='testCamera':
-        c = o
-        print("...camera set")
-if not c:
-    print("... ERROR: no camera found!")
-
-bpy.data.scenes[0].camera = c
-
-bpy.data.scenes[0].render.resolution_x = 512
-bpy.data.scenes[0].render.resolution_y = 512
-bpy.data.scenes[0].render.resolution_percentage = 100
-bpy.data.scenes[0].render.use_antialiasing = False
-bpy.data.scenes[0].render.alpha_mode = 'TRANSPARENT'
-
-bpy.ops.render.render(animation=False, write_still=True)
-
-bpy.ops.wm.collada_export(filepath=export_dae)
-
-print("\\n\\ndone testing.\\n\\n")"""
+        print("\\t{}\\n".format(o.name))
+
+    if len(bpy.data.cameras)==0:
+        print("no camera found, importing {}".format(default_dae))
+        bpy.ops.wm.collada_import(filepath=default_dae, import_units=True)
+        for o in bpy.data.objects:
+            o.select = True if o.name == 'delete_me' else False
+        print("cleaning after {} import".format(default_dae))
+        bpy.ops.object.delete()
+
+    print("making sure we have an active camera... ")
+    c = None
+    for o in bpy.data.objects:
+        if o.type=='CAMERA' and o.name=='testCamera':
+            c = o
+            print("...camera set")
+    if not c:
+        print("... ERROR: no camera found!")
+
+    bpy.data.scenes[0].camera = c
+
+    bpy.data.scenes[0].render.resolution_x = 512
+    bpy.data.scenes[0].render.resolution_y = 512
+    bpy.data.scenes[0].render.resolution_percentage = 100
+    bpy.data.scenes[0].render.use_antialiasing = False
+    bpy.data.scenes[0].render.alpha_mode = 'TRANSPARENT'
+
+    bpy.ops.render.render(animation=False, write_still=True)
+
+    bpy.ops.wm.collada_export(filepath=export_dae)
+
+    print("\\n\\ndone testing.\\n\\n")
+
+argv = sys.argv[sys.argv.index("--") + 1:]
+if argv[0] == "--jobs":
+    # one job per line: default .dae, export .dae, image, import .dae, log
+    empty_blend = argv[1]
+    for line in open(argv[2]):
+        job = line.rstrip("\\n").split("\\t")
+        if len(job) != 5:
+            continue
+        stdout = sys.stdout
+        sys.stdout = open(job[4], "a")
+        try:
+            try:
+                bpy.ops.wm.open_mainfile(filepath=empty_blend)
+                bpy.data.scenes[0].render.filepath = job[2]
+                run_test(job[0], job[1], job[2], job[3])
+            except Exception as e:
+                print("... ERROR: {}".format(e))
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+else:
+    run_test(argv[-4], argv[-3], argv[-2], argv[-1])"""
         )
 
         self.__testImportCount = 0
@@ -124,6 +168,14 @@ print("\\n\\ndone testing.\\n\\n")"""
         Implements FApplication.EndScript()
 
         """
+        if (self.__isWorker):
+            self.__jobs.close()
+            if (self.__testImportCount > 0):
+                command = ("\"" + self.configDict["blenderPath"] + "\" -b \"" + self.configDict["blenderEmpty"] + "\" -P \"" + self.__blenderScript.name + "\" --factory-startup -- --jobs \"" + self.configDict["blenderEmpty"] + "\" \"" + self.__jobs.name + "\"")
+                print "***Processing %d documents" % (self.__testImportCount)
+                print "   Command %s" % (command)
+                self.WriteCrashDetect(self.__script, command)
+
         self.__blenderScript.close()
         self.__script.close()
 
@@ -167,11 +219,14 @@ print("\\n\\ndone testing.\\n\\n")"""
         command = (command + "\"" + imageFilename + "\" -P \"" + self.__blenderScript.name + "\" --factory-startup -- \""+ self.configDict["blenderDefaultDae"] +"\" \"" + outputFilename + "\" \"" + imageFilename + "\" \"" + filename+"\"")
 
         print "***Importing: %s" % (filename)
-        print "   Command %s" % (command)
 
         self.__blenderCommandLine = command
 
-        self.WriteCrashDetect(self.__script, command, logname)
+        if (self.__isWorker):
+            self.__jobs.write(self.configDict["blenderDefaultDae"] + "\t" + outputFilename + "\t" + imageFilename + "\t" + filename + "\t" + logname + "\n")
+        else:
+            print "   Command %s" % (command)
+            self.WriteCrashDetect(self.__script, command, logname)
 
         self.__testImportCount = self.__testImportCount + 1
 
@@ -185,13 +240,9 @@ print("\\n\\ndone testing.\\n\\n")"""
 
         """
         print "***Render outputDir: %s" % (outputDir)
-
-        command = self.__blenderCommandLine
-
         print "***Rendering: %s" % (self.__currentImageName)
-        print "   Command %s" % (command)
 
-        self.WriteCrashDetect(self.__script, command, logname)
+        self.__WriteFusedStep(logname, "Rendered")
 
         self.__testRenderCount = self.__testRenderCount + 1
         return [os.path.normpath(self.__currentImageName),]
@@ -204,8 +255,17 @@ print("\\n\\ndone testing.\\n\\n")"""
 
         """
         print "***Export outputDir: %s" % (outputDir)
-        command = self.__blenderCommandLine
-        print "   Command %s" % (command)
-        self.WriteCrashDetect(self.__script, command, logname)
+
+        self.__WriteFusedStep(logname, "Exported")
 
         return [os.path.normpath(self.__currentFilename)]
+
+    def __WriteFusedStep(self, logname, operationName):
+        # the Blender process of the import step has the outputs already
+        print "   Done by the Blender process of the import"
+        log = open(logname, "a")
+        if (self.__isWorker):
+            log.write(operationName + " by the Blender worker process, as logged by the import step.\n")
+        else:
+            log.write(operationName + " by the Blender process of the import step: " + self.__blenderCommandLine + "\n")
+        log.close()
@@ -81,6 +81,24 @@ class FMax (FApplication):
         """
         return "3DSMax 7"
     
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+        
+        Implements FApplication.GetApplicationPath()
+        
+        """
+        return self.configDict["maxPath"]
+    
+    def Clone(self):
+        """Clone() -> FApplication
+        
+        Implements FApplication.Clone(). All the instances of 3DS Max read
+        their exporter options from the same maxColladaExporterFilename, so
+        they cannot run concurrently.
+        
+        """
+        return None
+    
     def GetSettingsForOperation(self, operation):
         """GetSettingsForOperation(operation) -> list_of_FSettingEntry
         
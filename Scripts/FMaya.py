@@ -96,6 +96,14 @@ class FMaya (FApplication):
         """
         return "Maya 7.0"
     
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+        
+        Implements FApplication.GetApplicationPath()
+        
+        """
+        return self.configDict["mayaPath"]
+    
     def GetSettingsForOperation(self, operation):
         """GetSettingsForOperation(operation) -> list_of_FSettingEntry
         
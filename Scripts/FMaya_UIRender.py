@@ -104,6 +104,14 @@ class FMaya_UIRender (FApplication):
         """
         return "Maya - UIRender"
     
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+        
+        Implements FApplication.GetApplicationPath()
+        
+        """
+        return self.configDict["mayaPath"]
+    
     def GetSettingsForOperation(self, operation):
         """GetSettingsForOperation(operation) -> list_of_FSettingEntry
         
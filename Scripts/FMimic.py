@@ -37,6 +37,28 @@ class FMimic (FApplication):
         """
         return "Mimic 1.0"
     
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+        
+        Implements FApplication.GetApplicationPath()
+        
+        """
+        return self.configDict["mimicPath"]
+    
+    def GetWorkerCommand(self):
+        """GetWorkerCommand() -> list_of_str
+        
+        Implements FApplication.GetWorkerCommand()
+        
+        """
+        if (not self.__IsWorkerUsed()): return None
+        return [self.configDict["pythonExecutable"], 
+                os.path.abspath(self.configDict["mimicWorkerPath"])]
+    
+    def __IsWorkerUsed(self):
+        return (self.configDict.has_key("mimicWorkerPath") and 
+                os.path.isfile(self.configDict["mimicWorkerPath"]))
+    
     def GetSettingsForOperation(self, operation):
         """GetSettingsForOperation(operation) -> list_of_FSettingEntry
         
@@ -81,6 +103,10 @@ class FMimic (FApplication):
         Implements FApplication.RunScript()
         
         """
+        if (self.__IsWorkerUsed()):
+            print "start running the mimic worker"
+            return self.RunWorkerJobs()
+        
         if (not os.path.isfile(self.configDict["mimicPath"])):
             print "Mimic does not exist"
             return True
@@ -118,7 +144,11 @@ class FMimic (FApplication):
         
         print "***Importting: %s" % (filename)
 	print "   Command %s" % (command)        
-        self.WriteCrashDetect(self.__script, command, logname)
+        if (self.__IsWorkerUsed()):
+            self.AddWorkerJob(IMPORT, filename, outputDir, logname, 
+                              [outputFilename, imageFilename], settings)
+        else:
+            self.WriteCrashDetect(self.__script, command, logname)
         
         self.__testImportCount = self.__testImportCount + 1
         
@@ -145,7 +175,12 @@ class FMimic (FApplication):
                    "\" \"" + outputFilename + "\" \"" + imageFilename + "\"")
 
 	print "   Command %s" % (command)        
-        self.WriteCrashDetect(self.__script, command, logname)
+        if (self.__IsWorkerUsed()):
+            self.AddWorkerJob(RENDER, self.__currentFilename, outputDir, 
+                              logname, [outputFilename, imageFilename], 
+                              settings)
+        else:
+            self.WriteCrashDetect(self.__script, command, logname)
         
         self.__testRenderCount = self.__testRenderCount + 1        
         return [os.path.normpath(imageFilename),]
@@ -170,6 +205,11 @@ class FMimic (FApplication):
                    "\" \"" + outputFilename + "\" \"" + imageFilename + "\"")
         
 	print "   Command %s" % (command)        
-        self.WriteCrashDetect(self.__script, command, logname)
+        if (self.__IsWorkerUsed()):
+            self.AddWorkerJob(EXPORT, self.__currentFilename, outputDir, 
+                              logname, [outputFilename, imageFilename], 
+                              settings)
+        else:
+            self.WriteCrashDetect(self.__script, command, logname)
         
         return [os.path.normpath(outputFilename)]
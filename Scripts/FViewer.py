@@ -53,6 +53,14 @@ class FViewer (FApplication):
         """
         return "Feeling Viewer"
 
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+        
+        Implements FApplication.GetApplicationPath()
+        
+        """
+        return self.configDict["feelingViewerCLI"]
+    
     def GetOperationsList(self):
         """GetOperationsList() -> list_of_str
         
@@ -78,6 +78,14 @@ class FXComposer (FApplication):
         """
         return "NVIDIA FX Composer 2"
     
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+        
+        Implements FApplication.GetApplicationPath()
+        
+        """
+        return self.configDict["FXComposerPath"]
+    
     def GetOperationsList(self):
         """GetOperationsList() -> list_of_str
         
@@ -35,6 +35,22 @@ class SchemaValidate (FApplication):
         """
         return "MSXML 6.0"
     
+    def GetApplicationPath(self):
+        """GetApplicationPath() -> str
+        
+        Implements FApplication.GetApplicationPath()
+        
+        """
+        return self.__GetExecutable()
+    
+    def __GetExecutable(self):
+        # "Internal" validates in-process within the framework; the scripted
+        # application still needs the executable
+        path = self.configDict["schemaValidatePath"]
+        if (path.lower() == SCHEMA_VALIDATE_INTERNAL.lower()):
+            return SCHEMA_VALIDATE_EXECUTABLE
+        return path
+    
     def GetOperationsList(self):
         """GetOperationsList() -> list_of_str
         
@@ -80,7 +96,7 @@ class SchemaValidate (FApplication):
         Implements FApplication.RunScript()
         
         """
-        if (not os.path.isfile(self.configDict["schemaValidatePath"])):
+        if (not os.path.isfile(self.__GetExecutable())):
             print "MSXML 6.0 does not exist"
             return True
         
@@ -110,7 +126,7 @@ class SchemaValidate (FApplication):
 #        self.__script.write(change_dir_string)
 
         # Write the executing command: >>schemaValidatePath file SCHEMA_LOCATION SCHEMA_NAMESPACE log
-        command = ("\"" + self.configDict["schemaValidatePath"] + "\" ") 
+        command = ("\"" + self.__GetExecutable() + "\" ") 
         command = (command + "\"" + filename + "\" ")  
         command = (command + "\"" + SCHEMA_LOCATION + "\" ")
         command = (command + "\"" + SCHEMA_NAMESPACE + "\" ")
@@ -335,7 +335,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -367,7 +367,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         
@@ -398,7 +398,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         
@@ -433,7 +433,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -464,7 +464,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -501,7 +501,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -530,7 +530,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
                 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         testPChecker = PresChecker(testIO.GetRoot(self.__inputFileName), testIO.GetRoot(self.__outputFileNameList[0]) )
@@ -565,6 +565,42 @@ class JudgeAssistant:
         return self.__preservationResults
     
     
+    # Helper to find an element of elementList whose data equals dataToCheck, compared as
+    # floats if dataType is "float" and as strings otherwise.
+    # Returns [foundMatch, closest] where closest is the CompareFloatArrays result of the element
+    # of the same size with the smallest maximum absolute error, or the given one if it is smaller.
+    def __FindMatchingData(self, elementList, dataToCheck, dataType, closest = None):
+        dataToCheckList = dataToCheck.split()
+        if (dataType == "float"):
+            dataToCheckList = ParseFloatArray(dataToCheckList)
+        
+        for eachElement in elementList:
+            outputDataList = eachElement.childNodes[0].nodeValue.split()
+            if ( len(outputDataList) == 0 or len(outputDataList) != len(dataToCheckList) ):
+                continue
+            
+            if (dataType == "float"):
+                try:
+                    outputDataList = ParseFloatArray(outputDataList)
+                except ValueError:
+                    continue
+                comparison = CompareFloatArrays(outputDataList, dataToCheckList)
+                if (comparison[0]):
+                    return [True, comparison]
+                if (closest == None or comparison[2] < closest[2]):
+                    closest = comparison
+            elif (outputDataList == dataToCheckList):
+                return [True, closest]
+        
+        return [False, closest]
+    
+    # Helper to log where float data differs from the data it was compared with
+    def __LogDataDifference(self, context, comparison):
+        if (comparison == None or comparison[0]):
+            return
+        context.Log("Data first differs at value " + str(comparison[1]) + ": maximum absolute error " + 
+                    str(comparison[2]) + ", maximum relative error " + str(comparison[3]) + ".")
+    
     # Compares an element's data against known data of type "float" or "string"
     def ElementDataCheck(self, context, tagList, knownData, dataType="float", defaultLogText = True):
         if ( len(self.__inputFileName) == 0 or len(self.__outputFileNameList) == 0 ):
@@ -573,36 +609,14 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
     
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         
         # get required elements from the path def'ed by the tagLst
         elementList = FindElement(testIO.GetRoot(self.__outputFileNameList[0]), tagList)
         
-        # separate each data value for comparison
-        dataToCheckList = knownData.split()
-        
-        foundMatch = False
-        for index in range( len(elementList) ):
-            outputDataList = elementList[index].childNodes[0].nodeValue.split()
-            
-            if ( len(outputDataList) > 0 and len(outputDataList) == len(dataToCheckList) ):
-                foundMatch = True
-                for i in range( len(outputDataList) ):
-                    if (dataType == "float"):
-                        if ( not IsValueEqual(float(outputDataList[i]), float(dataToCheckList[i]), 'float') ):
-                            foundMatch = False
-                            break
-                    else:
-                        if ( not IsValueEqual(outputDataList[i], dataToCheckList[i], 'string') ):
-                            foundMatch = False
-                            break
-            else:
-                foundMatch = False
-            
-            if (foundMatch):
-                break
+        foundMatch, closest = self.__FindMatchingData(elementList, knownData, dataType)
                 
         if (foundMatch):
             logMsg = "PASSED: <"+ tagList[len(tagList)-1] +"> data is preserved."
@@ -614,6 +628,7 @@ class JudgeAssistant:
 
         if (defaultLogText):
             context.Log(logMsg)
+            self.__LogDataDifference(context, closest)
 
         testIO.Delink()
         return self.__preservationResults
@@ -626,7 +641,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         testPChecker = PresChecker(testIO.GetRoot(self.__inputFileName), testIO.GetRoot(self.__outputFileNameList[0]) )
@@ -635,34 +650,15 @@ class JudgeAssistant:
         inputElementList = FindElement(testIO.GetRoot(self.__inputFileName), tagList)
         outputElementList = FindElement(testIO.GetRoot(self.__outputFileNameList[0]), tagList)
         
-        dataToCheckList = inputElementList[0].childNodes[0].nodeValue.split()
-
-        foundMatch = False
-        for index in range( len(outputElementList) ):
-            outputDataList = outputElementList[index].childNodes[0].nodeValue.split()
-            
-            if ( len(outputDataList) > 0 and len(outputDataList) == len(dataToCheckList) ):
-                foundMatch = True
-                for i in range( len(outputDataList) ):
-                    if (dataType == "float"):
-                        if ( not IsValueEqual(float(outputDataList[i]), float(dataToCheckList[i]), 'float') ):
-                            foundMatch = False
-                            break
-                    else:
-                        if ( not IsValueEqual(outputDataList[i], dataToCheckList[i], 'string') ):
-                            foundMatch = False
-                            break
-            else:
-                foundMatch = False
-            
-            if (foundMatch):
-                break
+        foundMatch, closest = self.__FindMatchingData(outputElementList, 
+                inputElementList[0].childNodes[0].nodeValue, dataType)
 
         if (foundMatch):
             context.Log("PASSED: <"+ tagList[len(tagList)-1] +"> data is preserved.")
             self.__preservationResults = True
         else:
             context.Log("FAILED: <"+ tagList[len(tagList)-1] +"> data is not preserved.")
+            self.__LogDataDifference(context, closest)
             self.__preservationResults = False
             self.__result = False
                 
@@ -677,7 +673,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -728,7 +724,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -767,7 +763,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         testPChecker = PresChecker(testIO.GetRoot(self.__inputFileName), testIO.GetRoot(self.__outputFileNameList[0]) )
@@ -775,34 +771,17 @@ class JudgeAssistant:
         # get input tags
         inputElementList = FindElement(testIO.GetRoot(self.__inputFileName), tagListArray[0])
         
-        dataToCheckList = inputElementList[0].childNodes[0].nodeValue.split()
+        dataToCheck = inputElementList[0].childNodes[0].nodeValue
         
         # Get the original input tag to check for
         inputTagList = tagListArray[0]
 
         # get required elements from the path def'ed by the tagLst
+        closest = None
         for eachtagList in tagListArray:
             outputElementList = FindElement(testIO.GetRoot(self.__outputFileNameList[0]), eachtagList)
 
-            foundMatch = False
-            for index in range( len(outputElementList) ):
-                outputDataList = outputElementList[index].childNodes[0].nodeValue.split()
-                if ( len(outputDataList) > 0 and len(outputDataList) == len(dataToCheckList) ):
-                    foundMatch = True
-                    for i in range( len(outputDataList) ):
-                        if (dataType == "float"):
-                            if ( not IsValueEqual( float(outputDataList[i]), float(dataToCheckList[i]), 'float') ):
-                                foundMatch = False
-                                break
-                        else:
-                            if ( not IsValueEqual( outputDataList[i], dataToCheckList[i], 'string') ):
-                                foundMatch = False
-                                break
-                else:
-                    foundMatch = False
-            
-                if (foundMatch):
-                    break
+            foundMatch, closest = self.__FindMatchingData(outputElementList, dataToCheck, dataType, closest)
             if (foundMatch):
                 break
 
@@ -819,6 +798,7 @@ class JudgeAssistant:
 
         if (defaultLogText):
             context.Log(logMsg)
+            self.__LogDataDifference(context, closest)
             
         testIO.Delink()
         return self.__preservationResults
@@ -834,7 +814,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         testPChecker = PresChecker(testIO.GetRoot(self.__inputFileName), testIO.GetRoot(self.__outputFileNameList[0])  )
@@ -877,7 +857,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         testPChecker = PresChecker(testIO.GetRoot(self.__inputFileName), testIO.GetRoot(self.__outputFileNameList[0]) )
@@ -920,7 +900,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -972,7 +952,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         testPChecker = PresChecker(testIO.GetRoot(self.__inputFileName), testIO.GetRoot(self.__outputFileNameList[0]) )
@@ -988,24 +968,11 @@ class JudgeAssistant:
             testIO.Delink()
             return self.__preservationResults
         
-        dataToCheckList = inputElementList[0].childNodes[0].nodeValue.split()
+        dataToCheck = inputElementList[0].childNodes[0].nodeValue
         
         # check the baked location for existence of data
         outputElementList = FindElement(testIO.GetRoot(self.__outputFileNameList[0]), bakedLocation)
-        baked = False
-        for index in range( len(outputElementList) ):
-            outputDataList = outputElementList[index].childNodes[0].nodeValue.split()
-            if ( len(outputDataList) > 0 and len(outputDataList) == len(dataToCheckList) ):
-                baked = True
-                for i in range( len(outputDataList) ):
-                    if ( not IsValueEqual( float(outputDataList[i]), float(dataToCheckList[i]), 'float') ):
-                        baked = False
-                        break
-            else:
-                baked = False
-            
-            if (baked):
-                break
+        baked = self.__FindMatchingData(outputElementList, dataToCheck, "float")[0]
 
         # if value is not baked, check for the existence of the value in a newparam
         if (not baked):
@@ -1016,15 +983,7 @@ class JudgeAssistant:
 
                 foundInNewparam = False
                 for index in range( len(outputElementList) ):
-                    outputDataList = outputElementList[index].childNodes[0].nodeValue.split()
-                    if ( len(outputDataList) > 0 and len(outputDataList) == len(dataToCheckList) ):
-                        foundInNewparam = True
-                        for i in range( len(outputDataList) ):
-                            if ( not IsValueEqual( float(outputDataList[i]), float(dataToCheckList[i]), 'float') ):
-                                foundInNewparam = False
-                                break
-                    else:
-                        foundInNewparam = False
+                    foundInNewparam = self.__FindMatchingData([outputElementList[index]], dataToCheck, "float")[0]
                     
                     # newparam was found, so now get its sid
                     if (foundInNewparam):
@@ -1113,9 +1072,7 @@ class JudgeAssistant:
                 return False
         
             if ( (numericNodes != None) and (inputElement.nodeName in numericNodes) ):
-                for i in range( len(inputDataList) ):
-                    if (not IsValueEqual(float(inputDataList[i]), float(outputDataList[i]), 'float')):
-                        return False
+                return CompareFloatArrays(ParseFloatArray(inputData), ParseFloatArray(outputData))[0]
 	    else:
                 for i in range( len(inputDataList) ):
                     if (not IsValueEqual(inputDataList[i], outputDataList[i], 'string')):
@@ -1189,7 +1146,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
                 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         
@@ -1250,7 +1207,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         
@@ -1317,7 +1274,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -1360,23 +1317,24 @@ class JudgeAssistant:
                     context.Log("FAILED: attributes do not match for <" + trsInList[index].nodeName + ">.")
                     return False
 
-                outputDataList = trsOutList[index].childNodes[0].nodeValue.split()
-                inputDataList = trsInList[index].childNodes[0].nodeValue.split()
+                outputData = ParseFloatArray(trsOutList[index].childNodes[0].nodeValue)
+                inputData = ParseFloatArray(trsInList[index].childNodes[0].nodeValue)
                 
-                if ( len(outputDataList) != len(inputDataList) ):
+                if ( len(outputData) != len(inputData) ):
                     testIO.Delink()
                     context.Log("FAILED: Transform stacks of node '" + eachNode + "' are not equal.")
                     self.__preservationResults = False
                     self.__result = False
                     return self.__preservationResults
-                    
-                for i in range(0, len(outputDataList) ):
-                    if ( not IsValueEqual(float(outputDataList[i]), float(inputDataList[i]), 'float') ):
-                        testIO.Delink()
-                        context.Log("FAILED: Transform stacks of node '" + eachNode + "' are not equal.")
-                        self.__preservationResults = False
-                        self.__result = False
-                        return self.__preservationResults
+                
+                comparison = CompareFloatArrays(outputData, inputData)
+                if ( not comparison[0] ):
+                    testIO.Delink()
+                    context.Log("FAILED: Transform stacks of node '" + eachNode + "' are not equal.")
+                    self.__LogDataDifference(context, comparison)
+                    self.__preservationResults = False
+                    self.__result = False
+                    return self.__preservationResults
 
             context.Log("PASSED: Transform stacks of node '" + eachNode + "' are preserved.")
 
@@ -1462,7 +1420,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
                 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
         
@@ -1529,7 +1487,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
       
@@ -1584,7 +1542,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
       
@@ -1640,7 +1598,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -1709,7 +1667,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -1733,7 +1691,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 
@@ -1756,7 +1714,7 @@ class JudgeAssistant:
                 self.__result = False
                 return self.__preservationResults
         
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
     
@@ -1776,14 +1734,14 @@ class JudgeAssistant:
 ######################################################
 
     # Checks an element's attribute value in the output file against a known attributeName and attributeValue
-    def GetNameSpace(self, tagList):
+    def GetNameSpace(self, context, tagList):
         if ( len(self.__inputFileName) == 0 or len(self.__outputFileNameList) == 0 ):
             if (self.SetInputOutputFiles(context) == False):
                 self.__preservationResults = False
                 self.__result = False
                 return self.__preservationResults
 
-        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList )
+        testIO = DOMParserIO( self.__inputFileName, self.__outputFileNameList, context.GetDocuments() )
         # load files and generate root
         testIO.Init()
 